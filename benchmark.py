@@ -0,0 +1,681 @@
+# Description:      Timing comparisons for the HashMap implementations.  Run with "python benchmark.py" - each benchmark prints the time taken by the
+#                   existing approach and by the optimized approach for the same workload.
+
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_array import ArrayHashMap
+from heavy_hitters import HeavyHitters
+from hash_map_concurrent import ConcurrentHashMap
+from hash_map_lru import LRUCache
+from hash_map_mmap import MmapHashMap
+from hash_map_shared import SharedHashMap
+from hash_map_sharded import ShardedHashMap
+from hash_map_snapshot import SnapshotHashMap
+from hash_map_ttl import TTLHashMap
+from hash_map_wal import DurableHashMap
+
+
+def _time(function) -> float:
+    """Return the number of seconds taken to call a function with no arguments."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def benchmark_put_many(num_pairs: int = 200000) -> None:
+    """
+    Compare inserting and looking up a batch of pairs one at a time with put/get, against the batch put_many/get_many methods, for both HashMaps.
+    
+    The built-in hash is used, since the sample hash functions only produce a few thousand distinct values for short keys, and the time spent scanning
+    long chains/probe sequences would hide the cost of resizing.
+    """
+    pairs = [('key' + str(i), i) for i in range(num_pairs)]
+    keys = [pair[0] for pair in pairs]
+
+    for module in (hash_map_sc, hash_map_oa):
+        loop_map = module.HashMap(11, hash)
+        batch_map = module.HashMap(11, hash)
+
+        def put_loop():
+            for key, value in pairs:
+                loop_map.put(key, value)
+
+        def get_loop():
+            for key in keys:
+                loop_map.get(key)
+
+        put_time = _time(put_loop)
+        put_many_time = _time(lambda: batch_map.put_many(pairs))
+        get_time = _time(get_loop)
+        get_many_time = _time(lambda: batch_map.get_many(keys))
+
+        print(f"{module.__name__}: put loop {put_time:.3f}s, put_many {put_many_time:.3f}s "
+              f"({put_time / put_many_time:.2f}x)")
+        print(f"{module.__name__}: get loop {get_time:.3f}s, get_many {get_many_time:.3f}s "
+              f"({get_time / get_many_time:.2f}x)")
+
+
+def benchmark_array_hash_map(num_pairs: int = 200000) -> None:
+    """
+    Compare the memory used and the put/get time of hash_map_oa.HashMap (one HashEntry object per slot) against ArrayHashMap (parallel flat arrays).
+    """
+    pairs = [('key' + str(i), i) for i in range(num_pairs)]
+
+    for map_class in (hash_map_oa.HashMap, ArrayHashMap):
+        tracemalloc.start()
+        hash_map = map_class(11, hash)
+
+        def put_loop():
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+        def get_loop():
+            for key, _ in pairs:
+                hash_map.get(key)
+
+        put_time = _time(put_loop)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        get_time = _time(get_loop)
+
+        print(f"{map_class.__module__}.{map_class.__name__}: {memory / num_pairs:.1f} bytes per entry (excluding keys/values), "
+              f"put loop {put_time:.3f}s, get loop {get_time:.3f}s")
+
+
+def benchmark_incremental_resize(num_pairs: int = 300000) -> None:
+    """
+    Compare the put latency of hash_map_oa.HashMap with the default resize (every entry moved at once) and with incremental resizing.
+    
+    The worst case of both can still include a garbage collection pause, which is not caused by the resize.
+    """
+    for incremental_resize in (False, True):
+        hash_map = hash_map_oa.HashMap(11, hash, incremental_resize=incremental_resize)
+        latencies = []
+        for i in range(num_pairs):
+            start = time.perf_counter()
+            hash_map.put('key' + str(i), i)
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"incremental_resize={incremental_resize}: total {sum(latencies):.3f}s, p99 put {p99 * 1e6:.1f}us, "
+              f"worst put {latencies[-1] * 1e3:.2f}ms")
+
+
+def benchmark_churn(num_live: int = 20000, num_cycles: int = 60000) -> None:
+    """
+    Time an insert/delete churn workload on hash_map_oa.HashMap: the table is filled with num_live keys, then each cycle removes the oldest key, inserts
+    a new one, and updates the value of another existing key.  The number of live keys stays the same, so the table never grows, and the removed keys
+    leave tombstones along the probe sequences of later inserts and updates.
+    """
+    hash_map = hash_map_oa.HashMap(11, hash)
+    hash_map.put_many(('key' + str(i), i) for i in range(num_live))
+
+    def churn():
+        for i in range(num_cycles):
+            hash_map.remove('key' + str(i))
+            hash_map.put('key' + str(i + num_live), i)
+            hash_map.put('key' + str(i + num_live // 2), i)
+
+    churn_time = _time(churn)
+    print(f"{num_cycles} remove/insert/update cycles with {num_live} live keys: {churn_time:.3f}s "
+          f"({churn_time / num_cycles * 1e6:.1f}us per cycle)")
+
+
+def benchmark_probing(num_pairs: int = 100000) -> None:
+    """
+    Compare the probing strategies of hash_map_oa.HashMap on the same put / get / remove workload, and report the average number of slots probed by a 
+    successful lookup once the table is filled.
+    """
+    pairs = [('key' + str(i), i) for i in range(num_pairs)]
+
+    for probing in hash_map_oa.PROBING_STRATEGIES:
+        hash_map = hash_map_oa.HashMap(11, hash, probing=probing)
+
+        def put_loop():
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+        def get_loop():
+            for key, _ in pairs:
+                hash_map.get(key)
+
+        def remove_loop():
+            for key, _ in pairs[::2]:
+                hash_map.remove(key)
+
+        put_time = _time(put_loop)
+        get_time = _time(get_loop)
+
+        # NUMBER OF SLOTS PROBED TO FIND EACH KEY, INCLUDING ITS OWN SLOT
+        probes = 0
+        for key, _ in pairs:
+            _hash = hash(key)
+            for num_probes, index in enumerate(hash_map._probe_sequence(_hash, hash_map._capacity), 1):
+                hash_entry = hash_map._buckets[index]
+                if hash_entry.hash == _hash and hash_entry.key == key:
+                    break
+            probes += num_probes
+
+        remove_time = _time(remove_loop)
+        print(f"{probing}: put loop {put_time:.3f}s, get loop {get_time:.3f}s, remove loop {remove_time:.3f}s, "
+              f"{probes / num_pairs:.2f} probes per lookup at load {num_pairs / hash_map._capacity:.2f}")
+
+
+def benchmark_treeify(num_keys: int = 5040) -> None:
+    """
+    Compare hash_map_sc.HashMap with linked list buckets only, and with long buckets converted into tree buckets, when every key has the same hash.
+    
+    With hash_function_1, every permutation of the same characters has the same hash, so all keys land in a single bucket.
+    """
+    keys = [''.join(permutation) for permutation in itertools.islice(itertools.permutations('abcdefgh'), num_keys)]
+
+    for treeify_threshold in (None, 8):
+        hash_map = hash_map_sc.HashMap(11, hash_function_1, treeify_threshold=treeify_threshold)
+
+        def put_loop():
+            for key in keys:
+                hash_map.put(key, key)
+
+        def get_loop():
+            for key in keys:
+                hash_map.get(key)
+
+        put_time = _time(put_loop)
+        get_time = _time(get_loop)
+        print(f"treeify_threshold={treeify_threshold}: put loop {put_time:.3f}s, get loop {get_time:.3f}s")
+
+
+class _GlobalLockHashMap:
+    """hash_map_sc.HashMap shared between threads behind one global lock, for comparison with ConcurrentHashMap."""
+
+    def __init__(self) -> None:
+        self._hash_map = hash_map_sc.HashMap(11, hash)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._hash_map.put(key, value)
+
+    def get(self, key: str):
+        with self._lock:
+            return self._hash_map.get(key)
+
+
+def benchmark_concurrent(num_keys: int = 50000, ops_per_thread: int = 100000) -> None:
+    """
+    Compare the throughput of a hash_map_sc.HashMap behind one global lock against ConcurrentHashMap, with 1 to 8 threads each running the same
+    number of operations (90% get, 10% put) on a shared set of keys.
+    
+    With the GIL enabled, only one thread runs Python code at a time, so neither map scales with the number of threads.  On a free-threaded CPython
+    build (python3.13t or later), the threads of ConcurrentHashMap run in parallel as long as they use different stripes.
+    """
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"GIL enabled: {gil_enabled}, CPUs: {os.cpu_count()}")
+
+    keys = ['key' + str(i) for i in range(num_keys)]
+    random_generator = random.Random(0)
+    operations = [(random_generator.random() < 0.1, random_generator.choice(keys)) for _ in range(ops_per_thread)]
+
+    for map_class in (_GlobalLockHashMap, ConcurrentHashMap):
+        for num_threads in (1, 2, 4, 8):
+            hash_map = map_class() if map_class is _GlobalLockHashMap else map_class(11, hash, stripes=64)
+            for key in keys:
+                hash_map.put(key, 0)
+
+            def worker():
+                for is_put, key in operations:
+                    if is_put:
+                        hash_map.put(key, 1)
+                    else:
+                        hash_map.get(key)
+
+            threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+
+            def run():
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            run_time = _time(run)
+            print(f"{map_class.__name__}, {num_threads} threads: {num_threads * ops_per_thread / run_time / 1e6:.2f}M ops/s")
+
+
+def benchmark_snapshot(num_keys: int = 50000, ops_per_thread: int = 100000, num_threads: int = 4) -> None:
+    """
+    Compare the throughput of a read-heavy workload (99% get, 1% put) on a hash_map_sc.HashMap behind one global lock, a ConcurrentHashMap and a
+    SnapshotHashMap (lock-free reads), and the cost of taking a snapshot of a SnapshotHashMap against copying the whole map.
+    """
+    keys = ['key' + str(i) for i in range(num_keys)]
+    random_generator = random.Random(0)
+    operations = [(random_generator.random() < 0.01, random_generator.choice(keys)) for _ in range(ops_per_thread)]
+
+    for hash_map in (_GlobalLockHashMap(), ConcurrentHashMap(11, hash, stripes=64), SnapshotHashMap(11, hash)):
+        for key in keys:
+            hash_map.put(key, 0)
+
+        def worker():
+            for is_put, key in operations:
+                if is_put:
+                    hash_map.put(key, 1)
+                else:
+                    hash_map.get(key)
+
+        threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+
+        def run():
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        run_time = _time(run)
+        print(f"{type(hash_map).__name__}, {num_threads} threads: {num_threads * ops_per_thread / run_time / 1e6:.2f}M ops/s")
+
+    snapshot_time = _time(lambda: [hash_map.snapshot() for _ in range(1000)]) / 1000
+    copy_time = _time(lambda: dict(hash_map.items()))
+    print(f"SnapshotHashMap of {num_keys} keys: snapshot() {snapshot_time * 1e6:.2f}us, full copy {copy_time * 1e3:.1f}ms")
+
+
+def benchmark_sharded(num_pairs: int = 400000) -> None:
+    """
+    Compare bulk loading and looking up a batch of pairs with put_many / get_many on one hash_map_sc.HashMap, against a ShardedHashMap with 1, 2 and 4
+    worker processes.  Each shard runs on its own core when enough cores are available; the time also includes sending the pairs to the workers.
+    """
+    print(f"CPUs: {os.cpu_count()}")
+    pairs = [('key' + str(i), i) for i in range(num_pairs)]
+    keys = [pair[0] for pair in pairs]
+
+    hash_map = hash_map_sc.HashMap(11, hash)
+    put_many_time = _time(lambda: hash_map.put_many(pairs))
+    get_many_time = _time(lambda: hash_map.get_many(keys))
+    print(f"hash_map_sc.HashMap: put_many {put_many_time:.3f}s, get_many {get_many_time:.3f}s")
+
+    for shards in (1, 2, 4):
+        with ShardedHashMap(shards, 11, hash) as sharded_map:
+            put_many_time = _time(lambda: sharded_map.put_many(pairs))
+            get_many_time = _time(lambda: sharded_map.get_many(keys))
+        print(f"ShardedHashMap, {shards} shards: put_many {put_many_time:.3f}s, get_many {get_many_time:.3f}s")
+
+
+def benchmark_shared(num_pairs: int = 200000) -> None:
+    """
+    Compare what each worker process pays at startup to get a lookup table: building its own hash_map_oa.HashMap, against attaching to a
+    SharedHashMap built once.  Memory is the Python memory allocated by the worker (tracemalloc), which excludes the shared segment itself.
+    
+    The built-in hash is used for speed.  Every process of a real deployment needs the same hash, such as hash_function_1, or PYTHONHASHSEED set.
+    """
+    pairs = [('key' + str(i), 'value' + str(i)) for i in range(num_pairs)]
+    keys = [pair[0] for pair in pairs]
+    shared_map = SharedHashMap.build(pairs, hash)
+
+    def build_local_map():
+        hash_map = hash_map_oa.HashMap(11, hash)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    maps = []
+    for name, start in (('hash_map_oa.HashMap build', build_local_map),
+                        ('SharedHashMap.attach', lambda: SharedHashMap.attach(shared_map.name, hash))):
+        tracemalloc.start()
+        start_time = _time(lambda: maps.append(start()))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name}: startup {start_time * 1e3:.1f}ms, {memory / 1e6:.1f}MB allocated")
+
+    for name, hash_map in zip(('hash_map_oa.HashMap', 'SharedHashMap'), maps):
+        get_time = _time(lambda: [hash_map.get(key) for key in keys])
+        print(f"{name}: get loop {get_time:.3f}s")
+
+    maps[1].close()
+    shared_map.unlink()
+
+
+def benchmark_mmap(num_pairs: int = 100000) -> None:
+    """
+    Compare get on an in-memory hash_map_oa.HashMap against an MmapHashMap whose file is in the page cache (warm), and time reopening the file.
+    
+    The built-in hash is used for speed, which is only valid while the file is written and read by the same process.
+    """
+    pairs = [('key' + str(i), 'value' + str(i)) for i in range(num_pairs)]
+    keys = [pair[0] for pair in pairs]
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.bin')
+
+    memory_map = hash_map_oa.HashMap(11, hash)
+    memory_map.put_many(pairs)
+    file_map = MmapHashMap(path, 11, hash)
+    put_time = _time(lambda: [file_map.put(key, value) for key, value in pairs])
+    file_map.close()
+
+    open_time = _time(lambda: MmapHashMap(path, 11, hash).close())
+    file_map = MmapHashMap(path, 11, hash)
+    memory_get_time = _time(lambda: [memory_map.get(key) for key in keys])
+    file_get_time = _time(lambda: [file_map.get(key) for key in keys])
+    file_map.close()
+
+    print(f"MmapHashMap: put loop {put_time:.3f}s, open {open_time * 1e3:.2f}ms, file size {os.path.getsize(path) / 1e6:.1f}MB")
+    print(f"get loop: hash_map_oa.HashMap {memory_get_time:.3f}s, MmapHashMap (warm) {file_get_time:.3f}s")
+    os.remove(path)
+
+
+def benchmark_dump_load(num_pairs: int = 500000) -> None:
+    """
+    Compare rebuilding each HashMap with put_many against load from a dump file, which places every entry at its dumped index without hashing keys
+    or resizing.  The time to read the file is included in the load time.
+    """
+    pairs = [('key' + str(i), i) for i in range(num_pairs)]
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.bin')
+
+    for module in (hash_map_sc, hash_map_oa):
+        hash_map = module.HashMap(11, hash)
+        rebuild_time = _time(lambda: hash_map.put_many(pairs))
+        dump_time = _time(lambda: hash_map.dump(path))
+        load_time = _time(lambda: module.HashMap.load(path, hash))
+        print(f"{module.__name__}: put_many {rebuild_time:.3f}s, dump {dump_time:.3f}s, load {load_time:.3f}s "
+              f"({rebuild_time / load_time:.2f}x), file size {os.path.getsize(path) / 1e6:.1f}MB")
+
+    os.remove(path)
+
+
+def benchmark_wal(num_puts: int = 100000) -> None:
+    """
+    Compare a put loop on an in-memory hash_map_sc.HashMap against a DurableHashMap with different group commit sizes, with and without fsync.  The
+    puts are committed and closed at the end, so every configuration writes the same log.
+    """
+    pairs = [('key' + str(i), i) for i in range(num_puts)]
+
+    memory_map = hash_map_sc.HashMap(11, hash)
+    memory_time = _time(lambda: [memory_map.put(key, value) for key, value in pairs])
+    print(f"in-memory put loop {memory_time:.3f}s")
+
+    for group_size, fsync in ((1, True), (64, True), (1024, True), (1024, False)):
+        # GROUP SIZE 1 SYNCS EVERY PUT, SO IT IS TIMED ON A TENTH OF THE PUTS
+        num_pairs = num_puts // 10 if group_size == 1 else num_puts
+        durable_map = DurableHashMap(tempfile.mkdtemp(), 11, hash, group_size=group_size, fsync=fsync, checkpoint_every=None)
+
+        def put_all() -> None:
+            for key, value in pairs[:num_pairs]:
+                durable_map.put(key, value)
+            durable_map.close()
+
+        durable_time = _time(put_all) * num_puts / num_pairs
+        print(f"DurableHashMap group_size={group_size}, fsync={fsync}: {durable_time:.3f}s ({durable_time / memory_time:.1f}x in-memory)")
+
+    durable_map = DurableHashMap(tempfile.mkdtemp(), 11, hash, group_size=1024, checkpoint_every=None)
+    durable_map.put_many(pairs)
+    checkpoint_time = _time(durable_map.checkpoint)
+    durable_map.close()
+    print(f"checkpoint of {num_puts} keys {checkpoint_time:.3f}s")
+
+
+def benchmark_lru(num_requests: int = 300000, num_keys: int = 1000000, max_entries: int = 20000) -> None:
+    """
+    Compare caching a stream of requests with a skewed key distribution in an unbounded hash_map_sc.HashMap against an LRUCache limited to
+    max_entries keys: time per request, peak memory, and hit rate of the cache.
+    """
+    rng = random.Random(0)
+    keys = ['key' + str(int(num_keys ** rng.random())) for _ in range(num_requests)]
+
+    def serve(cache) -> None:
+        for key in keys:
+            if cache.get(key) is None:
+                cache.put(key, key * 4)
+
+    for name, make_cache in (('hash_map_sc.HashMap', lambda: hash_map_sc.HashMap(11, hash)),
+                             ('LRUCache', lambda: LRUCache(11, hash, max_entries=max_entries))):
+        tracemalloc.start()
+        cache = make_cache()
+        serve_time = _time(lambda: serve(cache))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name}: {serve_time:.3f}s, {cache.get_size()} keys, peak memory {peak / 1e6:.1f}MB")
+
+    print(f"LRUCache {cache.cache_info()}, hit rate {cache.cache_info().hits / num_requests:.1%}")
+
+
+def benchmark_ttl(num_keys: int = 200000) -> None:
+    """
+    Compare one full scan that removes every expired key against expire_cycle, for a TTLHashMap where half of the keys have expired: the longest
+    pause of a cycle, and the number of cycles until expired keys make up at most a quarter of the keys left (the target of Redis).
+    """
+    for map_class in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        now = [0.0]
+
+        def build() -> TTLHashMap:
+            ttl_map = TTLHashMap(11, hash, map_class, clock=lambda: now[0])
+            ttl_map.put_many((('temp' + str(i), i) for i in range(num_keys // 2)), ttl=5)
+            ttl_map.put_many(('keep' + str(i), i) for i in range(num_keys // 2))
+            return ttl_map
+
+        now[0] = 0
+        ttl_map = build()
+        now[0] = 10
+        scan_time = _time(lambda: [ttl_map.contains_key(key) for key in list(ttl_map._map.keys())])
+
+        now[0] = 0
+        ttl_map = build()
+        now[0] = 10
+        cycles, longest_pause = 0, 0.0
+        while (ttl_map.get_size() - num_keys // 2) * 4 > ttl_map.get_size():
+            longest_pause = max(longest_pause, _time(ttl_map.expire_cycle))
+            cycles += 1
+
+        print(f"{map_class.__module__}: full scan {scan_time * 1e3:.1f}ms, expire_cycle longest pause {longest_pause * 1e3:.2f}ms, "
+              f"{cycles} cycles to reach 25% expired keys")
+
+
+def benchmark_find_mode(num_items: int = 1000000, num_distinct: int = 10000) -> None:
+    """
+    Compare find_mode against find_mode_parallel with one process (chunked counting in pre-sized maps, hashing each chunk in one batch, and merging
+    the partial counts) and with one process per CPU.  On a single CPU the pool cannot run faster than one process.
+    """
+    rng = random.Random(0)
+    da = DynamicArray(['item' + str(rng.randrange(num_distinct)) for _ in range(num_items)])
+
+    serial_time = _time(lambda: hash_map_sc.find_mode(da))
+    single_time = _time(lambda: hash_map_sc.find_mode_parallel(da, processes=1))
+    processes = os.cpu_count() or 1
+    parallel_time = _time(lambda: hash_map_sc.find_mode_parallel(da, processes=processes))
+
+    print(f"find_mode {serial_time:.3f}s, find_mode_parallel 1 process {single_time:.3f}s ({serial_time / single_time:.2f}x), "
+          f"{processes} processes {parallel_time:.3f}s ({serial_time / parallel_time:.2f}x)")
+
+
+def benchmark_heavy_hitters(num_items: int = 300000) -> None:
+    """
+    Compare find_mode against HeavyHitters on a skewed stream of items drawn from 100000 distinct items (log-uniformly, so small numbers are
+    frequent): time, peak memory (the input itself is allocated before tracing starts), and whether the approximate mode is the exact one.
+    """
+    rng = random.Random(0)
+    da = DynamicArray(['item' + str(int(100000 ** rng.random())) for _ in range(num_items)])
+
+    tracemalloc.start()
+    exact_time = _time(lambda: hash_map_sc.find_mode(da))
+    exact_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+
+    heavy_hitters = HeavyHitters(k=100, epsilon=0.001, delta=0.01)
+    approximate_time = _time(lambda: heavy_hitters.update_many(da[i] for i in range(da.length())))
+    approximate_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    exact_mode, exact_frequency = hash_map_sc.find_mode(da)
+    approximate_mode, approximate_frequency = heavy_hitters.mode()
+    print(f"find_mode {exact_time:.3f}s, peak memory {exact_peak / 1e6:.1f}MB, mode {exact_mode} x{exact_frequency}")
+    print(f"HeavyHitters {approximate_time:.3f}s, peak memory {approximate_peak / 1e6:.1f}MB, mode {approximate_mode} x{approximate_frequency}, "
+          f"bounds {heavy_hitters.top(1)[0].lower}..{heavy_hitters.top(1)[0].upper}")
+
+
+def benchmark_increment(num_updates: int = 100000, num_keys: int = 5000) -> None:
+    """
+    Compare counting with get followed by put (as find_mode did) against increment, which hashes the key and searches for it once, on both HashMaps.
+    """
+    rng = random.Random(0)
+    keys = ['key' + str(rng.randrange(num_keys)) for _ in range(num_updates)]
+
+    def count_with_get_put(hash_map) -> None:
+        for key in keys:
+            count = hash_map.get(key)
+            hash_map.put(key, 1 if count is None else count + 1)
+
+    def count_with_increment(hash_map) -> None:
+        for key in keys:
+            hash_map.increment(key)
+
+    for module in (hash_map_sc, hash_map_oa):
+        get_put_time = _time(lambda: count_with_get_put(module.HashMap(11, hash_function_1)))
+        increment_time = _time(lambda: count_with_increment(module.HashMap(11, hash_function_1)))
+        print(f"{module.__name__}: get + put {get_put_time:.3f}s, increment {increment_time:.3f}s ({get_put_time / increment_time:.2f}x)")
+
+
+def benchmark_shrink(num_keys: int = 200000, num_kept: int = 1000) -> None:
+    """
+    Fill both HashMaps with num_keys keys, then remove all but num_kept of them, with and without a shrink threshold: the time of the removes, the
+    capacity and the memory still held by the map after the purge (measured in a second run, as tracing slows the removes down), and the time of
+    empty_buckets and clear afterwards.
+    """
+    keys = ['key' + str(i) for i in range(num_keys)]
+
+    def purge(module, threshold: float):
+        hash_map = module.HashMap(11, hash, shrink_threshold=threshold)
+        hash_map.put_many((key, None) for key in keys)
+        remove_time = _time(lambda: hash_map.remove_many(keys[num_kept:]))
+        return hash_map, remove_time
+
+    for module, shrink_threshold in ((hash_map_sc, 0.25), (hash_map_oa, 0.125)):
+        for threshold in (None, shrink_threshold):
+            tracemalloc.start()
+            hash_map, _ = purge(module, threshold)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del hash_map
+
+            hash_map, remove_time = purge(module, threshold)
+            capacity = hash_map.get_capacity()
+            empty_buckets_time = _time(hash_map.empty_buckets)
+            clear_time = _time(hash_map.clear)
+            print(f"{module.__name__} shrink_threshold={threshold}: remove {remove_time:.3f}s, capacity {capacity}, memory {memory / 1e6:.1f}MB, "
+                  f"empty_buckets {empty_buckets_time * 1e3:.2f}ms, clear {clear_time * 1e3:.2f}ms")
+
+
+def benchmark_capacity_policy(num_keys: int = 200000) -> None:
+    """
+    Compare the prime and power_of_two capacity policies of both HashMaps: a put loop growing the table from 11 buckets (including every resize), a
+    get loop over the same keys, and put_many into an empty table.  The built-in hash spreads its bits well, while hash_function_2 is a weak
+    hash, whose low bits are poorly spread.  Both are mixed with the power_of_two policy.
+    """
+    keys = ['key' + str(i) for i in range(num_keys)]
+
+    def put_loop(hash_map) -> None:
+        for key in keys:
+            hash_map.put(key, None)
+
+    def get_loop(hash_map) -> None:
+        for key in keys:
+            hash_map.get(key)
+
+    for function, num in ((hash, num_keys), (hash_function_2, num_keys // 4)):
+        keys = keys[:num]
+        for module in (hash_map_sc, hash_map_oa):
+            for capacity_policy in ('prime', 'power_of_two'):
+                hash_map = module.HashMap(11, function, capacity_policy=capacity_policy)
+                put_time = _time(lambda: put_loop(hash_map))
+                get_time = _time(lambda: get_loop(hash_map))
+                put_many_time = _time(lambda: module.HashMap(11, function, capacity_policy=capacity_policy).put_many((key, None) for key in keys))
+                print(f"{module.__name__} {function.__name__} {capacity_policy}: put {put_time:.3f}s, get {get_time:.3f}s, put_many {put_many_time:.3f}s, "
+                      f"capacity {hash_map.get_capacity()}, empty buckets {hash_map.empty_buckets()}")
+
+
+if __name__ == "__main__":
+
+    print("\nput_many / get_many vs put / get loop")
+    print("-------------------------------------")
+    benchmark_put_many()
+
+    print("\nhash_map_oa.HashMap vs ArrayHashMap")
+    print("-----------------------------------")
+    benchmark_array_hash_map()
+
+    print("\nhash_map_oa.HashMap put latency with incremental resizing")
+    print("--------------------------------------------------------")
+    benchmark_incremental_resize()
+
+    print("\nhash_map_oa.HashMap insert/delete churn")
+    print("---------------------------------------")
+    benchmark_churn()
+
+    print("\nhash_map_oa.HashMap probing strategies")
+    print("--------------------------------------")
+    benchmark_probing()
+
+    print("\nhash_map_sc.HashMap with tree buckets, all keys colliding")
+    print("--------------------------------------------------------")
+    benchmark_treeify()
+
+    print("\nConcurrentHashMap vs global lock, throughput by thread count")
+    print("-----------------------------------------------------------")
+    benchmark_concurrent()
+
+    print("\nSnapshotHashMap read-heavy throughput and snapshot cost")
+    print("------------------------------------------------------")
+    benchmark_snapshot()
+
+    print("\nShardedHashMap bulk load and lookup")
+    print("-----------------------------------")
+    benchmark_sharded()
+
+    print("\nSharedHashMap worker startup")
+    print("----------------------------")
+    benchmark_shared()
+
+    print("\nMmapHashMap vs in-memory hash_map_oa.HashMap")
+    print("--------------------------------------------")
+    benchmark_mmap()
+
+    print("\ndump / load vs put_many")
+    print("-----------------------")
+    benchmark_dump_load()
+
+    print("\nDurableHashMap put throughput by group commit size")
+    print("--------------------------------------------------")
+    benchmark_wal()
+
+    print("\nLRUCache vs unbounded HashMap as a cache")
+    print("----------------------------------------")
+    benchmark_lru()
+
+    print("\nTTLHashMap expire_cycle pause vs full scan")
+    print("------------------------------------------")
+    benchmark_ttl()
+
+    print("\nfind_mode vs find_mode_parallel")
+    print("-------------------------------")
+    benchmark_find_mode()
+
+    print("\nfind_mode vs streaming HeavyHitters")
+    print("-----------------------------------")
+    benchmark_heavy_hitters()
+
+    print("\nget + put vs increment")
+    print("----------------------")
+    benchmark_increment()
+
+    print("\nshrinking after a purge")
+    print("-----------------------")
+    benchmark_shrink()
+
+    print("\nprime vs power of two capacities")
+    print("--------------------------------")
+    benchmark_capacity_policy()
@@ -0,0 +1,130 @@
+# Description:      Capacity policies of hash_map_sc.HashMap and hash_map_oa.HashMap, selected with their capacity_policy argument:
+#
+#                       prime           - every capacity is a prime number (found by trial division), and the index of a hash is hash % capacity.
+#                                         Every bit of the hash affects the index, so the hash function is used as it is.
+#                       power_of_two    - every capacity is a power of two, and the index of a hash is hash & (capacity - 1), its low bits.  Growing
+#                                         the table needs no prime search, and masking is cheaper than dividing.  The low bits of a weak hash function
+#                                         (such as hash_function_1, a sum of code points) are poorly spread, so every hash first goes through mix_hash,
+#                                         a finalizer that makes each low bit depend on the whole hash.  The maps cache the mixed hash.
+#
+#                   With power_of_two, the maps index their buckets with a mask (hash_map_sc.HashMap keeps it in _mask), and every probe sequence of
+#                   hash_map_oa.HashMap is masked, except robin_hood probing: its distances to the initial index are still taken % capacity, which
+#                   equals the mask for a power of two, to keep one version of its insert and delete.
+#
+#                   NumPy is optional, and only used to mix a batch of hashes at once.
+
+
+import functools
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+# CAPACITY POLICIES THAT CAN BE SELECTED WITH THE capacity_policy ARGUMENT OF THE HASH MAPS
+CAPACITY_POLICIES = ('prime', 'power_of_two')
+
+# ODD MULTIPLIER OF mix_hash (2^32 DIVIDED BY THE GOLDEN RATIO), AND THE 32 BITS KEPT OF EACH MIXED HASH
+_MULTIPLIER = 0x9E3779B1
+_MASK_32 = (1 << 32) - 1
+
+
+def is_prime(capacity: int) -> bool:
+    """Return True if the given capacity is a prime number, found by trial division by the odd numbers up to its square root."""
+    if capacity == 2 or capacity == 3:
+        return True
+    if capacity < 2 or capacity % 2 == 0:
+        return False
+
+    factor = 3
+    while factor * factor <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime number that is at least the given capacity, the same as the _next_prime method of the HashMaps.  It is used by the
+    tables that are not a HashMap but share its prime capacities.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two that is at least the given capacity, and at least 2."""
+    return 1 << max(capacity - 1, 1).bit_length()
+
+
+def mix_hash(_hash: int) -> int:
+    """
+    Return the mixed 32 bit hash of a hash.  The high half of the low 64 bits is folded onto the low half, multiplied by an odd constant (which carries
+    every bit into the bits above it), and the high 16 bits of the product are folded back onto the low 16 bits.  The multiplication and the last fold
+    are each a bijection of 32 bit values, so the mixer never maps two different folded hashes to the same 32 bit result.  It only spreads them: once 
+    masked to the size of a table, different hashes can still land on the same index.  The result is small enough for the fast paths of python int 
+    arithmetic.
+    """
+    _hash = ((_hash ^ (_hash >> 32)) * _MULTIPLIER) & _MASK_32
+    return _hash ^ (_hash >> 16)
+
+
+def _mixed_hash(function: callable, key: str) -> int:
+    """Hash a key with the given hash function, then mix the hash the same as mix_hash (inlined, as it runs for every key looked up)."""
+    _hash = function(key)
+    _hash = ((_hash ^ (_hash >> 32)) * _MULTIPLIER) & _MASK_32
+    return _hash ^ (_hash >> 16)
+
+
+def mixed_hash_function(function: callable) -> callable:
+    """
+    Return a hash function that gives the mixed hash of the given hash function.  It can be pickled if the given function can.  The built-in hash is
+    mixed as well: the hash of a string is already well spread, but the hash of an int is the int itself, whose low bits alone would pick the bucket.
+    """
+    return functools.partial(_mixed_hash, function)
+
+
+def mix_batch(hashes: list) -> list:
+    """
+    Return a list with the mixed hash of every hash of a list, computed with NumPy when it is available and every hash fits in 64 bits.  The results are
+    identical to calling mix_hash on each hash, as the 64 bit products keep the same low 32 bits.
+    """
+    if np is None or not hashes:
+        return [mix_hash(_hash) for _hash in hashes]
+
+    try:
+        array = np.array(hashes, dtype=np.int64)
+    except OverflowError:
+        return [mix_hash(_hash) for _hash in hashes]
+
+    array = ((array ^ (array >> 32)) * _MULTIPLIER) & _MASK_32
+    return (array ^ (array >> 16)).tolist()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from a6_include import hash_function_1
+
+    print("\nnext_prime example 1")
+    print("--------------------")
+    print([next_prime(capacity) for capacity in (0, 1, 2, 3, 11, 16, 100, 1000)])
+
+    print("\nnext_power_of_two example 1")
+    print("---------------------------")
+    print([next_power_of_two(capacity) for capacity in (0, 1, 2, 3, 11, 16, 17, 1000)])
+
+    print("\nmix_hash example 1")
+    print("------------------")
+    # HASHES THAT ONLY DIFFER IN THEIR HIGH BITS (HERE, MULTIPLES OF 64) ALL HAVE THE SAME LOW BITS.  MIXED, THEY SPREAD OVER THE BUCKETS OF A SMALL TABLE
+    hashes = [i * 64 for i in range(10)]
+    print([_hash & 15 for _hash in hashes])
+    print([mix_hash(_hash) & 15 for _hash in hashes])
+    print(mix_batch(hashes + [-1, 2 ** 63 - 1]) == [mix_hash(_hash) for _hash in hashes + [-1, 2 ** 63 - 1]],
+          mixed_hash_function(hash_function_1)('key1') == mix_hash(hash_function_1('key1')))
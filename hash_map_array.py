@@ -0,0 +1,357 @@
+# Description:      An open addressing (quadratic probing) HashMap with the same public methods as hash_map_oa.HashMap, which stores its table in
+#                   parallel flat arrays instead of one HashEntry object per slot:
+#
+#                       keys    - python list of keys
+#                       values  - python list of values
+#                       hashes  - array of 64 bit integers, the hash of each key computed when it was inserted
+#                       states  - bytearray, one byte per slot: EMPTY, LIVE or TOMBSTONE
+#
+#                   A slot costs 25 bytes plus the key and value themselves, instead of a HashEntry object (with its attribute dictionary) per slot, and
+#                   the probing loops index python lists and bytearrays directly instead of going through DynamicArray.get_at_index.
+
+
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_vectorized import hash_batch
+
+
+# SLOT STATES STORED IN THE STATES BYTEARRAY
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+# HASHES ARE STORED AS SIGNED 64 BIT INTEGERS, SO ONLY THE LOW 63 BITS OF THE HASH FUNCTION'S RESULT ARE KEPT
+_HASH_MASK = (1 << 63) - 1
+
+
+class ArrayHashMap:
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision resolution, with its table stored in parallel flat arrays.
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._hashes = array('q', bytes(8 * self._capacity))
+        self._states = bytearray(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_oa.HashMap
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                is_tombstone = self._states[i] == _TOMBSTONE
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} TS: {is_tombstone}\n"
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str, _hash: int) -> int:
+        """
+        This helper method returns the index of the LIVE slot holding the given key, or -1 if the key is not in the hash table.
+
+        It probes quadratically from the key's initial index until the key or an EMPTY slot is found.  Tombstones are skipped, as keys inserted after a
+        collision may be located after them.  The stored hashes are compared before the keys, so most non-matching slots are skipped without a string
+        comparison.
+        """
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+
+        index = _hash % capacity
+        quad_index = index
+        j = 1
+        while states[quad_index] != _EMPTY:
+            if states[quad_index] == _LIVE and hashes[quad_index] == _hash and keys[quad_index] == key:
+                return quad_index
+
+            quad_index = (index + j * j) % capacity   # QUADRATIC PROBING TO INCREMENT INDEX UNTIL KEY IS FOUND OR SLOT IS EMPTY
+            j += 1
+
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method adds a new key/value pair into the hash table, or updates the value if the key already exists.
+
+        Like hash_map_oa.HashMap, the table is resized to double the current capacity (to the nearest prime number) if the table load would exceed 0.5
+        after inserting.  If live entries and tombstones together would fill more than half of the slots, the table is rebuilt at the same capacity to drop
+        the tombstones.  Quadratic probing only visits (capacity + 1) / 2 distinct slots, so keeping at most half of the slots filled guarantees that
+        probing always reaches an EMPTY slot.
+        """
+        # RESIZE IF MORE THAN HALF OF THE HASH TABLE'S SLOTS WOULD BE FILLED, OR REBUILD AT THE SAME CAPACITY IF TOMBSTONES MAKE UP THE DIFFERENCE
+        if 2 * (self._size + self._tombstones + 1) > self._capacity:
+            if 2 * (self._size + 1) > self._capacity:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+
+        self._insert(key, value, self._hash_function(key) & _HASH_MASK)
+
+    def _insert(self, key: str, value: object, _hash: int) -> None:
+        """
+        This helper method inserts or updates a key/value pair whose hash has already been computed, without checking the table load.
+
+        The probe sequence is walked once.  The first tombstone found is remembered, and the new key/value is placed there if the probing reaches an EMPTY
+        slot without finding the key.
+        """
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+
+        index = _hash % capacity
+        quad_index = index
+        first_tombstone = -1
+        j = 1
+        while states[quad_index] != _EMPTY:
+            if states[quad_index] == _TOMBSTONE:
+                if first_tombstone == -1:
+                    first_tombstone = quad_index
+            # IF THE KEY ALREADY EXISTS, SIMPLY UPDATE THE VALUE AND RETURN
+            elif hashes[quad_index] == _hash and keys[quad_index] == key:
+                self._values[quad_index] = value
+                return
+
+            quad_index = (index + j * j) % capacity
+            j += 1
+
+        # THE KEY IS NOT IN THE TABLE.  REUSE THE FIRST TOMBSTONE IF ONE WAS FOUND, OTHERWISE THE EMPTY SLOT THE PROBING ENDED AT
+        if first_tombstone != -1:
+            quad_index = first_tombstone
+            self._tombstones -= 1
+
+        keys[quad_index] = key
+        self._values[quad_index] = value
+        hashes[quad_index] = _hash
+        states[quad_index] = _LIVE
+        self._size += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples into the hash table, resizing the table at most once up front.
+        """
+        pairs = list(pairs)
+
+        # SIZE THE TABLE ONCE SO AT MOST HALF OF THE SLOTS (INCLUDING TOMBSTONES) ARE FILLED AFTER THE WHOLE BATCH IS INSERTED
+        required_capacity = 2 * (self._size + len(pairs))
+        if 2 * (self._size + self._tombstones + len(pairs)) > self._capacity:
+            self.resize_table(max(required_capacity, self._capacity))
+
+        # HASH ALL KEYS OF THE BATCH AT ONCE, THEN INSERT EACH PAIR
+        hashes = hash_batch((pair[0] for pair in pairs), self._hash_function)
+        for (key, value), _hash in zip(pairs, hashes):
+            self._insert(key, value, _hash & _HASH_MASK)
+
+    def table_load(self) -> float:
+        """
+        This method returns the table load factor: num elements (size) / num slots (capacity)
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        This method returns the number of EMPTY slots in the hash table.  A tombstone is NOT considered an empty bucket.
+        """
+        return self._states.count(_EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        This method resizes the hash table to the given capacity (incremented to a prime number).  It does nothing if the new capacity is smaller than the
+        number of elements in the hash table.
+
+        Every LIVE slot is placed into new arrays using its stored hash, so no key is hashed again.  Tombstones are dropped.  Like the put method, the new
+        capacity is doubled while more than half of its slots would be filled.
+        """
+        # DO NOTHING IF NEW CAPACITY IS SMALLER THAN NUMBER OF ELEMENTS CURRENTLY IN THE HASH TABLE ( AS ELEMENTS WOULD BE LOST )
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._next_prime(new_capacity)
+        while 2 * self._size > new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        old_keys, old_values, old_hashes, old_states = self._keys, self._values, self._hashes, self._states
+        old_capacity = self._capacity
+
+        self._capacity = new_capacity
+        self._keys = [None] * new_capacity
+        self._values = [None] * new_capacity
+        self._hashes = array('q', bytes(8 * new_capacity))
+        self._states = bytearray(new_capacity)
+        self._tombstones = 0
+
+        # THE NEW ARRAYS HAVE NO TOMBSTONES, AND EACH KEY IS ONLY PRESENT ONCE, SO EACH LIVE SLOT IS PLACED AT THE FIRST EMPTY SLOT OF ITS PROBE SEQUENCE
+        states = self._states
+        for i in range(old_capacity):
+            if old_states[i] == _LIVE:
+                _hash = old_hashes[i]
+                index = _hash % new_capacity
+                quad_index = index
+                j = 1
+                while states[quad_index] != _EMPTY:
+                    quad_index = (index + j * j) % new_capacity
+                    j += 1
+
+                self._keys[quad_index] = old_keys[i]
+                self._values[quad_index] = old_values[i]
+                self._hashes[quad_index] = _hash
+                states[quad_index] = _LIVE
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value of a given key from the hash table, or None if the key is not in the hash table.
+        """
+        if self._size == 0:
+            return None
+
+        index = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the given key exists in the hash table, or False if it does not (or the hash table is empty).
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._hash_function(key) & _HASH_MASK) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes a given key and its value from the hash table by turning its slot into a tombstone, so that probing for keys located after it
+        does not end early.  The key and value are released.  If the key is not in the hash table, the method does nothing.
+        """
+        if self._size == 0:
+            return
+
+        index = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if index != -1:
+            self._states[index] = _TOMBSTONE
+            self._keys[index] = None
+            self._values[index] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        This method removes all key/value pairs from the hash table.  Capacity remains unchanged.
+        """
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._hashes = array('q', bytes(8 * self._capacity))
+        self._states = bytearray(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a new dynamic array, where each index is a tuple of a key/value pair stored in the hash table, in slot order.
+        """
+        da_tuples = DynamicArray()
+        for i in range(self._capacity):
+            if self._states[i] == _LIVE:
+                da_tuples.append((self._keys[i], self._values[i]))
+        return da_tuples
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nArrayHashMap - put example 1")
+    print("----------------------------")
+    m = ArrayHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nArrayHashMap - remove / contains_key example 1")
+    print("----------------------------------------------")
+    m = ArrayHashMap(53, hash_function_2)
+    for i in range(20):
+        m.put('key' + str(i), i)
+    for i in range(0, 20, 2):
+        m.remove('key' + str(i))
+    m.put('key1', 'updated')
+    print(m.get_size(), m.get('key1'), m.get('key2'), m.contains_key('key2'), m.contains_key('key3'))
+
+    print("\nArrayHashMap - resize example 1")
+    print("-------------------------------")
+    m = ArrayHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+        result = True
+        for key in keys:
+            result &= m.contains_key(str(key)) and not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nArrayHashMap - get_keys_and_values example 1")
+    print("--------------------------------------------")
+    m = ArrayHashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
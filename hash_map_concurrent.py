@@ -0,0 +1,378 @@
+# Description:      Thread-safe version of the separate chaining HashMap, using lock striping.  The buckets are split into a fixed number of contiguous
+#                   ranges (stripes), each protected by its own lock, so operations on keys in different stripes run at the same time instead of
+#                   waiting on one global lock.
+#
+#                   A resize changes the index of every key, so it takes the locks of all stripes (always in the same order, so two resizes cannot
+#                   deadlock).  An operation reads the capacity, locks the stripe of its bucket, and checks the capacity again - if a resize happened
+#                   in between, it unlocks and retries with the new capacity.
+
+
+import math
+import threading
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap
+from tree_bucket import TreeBucket
+
+
+class ConcurrentHashMap(HashMap):
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 treeify_threshold: int = 8,
+                 untreeify_threshold: int = 6,
+                 shrink_threshold: float = None,
+                 capacity_policy: str = 'prime',
+                 max_load: float = 1.0,
+                 grow_factor: float = 2) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for
+        collision resolution, and one lock for each of the given number of
+        stripes (ranges of buckets).  shrink_threshold, capacity_policy,
+        max_load and grow_factor are the same as for the separate chaining
+        HashMap, so both maps follow one resize policy.
+
+        The number of keys is counted per stripe, so that operations in
+        different stripes never update the same counter.
+        """
+        super().__init__(capacity, function, treeify_threshold, untreeify_threshold, shrink_threshold, capacity_policy, max_load, grow_factor)
+
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._stripe_sizes = [0] * stripes
+
+    def _stripe(self, index: int, capacity: int) -> int:
+        """
+        This helper method returns the stripe of the bucket at the given index, for a table of the given capacity.  Each stripe is a contiguous range of
+        buckets.
+        """
+        return index * len(self._locks) // capacity
+
+    def _lock_bucket(self, _hash: int) -> tuple:
+        """
+        This helper method locks the stripe of the bucket of the given hash, and returns a tuple of the bucket's index and its stripe.  The caller must
+        release self._locks[stripe].
+
+        If the table is resized after the capacity is read but before the stripe is locked, the index is out of date, so the stripe is released and the
+        bucket is looked up again.  A resize holds every stripe lock, so the capacity cannot change while any stripe is locked.
+        """
+        while True:
+            capacity = self._capacity
+            index = _hash & (capacity - 1) if self._mask is not None else _hash % capacity
+            stripe = self._stripe(index, capacity)
+            self._locks[stripe].acquire()
+            if capacity == self._capacity:
+                return index, stripe
+            self._locks[stripe].release()
+
+    def _lock_all(self) -> None:
+        """This helper method locks every stripe, in order."""
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """This helper method releases every stripe lock."""
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def get_size(self) -> int:
+        """
+        Return size of map.  While other threads are changing the map, the result is only an estimate.
+        """
+        return sum(self._stripe_sizes)
+
+    def table_load(self) -> float:
+        """
+        This method returns the load factor of the hash table as a float value.  While other threads are changing the map, the result is only an estimate.
+        """
+        return self.get_size() / self._capacity
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method inserts a new key/value pair into the hash table, or updates the value if the key already exists, holding only the lock of the key's
+        stripe.
+
+        If the table load is greater or equal to max_load, the table is grown first (by grow_factor).  The resize holds every stripe lock, and is skipped
+        if another thread has already resized the table in the meantime.
+        """
+        capacity = self._capacity
+        if self.get_size() / capacity >= self._max_load:
+            self._grow(capacity)
+
+        _hash = self._hash_key(key)
+        index, stripe = self._lock_bucket(_hash)
+        try:
+            hash_map_bucket = self._buckets[index]
+            existing_node_with_key = hash_map_bucket.contains(key, _hash)
+            if existing_node_with_key:
+                existing_node_with_key.value = value
+            else:
+                hash_map_bucket.insert(key, value, _hash)
+                self._stripe_sizes[stripe] += 1
+                self._treeify(index)
+        finally:
+            self._locks[stripe].release()
+
+    def _update(self, key: str, value: object, update: callable) -> object:
+        """
+        This helper method inserts or updates the key with the given update function, the same as the separate chaining HashMap, while holding only
+        the lock of the key's stripe, so increment, setdefault and upsert are atomic: no other thread can change the key between reading its current 
+        value and storing the new one.
+        """
+        capacity = self._capacity
+        if self.get_size() / capacity >= self._max_load:
+            self._grow(capacity)
+
+        _hash = self._hash_key(key)
+        index, stripe = self._lock_bucket(_hash)
+        try:
+            hash_map_bucket = self._buckets[index]
+            existing_node_with_key = hash_map_bucket.contains(key, _hash)
+            if existing_node_with_key:
+                existing_node_with_key.value = update(existing_node_with_key.value)
+                return existing_node_with_key.value
+
+            value = update(value)
+            hash_map_bucket.insert(key, value, _hash)
+            self._stripe_sizes[stripe] += 1
+            self._treeify(index)
+            return value
+        finally:
+            self._locks[stripe].release()
+
+    def _grow(self, capacity: int) -> None:
+        """
+        This helper method grows a table of the given capacity to the capacity put grows the separate chaining HashMap to.  If another thread resized the
+        table while this one was waiting for the stripe locks, the table is left unchanged.
+        """
+        self._lock_all()
+        try:
+            if self._capacity == capacity:
+                self._resize_locked(self._grown_capacity())
+        finally:
+            self._unlock_all()
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples into the hash table.  The table is resized at most once up front,
+        then each pair is inserted with put.
+        """
+        pairs = list(pairs)
+
+        self._lock_all()
+        try:
+            required_capacity = math.ceil((sum(self._stripe_sizes) + len(pairs)) / self._max_load)
+            if required_capacity > self._capacity:
+                self._resize_locked(required_capacity)
+        finally:
+            self._unlock_all()
+
+        for key, value in pairs:
+            self.put(key, value)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        This method updates the capacity of the hash table, the same as the separate chaining HashMap, while holding every stripe lock.
+        """
+        self._lock_all()
+        try:
+            self._resize_locked(new_capacity)
+        finally:
+            self._unlock_all()
+
+    def _resize_locked(self, new_capacity: int) -> None:
+        """
+        This helper method resizes the table while every stripe lock is held, and counts the keys of each stripe again, as the stripe of each bucket
+        depends on the capacity.
+        """
+        self._size = sum(self._stripe_sizes)
+        super().resize_table(new_capacity)
+        self._count_stripes()
+
+    def _count_stripes(self) -> None:
+        """
+        This helper method counts the keys of each stripe from the lengths of its buckets.
+        """
+        self._stripe_sizes = [0] * len(self._locks)
+        for i in range(self._capacity):
+            self._stripe_sizes[self._stripe(i, self._capacity)] += self._buckets[i].length()
+
+    def dump(self, path: str) -> None:
+        """
+        This method writes the hash map to a binary file, the same as the separate chaining HashMap, while holding every stripe lock.
+        """
+        self._lock_all()
+        try:
+            super().dump(path)
+        finally:
+            self._unlock_all()
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, **kwargs) -> "ConcurrentHashMap":
+        """
+        This method reads a hash map written by dump, the same as the separate chaining HashMap, and counts the keys of each stripe.  Other keyword 
+        arguments (such as stripes) are passed to the constructor.
+        """
+        hash_map = super().load(path, function, **kwargs)
+        hash_map._count_stripes()
+        return hash_map
+
+    def get(self, key: str):
+        """
+        This method returns the value of the given key, or None if the key is not in the hash table, holding only the lock of the key's stripe.
+        """
+        _hash = self._hash_key(key)
+        index, stripe = self._lock_bucket(_hash)
+        try:
+            node = self._buckets[index].contains(key, _hash)
+            return None if node is None else node.value
+        finally:
+            self._locks[stripe].release()
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys with get, and returns a dynamic array of their values in the same order.  Each lookup
+        holds only the lock of its key's stripe.
+        """
+        values = DynamicArray()
+        for key in keys:
+            values.append(self.get(key))
+        return values
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the key is in the hash table, holding only the lock of the key's stripe.
+        """
+        _hash = self._hash_key(key)
+        index, stripe = self._lock_bucket(_hash)
+        try:
+            return self._buckets[index].contains(key, _hash) is not None
+        finally:
+            self._locks[stripe].release()
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its value from the hash table, if present, holding only the lock of the key's stripe.  With automatic 
+        shrinking on, the table is then shrunk if its load has fallen below the shrink threshold.
+        """
+        _hash = self._hash_key(key)
+        index, stripe = self._lock_bucket(_hash)
+        try:
+            hash_map_bucket = self._buckets[index]
+            if hash_map_bucket.remove(key, _hash):
+                self._stripe_sizes[stripe] -= 1
+
+                # CONVERT A TREE BUCKET THAT HAS SHRUNK BACK INTO A LINKED LIST
+                if isinstance(hash_map_bucket, TreeBucket) and hash_map_bucket.length() <= self._untreeify_threshold:
+                    self._buckets[index] = hash_map_bucket.to_linked_list()
+        finally:
+            self._locks[stripe].release()
+
+        self._shrink()
+
+    def remove_many(self, keys) -> None:
+        """
+        This method removes every key from an iterable of keys with remove, each holding only the lock of its key's stripe.
+        """
+        for key in keys:
+            self.remove(key)
+
+    def _shrink(self) -> None:
+        """
+        This helper method halves the capacity of the hash table, the same as the separate chaining HashMap, while holding every stripe lock.  The table
+        load is checked again once the locks are held, as another thread may have resized the table in the meantime.
+        """
+        if self._shrink_threshold is None or self.table_load() >= self._shrink_threshold:
+            return
+
+        self._lock_all()
+        try:
+            if self._capacity > self._min_capacity and sum(self._stripe_sizes) / self._capacity < self._shrink_threshold:
+                self._resize_locked(max(self._capacity // 2, self._min_capacity))
+        finally:
+            self._unlock_all()
+
+    def clear(self) -> None:
+        """
+        This method removes every key/value pair from the hash table, holding every stripe lock.  The capacity remains unchanged, unless automatic 
+        shrinking is on.
+        """
+        self._lock_all()
+        try:
+            super().clear()
+            self._stripe_sizes = [0] * len(self._locks)
+        finally:
+            self._unlock_all()
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of every node of the hash table, as of the moment the iteration starts.
+
+        Every stripe is locked while the nodes are collected (a list of references, the keys and values are not copied), then the locks are released
+        before the first node is returned, so other threads may keep changing the map during the iteration without affecting it.  Values updated in
+        place by put after the iteration started may be seen.
+        """
+        self._lock_all()
+        try:
+            nodes = []
+            for i in range(self._capacity):
+                nodes.extend(self._buckets[i])
+        finally:
+            self._unlock_all()
+
+        yield from nodes
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nConcurrentHashMap example 1")
+    print("---------------------------")
+    m = ConcurrentHashMap(11, hash_function_1, stripes=4)
+    for i in range(30):
+        m.put('key' + str(i), i)
+    m.remove('key0')
+    print(m.get_size(), m.get_capacity(), m.get('key29'), m.contains_key('key0'), sorted(m.values())[:5])
+
+    print("\nConcurrentHashMap stress example 1")
+    print("----------------------------------")
+    # EACH THREAD INSERTS, UPDATES, REMOVES AND READS ITS OWN RANGE OF KEYS, WHILE THE TABLE GROWS FROM 11 BUCKETS
+    m = ConcurrentHashMap(11, hash)
+    errors = DynamicArray()
+
+    def worker(thread_id: int) -> None:
+        keys = ['t' + str(thread_id) + '-' + str(i) for i in range(2000)]
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        for i, key in enumerate(keys):
+            m.put(key, i * 2)
+        for key in keys[::2]:
+            m.remove(key)
+        for i, key in enumerate(keys):
+            expected = None if i % 2 == 0 else i * 2
+            if m.get(key) != expected:
+                errors.append(key)
+
+    threads = [threading.Thread(target=worker, args=(thread_id,)) for thread_id in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_size() == sum(1 for _ in m.items()), errors.length())
+
+    print("\nConcurrentHashMap increment example 1")
+    print("-------------------------------------")
+    # EVERY THREAD INCREMENTS THE SAME COUNTERS, WHICH WOULD LOSE UPDATES WITH GET FOLLOWED BY PUT
+    m = ConcurrentHashMap(11, hash)
+
+    def count(thread_id: int) -> None:
+        for i in range(5000):
+            m.increment('counter' + str(i % 10))
+
+    threads = [threading.Thread(target=count, args=(thread_id,)) for thread_id in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(sorted(m.values()))
@@ -0,0 +1,134 @@
+# Description:      Binary file format shared by the dump / load methods of hash_map_sc.HashMap and hash_map_oa.HashMap.
+#
+#                   File layout:
+#                       header      - magic, format version, kind of map ('sc' or 'oa'), capacity, size, probing strategy (open addressing only),
+#                                     capacity policy (which the stored hashes depend on), name of the hash function and the hash it gives for a
+#                                     fixed probe key
+#                       body        - pickle of: the bucket index of every entry and the hash of its key (packed 64 bit integer arrays), the list of
+#                                     keys, the list of values, and the indices of tombstones (open addressing only)
+#
+#                   The name and probe hash identify the hash function.  The built-in hash of a string changes between processes (unless
+#                   PYTHONHASHSEED is set), so its probe hash does not match in another process, and the entries are hashed again on load.
+
+
+import contextlib
+import gc
+import importlib
+import pickle
+import struct
+from array import array
+
+
+_MAGIC = b'HMAPDUMP'
+_VERSION = 1
+
+# MAGIC, VERSION, KIND, CAPACITY, SIZE, PROBING, CAPACITY POLICY, FUNCTION PROBE HASH, FUNCTION NAME
+_FUNCTION_NAME_SIZE = 128
+_HEADER = struct.Struct(f'<8sH2sQQ16s16sq{_FUNCTION_NAME_SIZE}s')
+
+# KEY HASHED TO CHECK THAT A HASH FUNCTION GIVES THE SAME HASHES AS WHEN THE FILE WAS WRITTEN
+_PROBE_KEY = 'hash_map_io probe key'
+_HASH_MASK = (1 << 63) - 1
+
+
+def function_name(function: callable) -> str:
+    """Return the name of a hash function, as module.qualname."""
+    return function.__module__ + '.' + function.__qualname__
+
+
+def same_function(function: callable, name: str, probe_hash: int) -> bool:
+    """Return True if a hash function has the given name and gives the given probe hash, so it hashes keys as the function a file was written with."""
+    return function_name(function) == name and function(_PROBE_KEY) & _HASH_MASK == probe_hash
+
+
+def resolve_function(name: str) -> callable:
+    """
+    Return the module level function with the given module.qualname name, importing its module.  Raise ValueError if there is no such function.
+    """
+    module_name, _, qualname = name.rpartition('.')
+    try:
+        function = importlib.import_module(module_name)
+        for attribute in qualname.split('.'):
+            function = getattr(function, attribute)
+    except (ImportError, AttributeError, ValueError):
+        raise ValueError(f"hash function {name!r} of the dump file cannot be found; pass it to load") from None
+    return function
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """
+    Context manager that turns off the cyclic garbage collector while a map is loaded.  Loading creates millions of objects that all stay alive, and
+    would otherwise trigger many collections that each scan every object created so far without freeing any.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _pack_integers(integers: list):
+    """Return a list of integers packed as 64 bit integers, or the list itself if any of them does not fit."""
+    try:
+        return array('q', integers).tobytes()
+    except OverflowError:
+        return integers
+
+
+def _unpack_integers(packed) -> list:
+    """Return the list of integers packed by _pack_integers."""
+    if isinstance(packed, bytes):
+        integers = array('q')
+        integers.frombytes(packed)
+        return integers.tolist()
+    return packed
+
+
+def write_dump(path: str, kind: str, capacity: int, function: callable, indices: list, hashes: list, keys: list, values: list,
+               tombstones: list = (), probing: str = '', capacity_policy: str = 'prime') -> None:
+    """
+    Write a dump file.  indices, hashes, keys and values hold the bucket index, hash, key and value of every entry, in the order the entries are to be
+    placed back in their buckets.
+    """
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, kind.encode(), capacity, len(keys), probing.encode(), capacity_policy.encode(),
+                                function(_PROBE_KEY) & _HASH_MASK, function_name(function).encode()))
+        pickle.dump((_pack_integers(indices), _pack_integers(hashes), keys, values, _pack_integers(list(tombstones))),
+                    file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_dump(path: str, kind: str) -> dict:
+    """
+    Read a dump file written for the given kind of map, and return a dictionary of its capacity, size, probing, function_name, probe_hash, indices,
+    hashes, keys, values, tombstones and capacity_policy.  Raise ValueError if the file is not a dump of that kind of map.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path!r} is not a HashMap dump file")
+
+        _, version, file_kind, capacity, size, probing, capacity_policy, probe_hash, name = _HEADER.unpack(header)
+        if version != _VERSION:
+            raise ValueError(f"{path!r} uses dump format version {version}, expected {_VERSION}")
+        if file_kind.decode() != kind:
+            raise ValueError(f"{path!r} is a dump of a {file_kind.decode()!r} HashMap, not {kind!r}")
+
+        with gc_paused():
+            indices, hashes, keys, values, tombstones = pickle.load(file)
+
+    return {
+        'capacity': capacity,
+        'size': size,
+        'probing': probing.rstrip(b'\0').decode(),
+        'function_name': name.rstrip(b'\0').decode(),
+        'probe_hash': probe_hash,
+        'indices': _unpack_integers(indices),
+        'hashes': _unpack_integers(hashes),
+        'keys': keys,
+        'values': values,
+        'tombstones': _unpack_integers(tombstones),
+        'capacity_policy': capacity_policy.rstrip(b'\0').decode(),
+    }
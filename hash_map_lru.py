@@ -0,0 +1,281 @@
+# Description:      Bounded least recently used (LRU) cache built on the separate chaining HashMap.  The keys are stored in the HashMap's buckets as
+#                   usual, and every node is also linked into a doubly linked recency list, from the least to the most recently used key.  A get or
+#                   put moves the node of its key to the most recent end, and once the cache holds more than max_entries keys, or more than max_bytes
+#                   bytes, the nodes at the least recent end are evicted.  get, put and each eviction are O(1).
+
+
+import collections
+import sys
+
+from a6_include import DynamicArray, SLNode, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'size', 'bytes'])
+
+
+def entry_size(key: str, value: object) -> int:
+    """Default size of a cache entry in bytes: the size of the key and value objects themselves (objects they reference are not counted)."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class LRUNode(SLNode):
+    """
+    Singly Linked List node for use in a bucket of the LRUCache, also linked into the cache's doubly linked recency list
+    """
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        older and newer are the neighbours of the node in the recency
+        list, and size is the size of the entry counted against max_bytes.
+        """
+        super().__init__(key, value, next, hash)
+        self.older = None
+        self.newer = None
+        self.size = 0
+
+
+class LRUCache(HashMap):
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 sizeof: callable = entry_size,
+                 shrink_threshold: float = None) -> None:
+        """
+        Initialize new LRU cache that keeps at most max_entries keys and
+        at most max_bytes bytes of entries (as measured by sizeof(key,
+        value)), evicting the least recently used keys first.  At least one
+        of the two bounds must be given.
+
+        Buckets are always linked lists, as the recency list links the
+        nodes themselves, which a tree bucket would replace.  shrink_threshold
+        is the same as for the separate chaining HashMap, and only applies
+        to remove, not to evictions.
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError("LRUCache needs max_entries or max_bytes")
+
+        super().__init__(capacity, function, treeify_threshold=None, shrink_threshold=shrink_threshold)
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+
+        # SENTINEL OF THE CIRCULAR RECENCY LIST: ITS NEWER NODE IS THE LEAST RECENTLY USED, ITS OLDER NODE THE MOST RECENTLY USED
+        self._recency = LRUNode(None, None)
+        self._recency.older = self._recency.newer = self._recency
+
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ------------------------------------------------------------------ #
+
+    def _unlink(self, node: LRUNode) -> None:
+        """This helper method removes a node from the recency list."""
+        node.older.newer = node.newer
+        node.newer.older = node.older
+
+    def _link_newest(self, node: LRUNode) -> None:
+        """This helper method links a node at the most recent end of the recency list."""
+        sentinel = self._recency
+        node.older = sentinel.older
+        node.newer = sentinel
+        sentinel.older.newer = node
+        sentinel.older = node
+
+    def _find_node(self, key: str) -> LRUNode:
+        """This helper method returns the node of the given key, or None if the key is not in the cache."""
+        _hash = self._hash_key(key)
+        hash_map_bucket = self._buckets[_hash & self._mask if self._mask is not None else _hash % self._capacity]
+        if hash_map_bucket.length() == 0:
+            return None
+        return hash_map_bucket.contains(key, _hash)
+
+    def _delete_node(self, node: LRUNode) -> None:
+        """This helper method removes a node from its bucket and from the recency list."""
+        self._buckets[node.hash & self._mask if self._mask is not None else node.hash % self._capacity].remove(node.key, node.hash)
+        self._unlink(node)
+        self._size -= 1
+        self._bytes -= node.size
+        self._modifications += 1
+
+    def _evict(self) -> None:
+        """
+        This helper method evicts the least recently used keys until the cache is within both bounds.  An entry larger than max_bytes on its own is
+        evicted as well, so it is never kept.
+        """
+        while self._size > 0 and ((self._max_entries is not None and self._size > self._max_entries)
+                                  or (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            self._delete_node(self._recency.newer)
+            self._evictions += 1
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method inserts a new key/value pair into the cache, or updates the value of an existing key, and makes the key the most recently used.
+        The least recently used keys are then evicted while the cache is over max_entries or max_bytes.
+
+        The table is resized the same as the separate chaining HashMap, when the table load reaches 1.0.
+        """
+        self._update(key, value, None)
+
+    def _insert(self, key: str, value: object, _hash: int, update: callable = None) -> object:
+        """
+        This helper method inserts or updates a key/value pair whose hash has already been computed, the same as the separate chaining HashMap, and
+        returns the value stored for the key.  The node of the key becomes the most recently used, and the least recently used keys are then evicted 
+        while the cache is over either bound.  It is also used by increment, setdefault and upsert, so these keep the cache bounded as well.
+        """
+        hash_map_bucket = self._buckets[_hash & self._mask if self._mask is not None else _hash % self._capacity]
+        node = hash_map_bucket.contains(key, _hash) if hash_map_bucket.length() != 0 else None
+
+        if node is not None:
+            node.value = value if update is None else update(node.value)
+            self._unlink(node)
+        else:
+            node = LRUNode(key, value if update is None else update(value), hash=_hash)
+            hash_map_bucket.insert_node(node)
+            self._size += 1
+            self._modifications += 1
+
+        self._bytes -= node.size
+        node.size = self._sizeof(key, node.value)
+        self._bytes += node.size
+        self._link_newest(node)
+        self._evict()
+        return node.value
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples with put, in order, so later pairs are the most recently used.
+        The table is not sized up front, as most of a large batch may be evicted.
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys with get, in order, so each key found becomes the most recently used and counts a hit, 
+        and each key not found counts a miss.
+        """
+        values = DynamicArray()
+        for key in keys:
+            values.append(self.get(key))
+        return values
+
+    def remove_many(self, keys) -> None:
+        """This method removes every key from an iterable of keys with remove, so each key is also unlinked from the recency list."""
+        for key in keys:
+            self.remove(key)
+
+    def get(self, key: str):
+        """
+        This method returns the value of the given key, and makes the key the most recently used, counting a hit.  It returns None if the key is not in
+        the cache, counting a miss.
+        """
+        node = self._find_node(key)
+        if node is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._unlink(node)
+        self._link_newest(node)
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the key is in the cache.  It does not change the recency of the key, or count a hit or miss.
+        """
+        return self._find_node(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its value from the cache, if present.  The removal is not counted as an eviction.  With automatic shrinking
+        on, the table is then shrunk if its load has fallen below the shrink threshold.
+        """
+        node = self._find_node(key)
+        if node is not None:
+            self._delete_node(node)
+            self._shrink()
+
+    def clear(self) -> None:
+        """This method removes every key/value pair from the cache.  The capacity and the hit/miss/eviction counters remain unchanged."""
+        super().clear()
+        self._recency.older = self._recency.newer = self._recency
+        self._bytes = 0
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, **kwargs) -> "LRUCache":
+        """
+        This method reads a hash map written by dump, and returns a cache holding its key/value pairs, inserted in bucket order.  Keyword arguments
+        (max_entries, max_bytes, sizeof) are passed to the constructor.
+        """
+        hash_map = HashMap.load(path, function)
+        cache = cls(hash_map.get_capacity(), hash_map._hash_function, **kwargs)
+        cache.put_many(hash_map.items())
+        return cache
+
+    def cache_info(self) -> CacheInfo:
+        """This method returns the hit, miss and eviction counters, the number of keys, and the total size in bytes of the entries."""
+        return CacheInfo(self._hits, self._misses, self._evictions, self._size, self._bytes)
+
+    def get_bytes(self) -> int:
+        """Return the total size in bytes of the entries, as measured by sizeof"""
+        return self._bytes
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of every node of the cache, from the least to the most recently used.  Iterating does not change the recency
+        of any key.
+
+        get and put move a node to the most recently used end of the recency list without changing the map, so the order of the nodes is taken (as a
+        list of references, the keys and values are not copied) before the first node is returned.  Reading keys or updating their values during the 
+        iteration therefore returns each node exactly once.  It raises RuntimeError if a key is inserted or removed, or the table is resized, while the 
+        iteration is in progress.
+        """
+        modifications = self._modifications
+        nodes = []
+        node = self._recency.newer
+        while node is not self._recency:
+            nodes.append(node)
+            node = node.newer
+
+        for node in nodes:
+            yield node
+            if self._modifications != modifications:
+                raise RuntimeError("HashMap changed during iteration")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRUCache example 1")
+    print("------------------")
+    m = LRUCache(11, hash_function_1, max_entries=3)
+    m.put('a', 1)
+    m.put('b', 2)
+    m.put('c', 3)
+    print(m.get('a'), m.get('z'))
+    m.put('d', 4)
+    m.increment('c', 27)
+    m.put('e', 5)
+    print(list(m.items()), m.contains_key('b'), m.cache_info())
+    # READING EACH KEY DURING THE ITERATION MAKES IT THE MOST RECENTLY USED, BUT EACH KEY IS STILL VISITED ONCE
+    print([(key, m.get(key)) for key in m.keys()], list(m.keys()))
+
+    print("\nLRUCache example 2")
+    print("------------------")
+    m = LRUCache(11, hash_function_2, max_bytes=1000, sizeof=lambda key, value: len(value))
+    for i in range(50):
+        m.put('key' + str(i), 'x' * (i * 10))
+    print(list(m.keys()), m.get_bytes(), m.cache_info())
+    m.put('huge', 'x' * 2000)
+    m.remove('key49')
+    print(m.get('huge'), m.get_size(), m.get_bytes(), m.get_capacity())
@@ -0,0 +1,416 @@
+# Description:      File-backed version of the open addressing HashMap, for key sets too large to keep in memory as Python objects.  The table lives in a
+#                   file that is memory mapped (mmap), so the operating system's page cache decides which parts are in memory, and opening an existing
+#                   file only reads its header.
+#
+#                   File layout (little endian):
+#                       header      - magic, capacity, size, tombstones, offset of the slots, end of the used part of the file, hash function name
+#                       slots       - capacity fixed width slots: hash, key offset, value offset, key length, value length, state
+#                       heap        - the UTF-8 bytes of keys and string values, and the pickled bytes of other values, appended as they are written
+#
+#                   put / get / contains_key / remove / resize_table behave like hash_map_oa.HashMap (quadratic probing, prime capacities, tombstones,
+#                   resize at a table load of 0.5).  A resize writes a new slots region at the end of the file, so the heap never moves.  The file only
+#                   grows: the old slots region, and the bytes of removed keys and replaced values, are not reused.
+
+
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_capacity import next_prime
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+
+_MAGIC = b'MMHASH01'
+
+# MAGIC, CAPACITY, SIZE, TOMBSTONES, SLOTS OFFSET, END, HASH FUNCTION NAME
+_FUNCTION_NAME_SIZE = 64
+_HEADER = struct.Struct(f'<8sQQQQQ{_FUNCTION_NAME_SIZE}s')
+_COUNTS = struct.Struct('<QQQQQ')
+_COUNTS_OFFSET = 8
+
+# HASH, KEY OFFSET, VALUE OFFSET, KEY LENGTH, VALUE LENGTH, STATE
+_SLOT = struct.Struct('<qQQIIB7x')
+
+# LARGEST TABLE LOAD (LIVE SLOTS, AND LIVE SLOTS WITH TOMBSTONES) AND THE FACTOR THE CAPACITY GROWS BY, THE DEFAULTS OF hash_map_oa.HashMap.  QUADRATIC
+# PROBING OF A PRIME CAPACITY ONLY REACHES (capacity + 1) / 2 SLOTS, SO _MAX_LOAD MAY NOT BE GREATER THAN 0.5
+_MAX_LOAD = 0.5
+_GROW_FACTOR = 2
+
+# NUMBER OF OLD SLOTS READ FROM THE FILE AT A TIME BY resize_table
+_RESIZE_BLOCK_SLOTS = 4096
+
+# SLOT STATES
+_EMPTY = 0
+_STR_VALUE = 1
+_PICKLED_VALUE = 2
+_TOMBSTONE = 3
+
+
+class _Slot:
+    """
+    Key/value pair read from a slot, used by iteration
+    """
+
+    __slots__ = ('key', 'value')
+
+    def __init__(self, key: str, value: object) -> None:
+        self.key = key
+        self.value = value
+
+
+def _function_name(function: callable) -> bytes:
+    """Return the name of a hash function stored in the header, used to check that a file is opened with the hash function it was written with."""
+    return (function.__module__ + '.' + function.__qualname__).encode()[:_FUNCTION_NAME_SIZE]
+
+
+class MmapHashMap:
+    def __init__(self, path: str, capacity: int = 11, function: callable = hash_function_1) -> None:
+        """
+        Open the MmapHashMap stored in the file at the given path, or
+        create a new one with the given capacity if the file does not
+        exist or is empty.
+
+        Opening an existing file only reads its header, whatever the
+        number of keys.  The hash function must be the one the file was
+        written with, and must give the same hash in every process (the
+        built-in hash of a string does not, unless PYTHONHASHSEED is set).
+        """
+        self._hash_function = function
+        self._modifications = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'r+b' if not new_file else 'w+b')
+
+        if new_file:
+            capacity = next_prime(capacity)
+            self._file.truncate(_HEADER.size + capacity * _SLOT.size)
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            self._mmap[:_HEADER.size] = _HEADER.pack(_MAGIC, 0, 0, 0, 0, 0, _function_name(function))
+            self._capacity = 0
+            self._size = 0
+            self._tombstones = 0
+            self._end = _HEADER.size
+            self._new_slots(capacity)
+            return
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, self._capacity, self._size, self._tombstones, self._slots_offset, self._end, function_name = _HEADER.unpack_from(self._mmap, 0)
+        function_name = function_name.rstrip(b'\0')
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path!r} does not hold an MmapHashMap")
+        if function_name != _function_name(function):
+            self.close()
+            raise ValueError(f"MmapHashMap {path!r} was written with hash function {function_name.decode()}")
+
+    def __enter__(self) -> "MmapHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        out = ''
+        for index in range(self._capacity):
+            slot = self._slot(index)
+            if slot[5] == _EMPTY:
+                out += str(index) + ': None\n'
+            elif slot[5] == _TOMBSTONE:
+                out += str(index) + ': TS\n'
+            else:
+                out += str(index) + ': K: ' + self._key(slot) + ' V: ' + str(self._value(slot)) + '\n'
+        return out
+
+    def flush(self) -> None:
+        """This method writes every change made so far to the file."""
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """This method writes every change to the file and closes it.  The hash map must not be used afterwards."""
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+    # ------------------------------------------------------------------ #
+
+    def _write_counts(self) -> None:
+        """This helper method stores the capacity, size, tombstone count, slots offset and end of the file in the header."""
+        _COUNTS.pack_into(self._mmap, _COUNTS_OFFSET, self._capacity, self._size, self._tombstones, self._slots_offset, self._end)
+
+    def _reserve(self, num_bytes: int) -> int:
+        """
+        This helper method reserves the given number of bytes at the end of the used part of the file, growing the file (at least doubling it) if
+        needed, and returns the offset of the reserved bytes.
+        """
+        offset = self._end
+        if offset + num_bytes > len(self._mmap):
+            self._mmap.resize(max(2 * len(self._mmap), offset + num_bytes))
+        self._end = offset + num_bytes
+        return offset
+
+    def _append(self, data: bytes) -> int:
+        """This helper method appends bytes to the heap, and returns their offset."""
+        offset = self._reserve(len(data))
+        self._mmap[offset:offset + len(data)] = data
+        return offset
+
+    def _new_slots(self, capacity: int) -> None:
+        """
+        This helper method makes an empty slots region of the given capacity at the end of the file the current table.  The caller moves the live
+        slots of the old region into it.
+        """
+        self._slots_offset = self._reserve(capacity * _SLOT.size)
+        self._mmap[self._slots_offset:self._slots_offset + capacity * _SLOT.size] = bytes(capacity * _SLOT.size)
+        self._capacity = capacity
+        self._tombstones = 0
+        self._write_counts()
+
+    def _slot(self, index: int) -> tuple:
+        """This helper method returns the fields of the slot at the given index."""
+        return _SLOT.unpack_from(self._mmap, self._slots_offset + index * _SLOT.size)
+
+    def _write_slot(self, index: int, slot: tuple) -> None:
+        """This helper method writes the fields of the slot at the given index."""
+        _SLOT.pack_into(self._mmap, self._slots_offset + index * _SLOT.size, *slot)
+
+    def _key(self, slot: tuple) -> str:
+        """This helper method reads the key of a slot from the heap."""
+        return self._mmap[slot[1]:slot[1] + slot[3]].decode()
+
+    def _value(self, slot: tuple) -> object:
+        """This helper method reads the value of a slot from the heap."""
+        value_bytes = self._mmap[slot[2]:slot[2] + slot[4]]
+        if slot[5] == _STR_VALUE:
+            return value_bytes.decode()
+        return pickle.loads(value_bytes)
+
+    def _encode_value(self, value: object) -> tuple:
+        """This helper method returns the state and bytes of a value: UTF-8 for a string, pickled otherwise."""
+        if isinstance(value, str):
+            return _STR_VALUE, value.encode()
+        return _PICKLED_VALUE, pickle.dumps(value)
+
+    def _find_index(self, key_bytes: bytes, _hash: int) -> int:
+        """
+        This helper method returns the index of the live slot holding the given key, or None if the key is not present.  It uses quadratic probing from
+        the key's initial index until the key or an empty slot is found, skipping tombstones.
+        """
+        index = _hash % self._capacity
+        quad_index = index
+        j = 1
+
+        while True:
+            slot = self._slot(quad_index)
+            if slot[5] == _EMPTY:
+                return None
+
+            if slot[5] != _TOMBSTONE and slot[0] == _hash and slot[3] == len(key_bytes) and self._mmap[slot[1]:slot[1] + slot[3]] == key_bytes:
+                return quad_index
+
+            quad_index = (index + j**2) % self._capacity
+            j += 1
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """Return the number of tombstones in the table"""
+        return self._tombstones
+
+    def table_load(self) -> float:
+        """Return the load factor of the hash table: num elements (size) / num buckets (capacity)."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty slots (a tombstone is not empty, as in hash_map_oa.HashMap)."""
+        return self._capacity - self._size - self._tombstones
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method inserts a new key/value pair, or updates the value if the key already exists.  The key and value bytes are appended to the heap.
+
+        As in hash_map_oa.HashMap, the capacity grows by _GROW_FACTOR when the new key would bring the table load over _MAX_LOAD, and the table is 
+        rebuilt without its tombstones when live slots and tombstones together would fill more than _MAX_LOAD of the slots.  Quadratic probing only 
+        reaches (capacity + 1) / 2 of the slots, so at most half of them may be filled for every probe sequence to end at an empty slot.
+        """
+        if self._size + 1 > self._capacity * _MAX_LOAD:
+            self.resize_table(self._capacity * _GROW_FACTOR)
+        elif self._size + self._tombstones + 1 > self._capacity * _MAX_LOAD:
+            self.resize_table(self._capacity)
+
+        _hash = self._hash_function(key)
+        key_bytes = key.encode()
+        state, value_bytes = self._encode_value(value)
+
+        # WALK THE PROBE SEQUENCE ONCE, REMEMBERING THE FIRST TOMBSTONE IN CASE THE KEY IS NOT FOUND FURTHER ALONG
+        index = _hash % self._capacity
+        quad_index = index
+        first_tombstone_index = None
+        j = 1
+        while True:
+            slot = self._slot(quad_index)
+            if slot[5] == _EMPTY:
+                break
+
+            if slot[5] == _TOMBSTONE:
+                if first_tombstone_index is None:
+                    first_tombstone_index = quad_index
+            elif slot[0] == _hash and slot[3] == len(key_bytes) and self._mmap[slot[1]:slot[1] + slot[3]] == key_bytes:
+                self._write_slot(quad_index, (_hash, slot[1], self._append(value_bytes), slot[3], len(value_bytes), state))
+                self._write_counts()
+                return
+
+            quad_index = (index + j**2) % self._capacity
+            j += 1
+
+        if first_tombstone_index is not None:
+            quad_index = first_tombstone_index
+            self._tombstones -= 1
+
+        key_offset = self._append(key_bytes)
+        value_offset = self._append(value_bytes)
+        self._write_slot(quad_index, (_hash, key_offset, value_offset, len(key_bytes), len(value_bytes), state))
+        self._size += 1
+        self._modifications += 1
+        self._write_counts()
+
+    def get(self, key: str) -> object:
+        """This method returns the value of the given key, or None if the key is not present."""
+        index = self._find_index(key.encode(), self._hash_function(key))
+        return None if index is None else self._value(self._slot(index))
+
+    def contains_key(self, key: str) -> bool:
+        """This method returns True if the key is present, False otherwise."""
+        return self._find_index(key.encode(), self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its value, if present, by turning its slot into a tombstone.  The bytes of the key and value stay in the
+        heap.
+        """
+        index = self._find_index(key.encode(), self._hash_function(key))
+        if index is None:
+            return
+
+        slot = self._slot(index)
+        self._write_slot(index, slot[:5] + (_TOMBSTONE,))
+        self._size -= 1
+        self._tombstones += 1
+        self._modifications += 1
+        self._write_counts()
+
+    def clear(self) -> None:
+        """
+        This method removes every key/value pair.  The capacity remains unchanged, and the used part of the file starts over after the header.
+        """
+        self._end = _HEADER.size
+        self._size = 0
+        self._new_slots(self._capacity)
+        self._modifications += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        This method changes the capacity of the table.  It does nothing if the new capacity is smaller than the number of keys, and rounds the new
+        capacity up to a prime number, growing it by _GROW_FACTOR while the table load would be over _MAX_LOAD, the same limit as put.
+
+        A new slots region is written at the end of the file, and every live slot is placed in it using its stored hash, so no key is read or hashed
+        again.  The old slots region stays in the file, and is read in blocks of _RESIZE_BLOCK_SLOTS slots, so only one block at a time is held in
+        memory.  The keys and values stay where they are in the heap.  Tombstones are not copied.
+        """
+        if new_capacity < self._size:
+            return
+
+        new_capacity = next_prime(new_capacity)
+        while self._size > new_capacity * _MAX_LOAD:
+            new_capacity = next_prime(new_capacity * _GROW_FACTOR)
+
+        old_offset, old_capacity = self._slots_offset, self._capacity
+        self._new_slots(new_capacity)
+
+        for block_start in range(0, old_capacity, _RESIZE_BLOCK_SLOTS):
+            block_end = min(block_start + _RESIZE_BLOCK_SLOTS, old_capacity)
+            block = self._mmap[old_offset + block_start * _SLOT.size:old_offset + block_end * _SLOT.size]
+
+            for slot in _SLOT.iter_unpack(block):
+                if slot[5] == _EMPTY or slot[5] == _TOMBSTONE:
+                    continue
+
+                index = slot[0] % new_capacity
+                quad_index = index
+                j = 1
+                while self._slot(quad_index)[5] != _EMPTY:
+                    quad_index = (index + j**2) % new_capacity
+                    j += 1
+                self._write_slot(quad_index, slot)
+
+        self._modifications += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """This method returns a dynamic array of (key, value) tuples of every key/value pair."""
+        da_tuples = DynamicArray()
+        for item in self.items():
+            da_tuples.append(item)
+        return da_tuples
+
+    def keys(self) -> KeysView:
+        """This method returns a view of the keys."""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """This method returns a view of the values."""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """This method returns a view of the (key, value) tuples."""
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of every key/value pair read from the file, from smallest to greatest slot index.  It raises RuntimeError if
+        the hash map is changed while the iteration is in progress.
+        """
+        modifications = self._modifications
+        for index in range(self._capacity):
+            slot = self._slot(index)
+            if slot[5] == _STR_VALUE or slot[5] == _PICKLED_VALUE:
+                yield _Slot(self._key(slot), self._value(slot))
+                if self._modifications != modifications:
+                    raise RuntimeError("MmapHashMap changed during iteration")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nMmapHashMap example 1")
+    print("---------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'table.bin')
+    with MmapHashMap(path, 11, hash_function_2) as m:
+        for i in range(50):
+            m.put('key' + str(i), i * 10)
+        m.put('key7', 'seven')
+        m.remove('key8')
+        print(m.get_size(), m.get_capacity(), m.get_tombstone_count(), m.get('key7'), m.get('key8'), m.contains_key('key49'))
+
+    with MmapHashMap(path, 11, hash_function_2) as m:
+        print(m.get_size(), m.get_capacity(), m.get('key7'), m.get('key49'), m.contains_key('key8'))
+        m.resize_table(300)
+        print(m.get_size(), m.get_capacity(), m.get('key0'), sorted(m.values(), key=str)[:3])
+
+    try:
+        MmapHashMap(path, 11, hash_function_1)
+    except ValueError as error:
+        print('ValueError:', error.args[0][-20:])
+    os.remove(path)
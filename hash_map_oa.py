@@ -3,30 +3,133 @@
 # Course:           CS261 - Data Structures
 # Assignment:       Assignment #6 - HashMap Implementation - Part 2 - Open Addressing via Quadratic Probing
 # Due Date:         12/02/22 @ 11:59PM
-# Description:      Write methods to implement a HashMap, using open addressing (quadratic probing and tombstones) to resolve table collisions. 
+# Description:      Write methods to implement a HashMap, using open addressing (quadratic probing and tombstones by default, or another selectable
+#                   probing strategy) to resolve table collisions. 
 
 
+import math
+
 from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
                         hash_function_1, hash_function_2)
+from hash_capacity import CAPACITY_POLICIES, mix_batch, mixed_hash_function, next_power_of_two
+from hash_map_io import gc_paused, read_dump, resolve_function, same_function, write_dump
+from hash_map_views import ItemsView, KeysView, ValuesView
+from hash_vectorized import hash_batch
+
+
+# DURING AN INCREMENTAL RESIZE, EACH HASH ENTRY MOVED TO THE NEW TABLE IS REPLACED WITH THIS TOMBSTONE IN THE OLD TABLE, SO THAT PROBING IN THE OLD TABLE
+# DOES NOT END EARLY FOR THE ENTRIES THAT HAVE NOT BEEN MOVED YET
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+# SMALLEST NUMBER OF SLOTS OF THE OLD TABLE MOVED TO THE NEW TABLE BY EACH PUT / REMOVE DURING AN INCREMENTAL RESIZE.  _start_migration USES A LARGER STEP
+# WHEN THE NEW TABLE WOULD OTHERWISE REACH MAX_LOAD BEFORE THE OLD TABLE IS EMPTY (WITH A GROW FACTOR CLOSE TO 1)
+_MIGRATION_STEP = 8
+
+# PROBING STRATEGIES THAT CAN BE SELECTED WITH THE probing ARGUMENT OF HashMap
+PROBING_STRATEGIES = ('linear', 'quadratic', 'double_hashing', 'robin_hood')
+
+
+def _unchanged(value: object) -> object:
+    """Update function of setdefault, which keeps the current value of a key."""
+    return value
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, incremental_resize: bool = False,
+                 tombstone_threshold: float = None, probing: str = 'quadratic', shrink_threshold: float = None,
+                 capacity_policy: str = 'prime', max_load: float = 0.5, grow_factor: float = 2) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        probing selects another probe sequence instead (see PROBING_STRATEGIES):
+            linear          - index + j
+            quadratic       - index + j^2
+            double_hashing  - index + j * step, with step taken from the high
+                              part of the hash
+            robin_hood      - linear probing where an inserted entry takes the
+                              slot of any entry closer to its initial index,
+                              and remove shifts the following entries back
+                              instead of leaving a tombstone
+
+        If incremental_resize is True, growing the table does not move every
+        entry at once.  The old table is kept alongside the new table, and
+        each put / remove moves a bounded number of its slots.
+
+        put multiplies the capacity by grow_factor once the table load
+        reaches max_load.  capacity_policy selects how capacities are
+        rounded and keys are indexed (see hash_capacity): 'prime', or
+        'power_of_two', where the hashes are mixed and indexed with a bit
+        mask, quadratic probing steps by the triangular numbers j(j+1)/2
+        instead of j^2, and a grow_factor under 2 rounds up to doubling.
+
+        tombstone_threshold (by default, max_load) is the fraction of slots
+        that live entries and tombstones together may fill before put
+        rebuilds the table without its tombstones.  Quadratic probing of a
+        prime capacity only reaches half of the slots, so with it, neither
+        max_load nor tombstone_threshold may be greater than 0.5.  The other
+        probe sequences reach every slot, so they only need to be under 1.
+
+        If shrink_threshold is given, remove halves the capacity (but not
+        below the initial capacity) once the table load falls below it, and
+        clear goes back to the initial capacity.  It must be less than
+        max_load divided by the larger of grow_factor and 2, so that the
+        load after a resize in either direction is between the two, and a
+        few puts / removes cannot trigger another one.  With the default
+        max_load and grow_factor, 0.125 is a good value.
         """
+        if tombstone_threshold is None:
+            tombstone_threshold = max_load
+        
+        if probing not in PROBING_STRATEGIES:
+            raise ValueError(f"probing must be one of {PROBING_STRATEGIES}, not {probing!r}")
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"capacity_policy must be one of {CAPACITY_POLICIES}, not {capacity_policy!r}")
+        if not 0 < max_load < 1 or not 0 < tombstone_threshold < 1 or grow_factor <= 1:
+            raise ValueError("max_load and tombstone_threshold must be between 0 and 1, and grow_factor greater than 1")
+        if capacity_policy == 'prime' and probing == 'quadratic' and max(max_load, tombstone_threshold) > 0.5:
+            raise ValueError("quadratic probing of a prime capacity needs max_load and tombstone_threshold of at most 0.5")
+        if shrink_threshold is not None and not 0 < shrink_threshold < max_load / max(grow_factor, 2):
+            raise ValueError(f"shrink_threshold must be between 0 and {max_load / max(grow_factor, 2)}, the table load just after the table grows")
+
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two with the power_of_two capacity policy
+        self._capacity_policy = capacity_policy
+        self._capacity = self._next_prime(capacity) if capacity_policy == 'prime' else next_power_of_two(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
+        # KEYS ARE HASHED WITH _hash_key, WHICH ALSO MIXES THE HASHES WITH THE POWER_OF_TWO CAPACITY POLICY.  THE HASH ENTRIES CACHE ITS RESULT
         self._hash_function = function
+        self._hash_key = function if capacity_policy == 'prime' else mixed_hash_function(function)
         self._size = 0
 
+        # TABLE LOAD AT WHICH PUT GROWS THE TABLE, AND THE FACTOR IT GROWS BY
+        self._max_load = max_load
+        self._grow_factor = grow_factor
+
+        # NUMBER OF TOMBSTONES IN THE TABLE, AND THE OCCUPANCY (LIVE ENTRIES + TOMBSTONES) AT WHICH THEY ARE CLEARED
+        self._tombstones = 0
+        self._tombstone_threshold = tombstone_threshold
+
+        self._probing = probing
+
+        # LOAD BELOW WHICH REMOVE SHRINKS THE TABLE, AND THE CAPACITY IT NEVER SHRINKS BELOW
+        self._shrink_threshold = shrink_threshold
+        self._min_capacity = self._capacity
+
+        # NUMBER OF CHANGES THAT INVALIDATE ITERATIONS IN PROGRESS (INSERTED OR REMOVED KEYS, MOVED ENTRIES, RESIZES)
+        self._modifications = 0
+
+        # OLD TABLE, NEXT SLOT TO MOVE AND NUMBER OF SLOTS MOVED PER PUT / REMOVE WHILE AN INCREMENTAL RESIZE IS IN PROGRESS
+        self._incremental_resize = incremental_resize
+        self._migration_step = _MIGRATION_STEP
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -70,6 +173,20 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        This helper method returns the given capacity rounded up to a capacity allowed by the capacity policy: a prime number, or a power of two.
+        """
+        if self._capacity_policy == 'power_of_two':
+            return next_power_of_two(capacity)
+        if not self._is_prime(capacity):
+            return self._next_prime(capacity)
+        return capacity
+
+    def _grown_capacity(self) -> int:
+        """This helper method returns the capacity put grows the table to: the current capacity times the grow factor, and at least one more."""
+        return max(int(self._capacity * self._grow_factor), self._capacity + 1)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -84,71 +201,322 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstone_count(self) -> int:
+        """
+        Return number of tombstones in the map
+        """
+        return self._tombstones
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
         """
         This method adds a new key/value pair as a hash entry into the hash table, and increments the hash table's size.
         
-        Before adding a value, the table load of the (num elements/ capacity) is calculated.  If the table load is above or equal to 0.5, meaning that half
-        the underlying dynamic array's values are filled, the table is resized to double the current capacity, to the nearest prime number.  This helps reduce
+        Before adding a value, the table load of the (num elements/ capacity) is calculated.  If the table load is above or equal to 0.5 (max_load), meaning 
+        that half the underlying dynamic array's values are filled, the table is resized to double (grow_factor times) the current capacity, to the nearest
+        prime number (or power of two, with the power_of_two capacity policy).  This helps reduce
         collisions and ensures O(1) time complexity for most operations.
         
         The method first uses the hash function to calculate the insertion point of the new key/value pair.
         
-        If the insertion point is a tombstone, it will update the tombstone if its key matches the key to be added, or if the key is not elsewhere in the table.
-        
         If the insertion point matches the key, it will update the value.
         
-        If the insertion point is a key/value not matching the key and not a tombstone, it will continue to increment the index using quadratic probing, until
-        an empty spot in the hash table is reached, or the previous conditions of finding the existing key, tombstone with existing key, or tombstone where key
-        is not elsewhere is met.                  
+        Otherwise, it will continue to increment the index using quadratic probing, until the key or an empty spot in the hash table is reached.  The first 
+        tombstone passed along the way is remembered, and if the key is not found, the new key/value pair replaces that tombstone instead of using the empty 
+        spot.  This way the probe sequence is only walked once.                  
+        
+        Tombstones also take up slots, and probing only ends at an empty spot.  If live entries and tombstones together would fill more than the tombstone 
+        threshold of the slots, the table is rebuilt without its tombstones.  The rebuild keeps the same capacity, unless the live entries alone fill half 
+        of the threshold - then the capacity is doubled, so that a rebuild cannot be needed again after only a few removes.
+        
+        In incremental resize mode, the new table is only allocated when the table load reaches 0.5, and each put moves a few slots of the old table into
+        it.  If the key is still in the old table, it is removed from there and inserted into the new table.
+        """
+        self._update(key, value, None)
+
+    def _update(self, key: str, value: object, update: callable) -> object:
+        """
+        This helper method is the body of put, shared with increment, setdefault and upsert: it resizes or rebuilds the table if needed, then inserts or 
+        updates the key with _insert and the given update function, and returns the value stored for the key.
+        
+        During an incremental resize, a key still in the old table is removed from there, and its value becomes the default value of the insert into the 
+        new table, so update is applied to its current value.
         """
         table_load = self.table_load()
         
-        # RESIZE IF HALF OF DYNAMIC ARRAY OF HASH TABLE'S FREE SPACE IS 50 PERCENT OR LESS
-        if table_load >= 0.5:  
-            curr_capacity = self._capacity
-            new_capacity = curr_capacity * 2
-            self.resize_table(new_capacity)
-
-        # CALCULATE INITIAL INDEX BASED ON HASH FUNCTION AND KEY
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity                        
-        
-        j = 1
-        quad_index = index
-        while self._buckets[quad_index] is not None:
-                        
-            if self._buckets[quad_index].is_tombstone is True:
-                # IF A TOMBSTONE EXISTS WITH CURRENT KEY, UPDATE IT TO REMOVE THE TOMBSTONE AND UPDATE VALUE AS WELL
-                if self._buckets[quad_index].key == key:
-                    self._buckets[quad_index].value = value
-                    self._buckets[quad_index].is_tombstone = False
-                    self._size +=1
-                    return 
-                # IF A TOMBSTONE EXISTS NOT EQUAL TO THE CURRENT KEY, AND THE KEY DOES NOT EXIST ELSEWHERE IN THE TABLE, REPLACE TOMBSTONE WITH KEY/VALUE
-                elif self.contains_key(key) is False:                    
-                    new_entry = HashEntry(key, value) 
-                    self._buckets[quad_index] = new_entry
-                    self._size += 1    
-                    return                
+        # RESIZE IF HALF OF DYNAMIC ARRAY OF HASH TABLE'S FREE SPACE IS 50 PERCENT OR LESS (THE TABLE LOAD REACHES MAX_LOAD)
+        if table_load >= self._max_load:  
+            new_capacity = self._grown_capacity()
+            self._rebuild(new_capacity)
+        
+        # REBUILD THE TABLE WITHOUT TOMBSTONES IF LIVE ENTRIES AND TOMBSTONES TOGETHER WOULD FILL MORE THAN THE TOMBSTONE THRESHOLD
+        elif (self._size + self._tombstones + 1) / self._capacity > self._tombstone_threshold:
+            if table_load >= self._tombstone_threshold / 2:
+                self._rebuild(self._grown_capacity())
+            else:
+                self._rebuild(self._capacity)
+
+        _hash = self._hash_key(key)
+        
+        # DURING AN INCREMENTAL RESIZE, MOVE THE NEXT FEW SLOTS OF THE OLD TABLE, AND TAKE THE KEY OUT OF THE OLD TABLE IF IT IS STILL THERE
+        if self._old_buckets is not None:
+            self._migrate(self._migration_step)
+        if self._old_buckets is not None:
+            old_entry = self._find_entry(self._old_buckets, self._old_capacity, key, _hash)
+            if old_entry is not None:
+                old_entry.is_tombstone = True
+                self._size -= 1
+                self._modifications += 1
+                if update is not None:
+                    value = old_entry.value
+
+        # INSERT THE KEY/VALUE PAIR, OR UPDATE THE VALUE IF THE KEY ALREADY EXISTS
+        return self._insert(key, value, _hash, update)
+
+    def _probe_sequence(self, _hash: int, capacity: int):
+        """
+        This helper method is a generator of the indices to probe for a hash in a table of the given capacity, following the hash map's probing strategy.
+        The first index is always the initial index, hash % capacity.
+        
+        The capacity is prime, so linear probing and double hashing (any step from 1 to capacity - 1) visit every index.  Quadratic probing only visits
+        (capacity + 1) / 2 distinct indices, which is why put keeps at most half of the slots filled.
+        
+        With the power_of_two capacity policy, the indices are masked with capacity - 1 instead.  Quadratic probing adds the triangular numbers j(j+1)/2
+        (1, 3, 6, 10, ...), which visit every index of a power of two capacity, and double hashing uses an odd step, which has no common factor with it.
+        """
+        if self._capacity_policy == 'power_of_two':
+            mask = capacity - 1
+            index = _hash & mask
             
-            # IF NOT THE VALUE IS NOT A TOMBSTONE, BUT IS EQUAL TO THE CURRENT KEY, SIMPLY UPDATE THE VALUE AND RETURN
-            elif self._buckets[quad_index].key == key:
-                self._buckets[quad_index].value = value
-                return
+            if self._probing == 'quadratic':
+                j = 0
+                while True:
+                    yield index
+                    j += 1
+                    index = (index + j) & mask
             
-            quad_index = (index + j**2) % self._capacity   #QUADRATIC PROBING TO INCREMENT INSERTION INDEX IF NEEDED
-            j += 1   
+            step = 1
+            if self._probing == 'double_hashing':
+                step = ((_hash // capacity) | 1) & mask
             
+            while True:
+                yield index
+                index = (index + step) & mask
+        
+        index = _hash % capacity
+        
+        if self._probing == 'quadratic':
+            j = 0
+            while True:
+                yield (index + j**2) % capacity
+                j += 1
         
-        # IF THE FUNCTION REACHES HERE AND HAS NOT RETURNED, WE HAVE REACHED A NONE VALUE TO INSERT THE NEW KEY/VALUE PAIR INTO
-        new_entry = HashEntry(key, value) 
+        # THE SECONDARY HASH FOR THE STEP IS TAKEN FROM THE PART OF THE HASH NOT USED BY THE INITIAL INDEX
+        step = 1
+        if self._probing == 'double_hashing' and capacity > 2:
+            step = 1 + (_hash // capacity) % (capacity - 1)
+        
+        while True:
+            yield index
+            index = (index + step) % capacity
+
+    def _insert(self, key: str, value: object, _hash: int, update: callable = None) -> object:
+        """
+        This helper method inserts or updates a key/value pair whose hash has already been computed, without checking the table load, and returns the 
+        value stored for the key.
+        
+        It is shared by put and put_many, so that a batch of pairs can be inserted after the table has been sized once up front.
+        
+        If update is given, the value stored is update(current value) for a key already in the table, or update(value) for a new key - so value acts as 
+        the default of the key.  This lets increment, setdefault and upsert compute the new value from the current one with a single probe sequence.
+        
+        The probe sequence is walked only once.  The first tombstone found is remembered while probing continues, as the key may still exist further along
+        the probe sequence.  If the key is found, its value is updated.  Otherwise, once an index with None is reached, the new key/value pair is placed in
+        the first tombstone found, or in the None index if there were no tombstones.
+        """
+        if self._probing == 'robin_hood':
+            return self._robin_hood_insert(key, value, _hash, update)
+        
+        first_tombstone_index = None
+        for quad_index in self._probe_sequence(_hash, self._capacity):
+            hash_entry = self._buckets[quad_index]
+            if hash_entry is None:
+                break
+            
+            # REMEMBER THE FIRST TOMBSTONE, TO REUSE IT IF THE KEY IS NOT FOUND
+            if hash_entry.is_tombstone is True:
+                if first_tombstone_index is None:
+                    first_tombstone_index = quad_index
+            
+            # IF THE VALUE IS NOT A TOMBSTONE, BUT IS EQUAL TO THE CURRENT KEY, SIMPLY UPDATE THE VALUE AND RETURN
+            elif hash_entry.hash == _hash and hash_entry.key == key:
+                hash_entry.value = value if update is None else update(hash_entry.value)
+                return hash_entry.value
+        
+        # IF THE FUNCTION REACHES HERE AND HAS NOT RETURNED, THE KEY IS NOT IN THE TABLE.  INSERT THE NEW KEY/VALUE PAIR INTO THE FIRST TOMBSTONE FOUND, OR
+        # THE NONE VALUE THE PROBING ENDED AT
+        if first_tombstone_index is not None:
+            quad_index = first_tombstone_index
+            self._tombstones -= 1
+        
+        if update is not None:
+            value = update(value)
+        new_entry = HashEntry(key, value, _hash) 
         self._buckets[quad_index] = new_entry
         self._size += 1
+        self._modifications += 1
+        return value
 
-      
+    def _robin_hood_insert(self, key: str, value: object, _hash: int, update: callable = None) -> object:
+        """
+        This helper method is the robin_hood version of _insert.
+        
+        Every entry is kept at least as far from its initial index as the entries before it in its cluster, so the search for the key stops as soon as an 
+        entry closer to its own initial index than the key would be is found.  If the key is not found, the new entry is placed there, and the entries from 
+        there on are pushed forward by _robin_hood_place.
+        """
+        capacity = self._capacity
+        index = _hash % capacity
+        distance = 0
+        
+        while self._buckets[index] is not None:
+            hash_entry = self._buckets[index]
+            if distance > (index - hash_entry.hash) % capacity:
+                break
+            
+            if hash_entry.hash == _hash and hash_entry.key == key:
+                hash_entry.value = value if update is None else update(hash_entry.value)
+                return hash_entry.value
+            
+            index = (index + 1) % capacity
+            distance += 1
+        
+        if update is not None:
+            value = update(value)
+        self._robin_hood_place(HashEntry(key, value, _hash), index, distance)
+        self._size += 1
+        self._modifications += 1
+        return value
+
+    def _robin_hood_place(self, new_entry: HashEntry, index: int, distance: int) -> None:
+        """
+        This helper method places a hash entry that is not in the table at the given index, which is the given distance from its initial index.  Whenever
+        the slot is taken by an entry closer to its own initial index, the two are swapped, and the displaced entry continues along the probe sequence.
+        """
+        capacity = self._capacity
+        
+        while self._buckets[index] is not None:
+            hash_entry = self._buckets[index]
+            entry_distance = (index - hash_entry.hash) % capacity
+            if entry_distance < distance:
+                self._buckets[index] = new_entry
+                new_entry, distance = hash_entry, entry_distance
+            
+            index = (index + 1) % capacity
+            distance += 1
+        
+        self._buckets[index] = new_entry
+
+    def _robin_hood_delete(self, index: int) -> None:
+        """
+        This helper method removes the entry at the given index of a robin_hood table without leaving a tombstone.  The entries after it are shifted back 
+        by one slot, until an empty slot or an entry already at its initial index is reached.
+        """
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        
+        while self._buckets[next_index] is not None and (next_index - self._buckets[next_index].hash) % capacity != 0:
+            self._buckets[index] = self._buckets[next_index]
+            index = next_index
+            next_index = (next_index + 1) % capacity
+        
+        self._buckets[index] = None
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples into the hash table.
+        
+        Calling put in a loop checks the table load before every insert, and resizes (re-putting every hash entry) each time the load reaches 0.5 
+        (max_load).  Instead, this method resizes the table at most once, to a capacity that keeps the table load under max_load with the current size 
+        plus every pair in the batch, and then inserts all pairs in a single pass without checking the table load again.
+        
+        Duplicate keys in the batch only update the value, so the table may end up slightly larger than strictly needed.
+        """
+        pairs = list(pairs)
+        
+        # A BATCH INSERT FINISHES ANY INCREMENTAL RESIZE FIRST, SO EVERY KEY IS ONLY LOOKED UP IN ONE TABLE
+        if self._old_buckets is not None:
+            self._finish_migration()
+        
+        # SIZE THE TABLE ONCE SO THE LOAD STAYS UNDER MAX_LOAD AFTER THE WHOLE BATCH IS INSERTED.  IF THE TOMBSTONES WOULD TAKE THE OCCUPANCY OVER THE 
+        # TOMBSTONE THRESHOLD, ALSO REBUILD THE TABLE TO CLEAR THEM
+        required_capacity = int((self._size + len(pairs)) / self._max_load) + 1
+        occupancy = (self._size + self._tombstones + len(pairs)) / self._capacity
+        if required_capacity > self._capacity or occupancy > self._tombstone_threshold:
+            self.resize_table(max(required_capacity, self._capacity))
+        
+        # HASH ALL KEYS OF THE BATCH AT ONCE, THEN INSERT EACH PAIR
+        for (key, value), _hash in zip(pairs, self._hash_keys(pair[0] for pair in pairs)):
+            self._insert(key, value, _hash)
+
+    def _hash_keys(self, keys) -> list:
+        """
+        This helper method returns a list with the hash of every key in an iterable of keys, in the same order, as _hash_key computes it.  The keys are
+        hashed at once with hash_batch, and mixed at once with the power_of_two capacity policy.
+        """
+        hashes = hash_batch(keys, self._hash_function)
+        if self._capacity_policy == 'power_of_two':
+            hashes = mix_batch(hashes)
+        return hashes
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        This method adds delta to the value of the key, or inserts the key with a value of delta if it is not in the hash table, and returns the new 
+        value.  The key is hashed and its probe sequence walked only once, where get followed by put would do both twice.
+        """
+        return self._update(key, 0, lambda value: value + delta)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value of the key if it is in the hash table.  Otherwise it inserts the key with the default value, and returns that 
+        value.  The key is hashed and its probe sequence walked only once.
+        """
+        return self._update(key, default, _unchanged)
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
+        """
+        This method sets the value of the key to function(current value), or to function(default) if the key is not in the hash table, and returns the
+        new value.  The function is called exactly once, and the key is hashed and its probe sequence walked only once.
+        """
+        return self._update(key, default, function)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys, and returns a dynamic array of their values in the same order.  A key that is not present 
+        in the hash table has a value of None in the returned array.
+        
+        All keys of the batch are hashed at once with _hash_keys, then each key is probed for the same as get.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, _hash in zip(keys, self._hash_keys(keys)):
+            hash_entry = self._lookup(key, _hash)
+            values.append(None if hash_entry is None else hash_entry.value)
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        This method removes every key from an iterable of keys from the hash table.  Keys that are not present are ignored, the same as remove.
+        
+        All keys of the batch are hashed at once with _hash_keys, and each key is removed the same as remove (moving a few slots of an incremental resize
+        in progress).  With automatic shrinking on, the table is shrunk only once, after the whole batch is removed, instead of being rebuilt every time
+        the load falls below the shrink threshold.
+        """
+        keys = list(keys)
+        for key, _hash in zip(keys, self._hash_keys(keys)):
+            self._delete(key, _hash)
+        self._shrink()
 
     def table_load(self) -> float:
         """
@@ -165,7 +533,7 @@ class HashMap:
         """
         This method returns the number of empty buckets (dynamic array indexes with the value of None) in the hash table.
         
-        A tombstone value is NOT considered an empty bucket.
+        A tombstone value is NOT considered an empty bucket.  During an incremental resize, only the buckets of the new table are counted.
         """
         num_of_empty_buckets = 0
         
@@ -178,68 +546,206 @@ class HashMap:
     def resize_table(self, new_capacity: int) -> None:
         """
         This method resizes the hash table.  It will only resize a hash table to a value equal or larger to the number of elements present in the 
-        internal dynamic array.  It will also ensure the new capacity is a prime number.
+        internal dynamic array.  It will also ensure the new capacity is a prime number (or a power of two, with the power_of_two capacity policy).
         
         The method creates a new hash table object, and re-hashes each element into the original hash table in its new position, based on the new capacity.
+        Tombstones are not copied.  Each element is placed using the hash cached in its hash entry when it was inserted, so the hash function is not 
+        called again.
         
-        It uses the put method, which handles resizing if the table load drops to or below 0.5.                
+        Like the put method, it handles further resizing if the table load reaches 0.5 (max_load) with the new capacity.                
         """
         
         # DO NOTHING IF NEW CAPACITY IS SMALLER THAN NUMBER OF ELEMENTS CURRENTLY IN THE HASH TABLE ( AS ELEMENTS WOULD BE LOST )
         if new_capacity < self._size:
             return
 
-        # IF NEW CAPACITY IS NOT PRIME, INCREMENT UNTIL IT IS A PRIME NUMBER            
-        if not self._is_prime(new_capacity):
-            new_capacity =  self._next_prime(new_capacity)
+        # AN EXPLICIT RESIZE FINISHES ANY INCREMENTAL RESIZE IN PROGRESS FIRST
+        if self._old_buckets is not None:
+            self._finish_migration()
+
+        # IF NEW CAPACITY IS NOT PRIME, INCREMENT UNTIL IT IS A PRIME NUMBER (OR A POWER OF TWO)
+        new_capacity = self._round_capacity(new_capacity)
             
-        # CREATE A NEW HASH MAP WITH THE NEW CAPACITY GIVEN    
-        new_hash_map = HashMap(new_capacity, self._hash_function)
+        # CREATE A NEW HASH MAP WITH THE NEW CAPACITY GIVEN, AND THE SAME PROBING, CAPACITY POLICY AND GROWTH
+        new_hash_map = HashMap(new_capacity, self._hash_function, probing=self._probing, capacity_policy=self._capacity_policy,
+                               max_load=self._max_load, grow_factor=self._grow_factor)
         
-        # ITERATE THROUGH THE OLD HASH MAP.  IF THE VALUE IS NOT NONE, ADD IT TO THE NEW HASH MAP USING THE NEW HASH MAP'S PUT FUNCTION
+        # ITERATE THROUGH THE OLD HASH MAP, AND COLLECT EACH ENTRY THAT IS NOT NONE AND NOT A TOMBSTONE
+        entries = []
         for i in range(self._capacity):
-            if self._buckets[i]:
-                new_key = self._buckets[i].key
-                new_value = self._buckets[i].value
-                new_hash_map.put(new_key, new_value)  # PUT FUNCTION WILL HANDLE ADDITIONAL RESIZING BASED ON TABLE LOAD IF NEEDED
+            hash_entry = self._buckets[i]
+            if hash_entry is not None and hash_entry.is_tombstone is False:
+                entries.append(hash_entry)
 
+        # HASH ENTRIES ADDED DIRECTLY TO THE DYNAMIC ARRAY (NOT THROUGH PUT) HAVE NO CACHED HASH.  HASH THEIR KEYS TOGETHER IN ONE BATCH
+        unhashed_entries = [hash_entry for hash_entry in entries if hash_entry.hash is None]
+        for hash_entry, _hash in zip(unhashed_entries, self._hash_keys(hash_entry.key for hash_entry in unhashed_entries)):
+            hash_entry.hash = _hash
 
-        # SWAP UNDERLYING DYNAMIC ARRAY AND CAPACITY FROM NEW HASH TABLE TO CURRENT HASH TABLE.  SIZE REMAINS THE SAME
+        # ADD EACH KEY/VALUE TO THE NEW HASH MAP USING ITS CACHED HASH.  THE SAME TABLE LOAD CHECK AS THE PUT FUNCTION HANDLES ADDITIONAL RESIZING IF THE 
+        # NEW CAPACITY IS TOO SMALL
+        for hash_entry in entries:
+            if new_hash_map.table_load() >= self._max_load:
+                new_hash_map.resize_table(new_hash_map._grown_capacity())
+            new_hash_map._insert(hash_entry.key, hash_entry.value, hash_entry.hash)
+
+
+        # SWAP UNDERLYING DYNAMIC ARRAY AND CAPACITY FROM NEW HASH TABLE TO CURRENT HASH TABLE.  SIZE REMAINS THE SAME, AND THE NEW TABLE HAS NO TOMBSTONES
         self._buckets = new_hash_map._buckets
         self._capacity = new_hash_map._capacity
+        self._tombstones = 0
+        self._modifications += 1
 
+    def compact(self) -> None:
+        """
+        This method rebuilds the hash table at its current capacity, which clears all tombstones.  put does this automatically once the tombstone threshold
+        is crossed, but it can also be called during quiet periods, so that later operations do not pay for it.
+        """
+        self.resize_table(self._capacity)
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """
+        This helper method rebuilds the table with the given capacity when put needs more room: either all at once with resize_table, or, in incremental
+        resize mode, by starting an incremental resize.
+        """
+        if self._incremental_resize:
+            self._start_migration(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _start_migration(self, new_capacity: int) -> None:
+        """
+        This helper method starts an incremental resize.  The current table becomes the old table, and an empty table with the new capacity (incremented to
+        a prime number, or a power of two) becomes the hash table's table.  No entries are moved yet - put and remove move a few slots at a time using _migrate.
+        
+        Each put / remove moves enough slots for the old table to be empty before the puts left until the new table reaches max_load are used up, so 
+        that the next resize does not have to finish this one first - whatever the grow factor.  Only one incremental resize can be in progress at a 
+        time: one that starts earlier (after tombstones or shrinking) finishes the one in progress first.
+        """
+        # ONLY ONE INCREMENTAL RESIZE CAN BE IN PROGRESS AT A TIME
+        if self._old_buckets is not None:
+            self._finish_migration()
+
+        new_capacity = self._round_capacity(new_capacity)
+        
+        # MOVE EVERY SLOT OF THE OLD TABLE WITHIN THE PUTS LEFT BEFORE THE NEW TABLE'S LOAD REACHES MAX_LOAD
+        puts_left = max(math.floor(self._max_load * new_capacity) - self._size - 1, 1)
+        self._migration_step = max(_MIGRATION_STEP, math.ceil(self._capacity / puts_left))
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._modifications += 1
+
+    def _migrate(self, num_slots: int) -> None:
+        """
+        This helper method moves the live hash entries of the next num_slots slots of the old table into the new table, replacing each one with the 
+        _MIGRATED tombstone in the old table.  Once every slot has been moved, the old table is released and the incremental resize is finished.
+        
+        Moved entries are not in the new table yet (put removes a key from the old table before inserting it into the new one), so each is placed at the 
+        first empty or tombstone slot of its probe sequence, using its cached hash.
+        """
+        stop = min(self._migrate_index + num_slots, self._old_capacity)
+        
+        for i in range(self._migrate_index, stop):
+            hash_entry = self._old_buckets[i]
+            if hash_entry is None or hash_entry.is_tombstone is True:
+                continue
+            
+            if hash_entry.hash is None:
+                hash_entry.hash = self._hash_key(hash_entry.key)
+            
+            if self._probing == 'robin_hood':
+                self._robin_hood_place(hash_entry, hash_entry.hash % self._capacity, 0)
+            else:
+                for quad_index in self._probe_sequence(hash_entry.hash, self._capacity):
+                    if self._buckets[quad_index] is None or self._buckets[quad_index].is_tombstone is True:
+                        break
+                
+                if self._buckets[quad_index] is not None:
+                    self._tombstones -= 1
+                self._buckets[quad_index] = hash_entry
+            self._old_buckets[i] = _MIGRATED
+        
+        self._migrate_index = stop
+        self._modifications += 1
+        
+        # RELEASE THE OLD TABLE ONCE ALL OF ITS SLOTS HAVE BEEN MOVED
+        if self._migrate_index == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_index = 0
+
+    def _finish_migration(self) -> None:
+        """
+        This helper method moves every remaining slot of the old table into the new table, finishing an incremental resize in progress.
+        """
+        self._migrate(self._old_capacity - self._migrate_index)
+
+    def _find_index(self, buckets: DynamicArray, capacity: int, key: str, _hash: int) -> int:
+        """
+        This helper method returns the index of the live (not tombstone) hash entry holding the given key in the given table, or None if the key is not in
+        that table.
+        
+        It follows the probe sequence from the key's initial index until the key or an index with None is found.  Tombstones are skipped, as keys inserted 
+        after a collision may be located after them.  With robin_hood probing, the search also stops at the first live entry closer to its own initial 
+        index than the key would be, as the key cannot be located after it.
+        """
+        robin_hood = self._probing == 'robin_hood'
+        distance = 0
+        
+        for quad_index in self._probe_sequence(_hash, capacity):
+            hash_entry = buckets[quad_index]
+            if hash_entry is None:
+                return None
+            
+            if hash_entry.is_tombstone is False:
+                if hash_entry.hash == _hash and hash_entry.key == key:
+                    return quad_index
+                if robin_hood and distance > (quad_index - hash_entry.hash) % capacity:
+                    return None
+            
+            distance += 1
+
+    def _find_entry(self, buckets: DynamicArray, capacity: int, key: str, _hash: int) -> HashEntry:
+        """
+        This helper method returns the live (not tombstone) hash entry holding the given key in the given table, or None if the key is not in that table.
+        """
+        index = self._find_index(buckets, capacity, key, _hash)
+        return None if index is None else buckets[index]
+
+    def _lookup(self, key: str, _hash: int) -> HashEntry:
+        """
+        This helper method returns the live hash entry holding the given key, or None if the key is not in the hash table.  During an incremental resize,
+        the new table is searched first, then the old table.
+        """
+        hash_entry = self._find_entry(self._buckets, self._capacity, key, _hash)
+        if hash_entry is None and self._old_buckets is not None:
+            hash_entry = self._find_entry(self._old_buckets, self._old_capacity, key, _hash)
+        return hash_entry
 
     def get(self, key: str) -> object:
         """
         This method returns the VALUE of a given key from the hash table.  It first calculates the index to search using the hash function and the capacity of 
         the hash table. It then uses quadratic probing to increment the index if there were previous table collisions. 
         
-        If the key cannot be found in the hash table, or if the hash table is empty, the function returns "None".        
+        If the key cannot be found in the hash table, or if the hash table is empty, the function returns "None".  A tombstone holding the key does not count
+        as the key being found.
         
         Time Complexity: O(1)
         """
         if self._size == 0:
             return
         
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
-        hash_map_entry = self._buckets[index]
+        hash_entry = self._lookup(key, self._hash_key(key))
+        if hash_entry is None:
+            return
         
-        if hash_map_entry is None:    
-            return 
-        else:
-            j = 1
-            quadratic_index = index
-
-            while self._buckets[quadratic_index] is not None:
-                
-                if self._buckets[quadratic_index].key == key:
-                    return self._buckets[quadratic_index].value
-                
-                quadratic_index = (index + j**2) % self._capacity   # USE QUADRATIC PROBING TO INCREMENT INDEX UNTIL KEY IS FOUND OR INDEX IS NONE
-                j += 1                
-                            
-        return 
+        return hash_entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -247,8 +753,7 @@ class HashMap:
         
         The method first calculates the index based on the hash function of the table, and the table's capacity.
         
-        It then increments the index using quadratic probing, until the key is found in the hash entry that exists at each array index, or the index is 
-        None.
+        It then increments the index using quadratic probing, until the key is found in a hash entry that is not a tombstone, or the index is None.
         
         Time Complexity: O(1)
         """
@@ -257,26 +762,7 @@ class HashMap:
         if self._size == 0:
             return False
         
-        # CALCULATE INDEX BASED ON HASH FUNCTION AND HASH TABLE CAPACITY
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
-        hash_map_entry = self._buckets[index]
-        
-        if hash_map_entry is None:    
-            return False
-        else:
-            j = 1
-            quadratic_index = index
-
-            while self._buckets[quadratic_index] is not None:
-                
-                if self._buckets[quadratic_index].key == key:
-                    return True
-                
-                quadratic_index = (index + j**2) % self._capacity   # USE QUADRATIC PROBING TO INCREMENT INDEX UNTIL KEY IS FOUND OR INDEX IS NONE
-                j += 1                
-                            
-        return False
+        return self._lookup(key, self._hash_key(key)) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -294,46 +780,163 @@ class HashMap:
         probing.  Otherwise, if the value to be removed were changed to None, the quadratic probing would end too soon, and the "contains" and "remove" functions
         would not work properly.
         
+        With robin_hood probing, no tombstone is left.  The entry is removed and the entries after it in the same cluster are shifted back by one index.
+        
         This method will not loop indefinitely as the put function ensure the table load is under 0.5, so it will eventually encounter an empty array index
         with None and return.
+        
+        During an incremental resize, each remove also moves a few slots of the old table into the new table.  With automatic shrinking on, the table is
+        shrunk if its load has fallen below the shrink threshold (in incremental resize mode, by starting an incremental resize to the smaller table).
+        """
+        self._delete(key, self._hash_key(key))
+        self._shrink()
+
+    def _delete(self, key: str, _hash: int) -> None:
+        """
+        This helper method removes a key whose hash has already been computed, the same as remove but without shrinking the table.
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._migration_step)
+        
+        # ONLY DECREMENT SIZE AND CHANGE TO TOMBSTONE IF A HASH ENTRY MATCHING THAT KEY IS FOUND, THAT IS NOT ALREADY A TOMBSTONE.  TOMBSTONES LEFT IN THE 
+        # OLD TABLE OF AN INCREMENTAL RESIZE ARE NOT COUNTED, AS THAT TABLE IS DROPPED ONCE THE RESIZE FINISHES
+        index = self._find_index(self._buckets, self._capacity, key, _hash)
+        if index is not None:
+            self._size -= 1
+            self._modifications += 1
+            
+            # WITH ROBIN HOOD PROBING, THE FOLLOWING ENTRIES ARE SHIFTED BACK INSTEAD OF LEAVING A TOMBSTONE
+            if self._probing == 'robin_hood':
+                self._robin_hood_delete(index)
+            else:
+                self._buckets[index].is_tombstone = True
+                self._tombstones += 1
+        elif self._old_buckets is not None:
+            hash_entry = self._find_entry(self._old_buckets, self._old_capacity, key, _hash)
+            if hash_entry is not None:
+                hash_entry.is_tombstone = True
+                self._size -= 1
+                self._modifications += 1
+
+    def _shrink(self) -> None:
         """
+        This helper method halves the capacity of the hash table (to a prime number, and not below the initial capacity) if automatic shrinking is on
+        and the table load has fallen below the shrink threshold, as many times as needed for the load to reach the threshold again (more than once 
+        only after remove_many).  Tombstones are dropped by the rebuild.  The last halving at most doubles the load, which stays below max_load, so put 
+        does not grow the table again until about half of the new capacity has been added.
         
-        # CALCULATE INITIAL ARRAY INDEX BASED ON THE HASH FUNCTION/ DYNAMIC ARRAY SIZE
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
-        hash_map_entry = self._buckets[index]
+        No shrink is started while an incremental resize is in progress.
+        """
+        if self._shrink_threshold is None or self._old_buckets is not None or self._capacity <= self._min_capacity:
+            return
         
-        # IF NONE, RETURN IMMEDIATELY.  ELSE, PROBE UNTIL NONE OR THE KEY IS ENCOUNTERED.  THIS KEY MAY BE A HASH ENTRY EXISTING IN A TOMBSTONE.
-        if hash_map_entry is None:    
-            return 
-        else:
-            j = 1
-            quadratic_index = index
+        # HALVE UNTIL THE LOAD IS BACK AT OR OVER THE SHRINK THRESHOLD, SO A BATCH OF REMOVES IS FOLLOWED BY A SINGLE REBUILD
+        capacity = self._capacity
+        while capacity > self._min_capacity and self._size / capacity < self._shrink_threshold:
+            capacity = max(capacity // 2, self._min_capacity)
+        
+        if capacity != self._capacity:
+            self._rebuild(capacity)
 
-            while self._buckets[quadratic_index] is not None:
-                
-                # ONLY DECREMENT SIZE AND CHANGE TO TOMBSTONE IF THE HASH ENTRY MATCHING THAT KEY IS NOT ALREADY A TOMBSTONE
-                if self._buckets[quadratic_index].key == key and self._buckets[quadratic_index].is_tombstone is False:
-                    self._buckets[quadratic_index].is_tombstone = True
-                    self._size -= 1                                         
-                    return
-                
-                quadratic_index = (index + j**2) % self._capacity
-                j += 1                
-                            
     def clear(self) -> None:
         """
         This method clears all values in the underlying dynamic array of the hash table.  It iterates through the dynamic array and sets each
         index to None.  Then it resets the size variable of the hash table to zero to reflect that it contains no elements.
         
-        Capacity remains unchanged.
+        Capacity remains unchanged, unless automatic shrinking is on - then it goes back to the initial capacity.
         """
+        if self._shrink_threshold is not None and self._capacity > self._min_capacity:
+            self._capacity = self._min_capacity
+            self._buckets = DynamicArray([None] * self._capacity)
         
-        # ITERATE THROUGH HASH TABLE AND SET ALL UNDERLYING DYNAMIC ARRAY INDICES TO NONE
+        # ITERATE THROUGH HASH TABLE AND SET ALL UNDERLYING DYNAMIC ARRAY INDICES TO NONE.  ANY INCREMENTAL RESIZE IN PROGRESS IS DROPPED WITH THE OLD TABLE
         for i in range(self._capacity):
             self._buckets[i] = None
         
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        
         self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+
+    def dump(self, path: str) -> None:
+        """
+        This method writes the hash map to a binary file (see hash_map_io), which HashMap.load reads back.  The file stores the capacity, the probing
+        strategy and capacity policy, the identity of the hash function, the index and cached hash of every live entry along with its key and value, and the index of every
+        tombstone.  Any incremental resize in progress is finished first.
+        """
+        if self._old_buckets is not None:
+            self._finish_migration()
+        
+        indices, hashes, keys, values, tombstones = [], [], [], [], []
+        
+        for i in range(self._capacity):
+            hash_entry = self._buckets[i]
+            if hash_entry is None:
+                continue
+            
+            # TOMBSTONES ARE KEPT, AS PROBING FOR THE KEYS AFTER THEM MUST NOT STOP AT THEIR INDEX
+            if hash_entry.is_tombstone is True:
+                tombstones.append(i)
+                continue
+            
+            # HASH ENTRIES ADDED DIRECTLY TO THE DYNAMIC ARRAY (NOT THROUGH PUT) HAVE NO CACHED HASH
+            if hash_entry.hash is None:
+                hash_entry.hash = self._hash_key(hash_entry.key)
+            
+            indices.append(i)
+            hashes.append(hash_entry.hash)
+            keys.append(hash_entry.key)
+            values.append(hash_entry.value)
+        
+        write_dump(path, 'oa', self._capacity, self._hash_function, indices, hashes, keys, values, tombstones, self._probing, self._capacity_policy)
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, **kwargs) -> "HashMap":
+        """
+        This method reads a hash map written by dump, and returns it with the same capacity.  The hash function is found from its name in the file, 
+        unless one is given.  Other keyword arguments are passed to the constructor.  The probing strategy and capacity policy are the ones of the file,
+        unless others are given.
+        
+        If the hash function gives the same hashes as the one the file was written with, and the probing strategy and capacity policy are the same, 
+        every entry and tombstone is placed directly at its dumped index with its stored hash, so no key is hashed or probed for, and the table is not 
+        resized.  Otherwise, every key/value pair is inserted again with put_many.  Either way, the dumped capacity is the capacity automatic shrinking 
+        never goes below.
+        """
+        data = read_dump(path, 'oa')
+        if function is None:
+            function = resolve_function(data['function_name'])
+        
+        # THE PROBING STRATEGY AND CAPACITY POLICY OF THE FILE ARE KEPT, UNLESS OTHERS ARE GIVEN
+        kwargs.setdefault('probing', data['probing'])
+        kwargs.setdefault('capacity_policy', data['capacity_policy'])
+        
+        if (not same_function(function, data['function_name'], data['probe_hash']) or kwargs['probing'] != data['probing']
+                or kwargs['capacity_policy'] != data['capacity_policy']):
+            hash_map = cls(data['capacity'], function, **kwargs)
+            hash_map.put_many(zip(data['keys'], data['values']))
+            return hash_map
+        
+        # THE SLOTS ARE FILLED IN A PLAIN LIST, WHICH THEN BECOMES THE DYNAMIC ARRAY OF A MAP CREATED WITH THE SMALLEST CAPACITY
+        buckets = [None] * data['capacity']
+        with gc_paused():
+            for index, _hash, key, value in zip(data['indices'], data['hashes'], data['keys'], data['values']):
+                buckets[index] = HashEntry(key, value, _hash)
+        
+        for index in data['tombstones']:
+            tombstone = HashEntry(None, None)
+            tombstone.is_tombstone = True
+            buckets[index] = tombstone
+        
+        hash_map = cls(1, function, **kwargs)
+        hash_map._buckets = DynamicArray(buckets)
+        hash_map._capacity = data['capacity']
+        hash_map._min_capacity = data['capacity']
+        hash_map._size = data['size']
+        hash_map._tombstones = len(data['tombstones'])
+        return hash_map
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -341,45 +944,67 @@ class HashMap:
         
         The tuples are returned from smallest to greatest index from where they are located in the hash table's underlying dynamic array, 
         from their insertion point based on the hash function and quadratic open addressing scheme, and not in any particular order.
+        
+        During an incremental resize, the tuples of the new table are followed by the tuples of the entries not yet moved from the old table.
+        
+        Every key/value pair is copied into the new dynamic array.  To go through the pairs without copying them, iterate over items() instead.
         """
         da_tuples = DynamicArray()
         
-        # ITERATE THROUGH HASH TABLE AND ADD TO DYNAMIC ARRAY IF ARRAY INDEX IS NOT NONE, AND NOT A TOMBSTONE VALUE
-        for i in range(self._capacity):
-            hash_entry = self._buckets[i]
-            if hash_entry is not None and hash_entry.is_tombstone is False:    
-                da_tuples.append((hash_entry.key, hash_entry.value))
+        for item in self.items():
+            da_tuples.append(item)
 
         return da_tuples
 
-    def __iter__(self):
+    def keys(self) -> KeysView:
         """
-        This returns the iterator.  In the iterator, we create a variable - index - to track our position in the hash map class.
+        This method returns a view of the keys of the hash map.  Iterating over the view streams the keys directly from the table, without copying them.
         """
-        self._index = 0  # reference module 3 example from Canvas
-        return self
+        return KeysView(self)
 
-    def __next__(self):
+    def values(self) -> ValuesView:
         """
-        This method advances the iterator through each element of the hash map that is NOT empty, empty being "None".
-        
-        It allows the capability for a user to iterate through the hash map with the syntax  "for item in hashmap", without needing to understand 
-        the inner functionality of the hash table.
+        This method returns a view of the values of the hash map.  Iterating over the view streams the values directly from the table, without copying
+        them.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        This method returns a view of the (key, value) tuples of the hash map.  Iterating over the view streams the pairs directly from the table, 
+        without copying them into a dynamic array.
+        """
+        return ItemsView(self)
+
+    def _iter_entries(self):
         """
+        This helper method is a generator of every hash entry of the hash map that is NOT empty ("None") and NOT a tombstone, from smallest to greatest 
+        index.  During an incremental resize, the entries of the new table are followed by the entries not yet moved from the old table.
         
-        if self._index == self._capacity:
-            raise StopIteration
+        The position is kept in the generator itself, so any number of iterations may run at the same time.  It raises RuntimeError if a key is inserted 
+        or removed, or entries are moved by a resize, while the iteration is in progress.
+        """
+        modifications = self._modifications
+        tables = [(self._buckets, 0, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._migrate_index, self._old_capacity))
         
-        hash_val = self._buckets[self._index]        
-         
-        while hash_val is None:
-            self._index += 1
-            if self._index == self._capacity:
-                raise StopIteration
-            hash_val = self._buckets[self._index]             
+        for buckets, start, stop in tables:
+            for i in range(start, stop):
+                hash_entry = buckets[i]
+                if hash_entry is not None and hash_entry.is_tombstone is False:
+                    yield hash_entry
+                    if self._modifications != modifications:
+                        raise RuntimeError("HashMap changed during iteration")
+
+    def __iter__(self):
+        """
+        This returns an iterator over each hash entry of the hash map that is NOT empty ("None") and NOT a tombstone.
         
-        self._index += 1
-        return hash_val
+        It allows the capability for a user to iterate through the hash map with the syntax  "for item in hashmap", without needing to understand 
+        the inner functionality of the hash table.  Each iterator keeps its own position, so iterations may be nested.
+        """
+        return self._iter_entries()
         
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -611,4 +1236,103 @@ if __name__ == "__main__":
     m.remove('4')
     print(m)
     for item in m:
-        print('K:', item.key, 'V:', item.value)
\ No newline at end of file
+        print('K:', item.key, 'V:', item.value)
+    print("\nput_many / get_many / remove_many example 1")
+    print("-------------------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many(('key' + str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(m.get_many(['key0', 'key50', 'key99', 'key100']))
+    m.remove_many('key' + str(i) for i in range(0, 100, 2))
+    print(m.get_size(), m.get_capacity(), m.get('key1'))
+
+    print("\nincremental_resize example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_2, incremental_resize=True)
+    for i in range(40):
+        m.put('key' + str(i), i)
+        if i % 8 == 7:
+            print(m.get_size(), m.get_capacity(), m.get('key0'), m.contains_key('key' + str(i)))
+    m.remove('key0')
+    print(m.get_size(), m.get('key0'), m.get_keys_and_values().length())
+
+    print("\ntombstone_threshold / compact example 1")
+    print("---------------------------------------")
+    m = HashMap(53, hash_function_1, tombstone_threshold=0.4)
+    for i in range(20):
+        m.put('key' + str(i), i)
+    for i in range(15):
+        m.remove('key' + str(i))
+    print(m.get_size(), m.get_tombstone_count(), m.get_capacity(), m.empty_buckets())
+    m.compact()
+    print(m.get_size(), m.get_tombstone_count(), m.get_capacity(), m.empty_buckets())
+    for i in range(100, 200):
+        m.put('key' + str(i), i)
+        m.remove('key' + str(i))
+    print(m.get_size(), m.get_tombstone_count(), m.get_capacity(), round((m.get_size() + m.get_tombstone_count()) / m.get_capacity(), 2))
+
+    print("\nprobing example 1")
+    print("-----------------")
+    for probing in PROBING_STRATEGIES:
+        m = HashMap(53, hash_function_1, probing=probing)
+        for i in range(60):
+            m.put('key' + str(i), i)
+        for i in range(0, 60, 3):
+            m.remove('key' + str(i))
+        print(probing, m.get_size(), m.get_capacity(), m.get_tombstone_count(), m.get('key1'), m.contains_key('key3'),
+              m.get_keys_and_values().length())
+
+    print("\nshrink_threshold example 1")
+    print("--------------------------")
+    for incremental_resize in (False, True):
+        m = HashMap(11, hash_function_1, incremental_resize, shrink_threshold=0.125)
+        m.put_many(('key' + str(i), i) for i in range(1000))
+        print(m.get_size(), m.get_capacity())
+        m.remove_many('key' + str(i) for i in range(990))
+        print(m.get_size(), m.get_capacity(), m.get_tombstone_count(), m.get('key995'))
+        for i in range(20):
+            m.put('key' + str(i), i)
+            m.remove('key' + str(i))
+        print(m.get_size(), m.get_capacity())
+        m.clear()
+        print(m.get_size(), m.get_capacity())
+
+    print("\ncapacity_policy example 1")
+    print("-------------------------")
+    for probing in ('quadratic', 'double_hashing', 'robin_hood'):
+        m = HashMap(11, hash_function_1, probing=probing, capacity_policy='power_of_two', max_load=0.75)
+        for i in range(100):
+            m.put('key' + str(i), i)
+        print(probing, m.get_size(), m.get_capacity(), round(m.table_load(), 2), m.get('key50'), m.contains_key('key100'))
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1, incremental_resize=True)
+    for i in range(8):
+        m.put('key' + str(i), i)
+    m.remove('key3')
+    print(len(m.keys()), 'key1' in m.keys(), 'key3' in m.keys(), ('key2', 2) in m.items(), sum(m.values()))
+    print(sorted(m.keys()))
+    print(sum(1 for _ in m for _ in m), m.get_size() ** 2)
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print('RuntimeError:', error, m.get_size())
+
+    print("\ndump / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'hash_map_oa.bin')
+    m = HashMap(11, hash_function_1, probing='double_hashing')
+    for i in range(30):
+        m.put('key' + str(i), i * 10)
+    m.remove('key0')
+    m.dump(path)
+    m2 = HashMap.load(path)
+    print(m2.get_size(), m2.get_capacity(), m2.get_tombstone_count(), m2.get('key29'), m2.get('key0'),
+          m2.get_keys_and_values()._data == m.get_keys_and_values()._data)
+    m3 = HashMap.load(path, hash_function_2)
+    print(m3.get_size(), m3.get_capacity(), m3.get_tombstone_count(), m3.get('key29'))
+    os.remove(path)
@@ -6,29 +6,93 @@
 # Description:      Write methods to implement a HashMap, using separate chaining (linked lists at each array index) to resolve table collisions. 
 
 
+import collections
+import math
+import multiprocessing
+import os
+
 from a6_include import (DynamicArray, LinkedList,
                         hash_function_1, hash_function_2)
+from hash_capacity import CAPACITY_POLICIES, mix_batch, mixed_hash_function, next_power_of_two
+from hash_map_io import gc_paused, read_dump, resolve_function, same_function, write_dump
+from hash_map_views import ItemsView, KeysView, ValuesView
+from hash_vectorized import hash_batch
+from tree_bucket import TreeBucket
+
+
+def _unchanged(value: object) -> object:
+    """Update function of setdefault, which keeps the current value of a key."""
+    return value
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 treeify_threshold: int = 8,
+                 untreeify_threshold: int = 6,
+                 shrink_threshold: float = None,
+                 capacity_policy: str = 'prime',
+                 max_load: float = 1.0,
+                 grow_factor: float = 2) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        A bucket whose linked list reaches treeify_threshold nodes is
+        converted into a TreeBucket (balanced tree ordered by hash and key),
+        and converted back into a linked list once it shrinks to
+        untreeify_threshold nodes.  treeify_threshold=None keeps every
+        bucket a linked list.
+
+        put multiplies the capacity by grow_factor once the table load
+        reaches max_load.  capacity_policy selects how capacities are
+        rounded and keys are indexed (see hash_capacity): 'prime', or
+        'power_of_two', where the hashes are mixed and indexed with a bit
+        mask, and a grow_factor under 2 rounds up to doubling.
+
+        If shrink_threshold is given, remove halves the capacity (but not
+        below the initial capacity) once the table load falls below it, and
+        clear goes back to the initial capacity.  It must be less than
+        max_load divided by the larger of grow_factor and 2, so that the
+        load after a resize in either direction is between the two, and a
+        few puts / removes cannot trigger another one.  With the default
+        max_load and grow_factor, 0.25 is a good value.
         """
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"capacity_policy must be one of {CAPACITY_POLICIES}, not {capacity_policy!r}")
+        if max_load <= 0 or grow_factor <= 1:
+            raise ValueError("max_load must be greater than 0, and grow_factor greater than 1")
+        if shrink_threshold is not None and not 0 < shrink_threshold < max_load / max(grow_factor, 2):
+            raise ValueError(f"shrink_threshold must be between 0 and {max_load / max(grow_factor, 2)}, the table load just after the table grows")
+
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two with the power_of_two capacity policy
+        self._capacity_policy = capacity_policy
+        self._set_capacity(self._next_prime(capacity) if capacity_policy == 'prime' else next_power_of_two(capacity))
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
+        # KEYS ARE HASHED WITH _hash_key, WHICH ALSO MIXES THE HASHES WITH THE POWER_OF_TWO CAPACITY POLICY.  THE NODES CACHE ITS RESULT
         self._hash_function = function
+        self._hash_key = function if capacity_policy == 'prime' else mixed_hash_function(function)
         self._size = 0
 
+        # TABLE LOAD AT WHICH PUT GROWS THE TABLE, AND THE FACTOR IT GROWS BY
+        self._max_load = max_load
+        self._grow_factor = grow_factor
+
+        self._treeify_threshold = treeify_threshold
+        self._untreeify_threshold = untreeify_threshold
+
+        # LOAD BELOW WHICH REMOVE SHRINKS THE TABLE, AND THE CAPACITY IT NEVER SHRINKS BELOW
+        self._shrink_threshold = shrink_threshold
+        self._min_capacity = self._capacity
+
+        # NUMBER OF CHANGES THAT INVALIDATE ITERATIONS IN PROGRESS (INSERTED OR REMOVED KEYS, RESIZES)
+        self._modifications = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -72,6 +136,28 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        This helper method returns the given capacity rounded up to a capacity allowed by the capacity policy: a prime number, or a power of two.
+        """
+        if self._capacity_policy == 'power_of_two':
+            return next_power_of_two(capacity)
+        if not self._is_prime(capacity):
+            return self._next_prime(capacity)
+        return capacity
+
+    def _set_capacity(self, capacity: int) -> None:
+        """
+        This helper method sets the capacity of the hash table, and the mask giving the index of a hash with the power_of_two capacity policy: the index
+        is hash & (capacity - 1), so no lookup divides.  With the prime capacity policy, the mask is None and the index is hash % capacity.
+        """
+        self._capacity = capacity
+        self._mask = capacity - 1 if self._capacity_policy == 'power_of_two' else None
+
+    def _grown_capacity(self) -> int:
+        """This helper method returns the capacity put grows the table to: the current capacity times the grow factor, and at least one more."""
+        return max(int(self._capacity * self._grow_factor), self._capacity + 1)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -98,8 +184,8 @@ class HashMap:
         
             Load Factor (lowercase lambda) = num elements (size) / num buckets (capacity) 
         
-        If the table load is greater or equal to 1.0, the capacity of the hash table is doubled, and incremented if it is not a prime number after being doubled. 
-        This helps ensure the hash table has fewer collisions and maintains an average time complexity of O(1) for its operations.
+        If the table load is greater or equal to 1.0 (max_load), the capacity of the hash table is doubled (multiplied by grow_factor), and incremented if it is
+        not a prime number (or a power of two, with the power_of_two capacity policy) after being doubled.  This helps ensure the hash table has fewer collisions and maintains an average time complexity of O(1) for its operations.
         
         This method uses separate chaining to resolve table collisions.  Each array index in the hash table's underlying dynamic array consists of a linked list.
         If an element already exists at an index, the new key/value pair is added to the linked list.
@@ -108,31 +194,179 @@ class HashMap:
         # CALCULATE TABLE LOAD AND DOUBLE THE CAPACITY OF THE HASH TABLE IF NEEDED
         table_load = self.table_load()
         
-        if table_load >= 1.0:  
-            curr_capacity = self._capacity
-            new_capacity = curr_capacity * 2
+        if table_load >= self._max_load:  
+            new_capacity = self._grown_capacity()
             self.resize_table(new_capacity)
 
+        # INSERT THE KEY/VALUE PAIR, OR UPDATE THE VALUE IF THE KEY ALREADY EXISTS
+        self._insert(key, value, self._hash_key(key))
+
+    def _insert(self, key: str, value: object, _hash: int, update: callable = None) -> object:
+        """
+        This helper method inserts or updates a key/value pair whose hash has already been computed, without checking the table load, and returns the 
+        value stored for the key.
+        
+        It is shared by put and put_many, so that a batch of pairs can be inserted after the table has been sized once up front.
         
-        # CALCULATE THE INDEX OF THE KEY TO BE INSERTED/UPDATED USING THE HASH FUNCTION AND HASH TABLE CAPACITY
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity
+        If update is given, the value stored is update(current value) for a key already in the table, or update(value) for a new key - so value acts as 
+        the default of the key.  This lets increment, setdefault and upsert compute the new value from the current one with a single search of the 
+        bucket.
+        
+        If the new node makes the linked list of the bucket reach the treeify threshold, the bucket is converted into a TreeBucket.
+        """
+        # CALCULATE THE INDEX OF THE KEY TO BE INSERTED/UPDATED USING THE HASH AND HASH TABLE CAPACITY
+        index = _hash & self._mask if self._mask is not None else _hash % self._capacity
         
         hash_map_bucket = self._buckets[index]
         
-        # IF THE LINKED LIST AT THAT ARRAY LOCATION IS EMPTY, INSERT NODE CONTAINING THE KEY, VALUE PAIR AT THE FRONT OF THE LL
-        if hash_map_bucket.length() == 0:        
-            hash_map_bucket.insert(key, value)
-            self._size += 1
-        # ELSE IF THE LINKED LIST CONTAINS THAT KEY, UPDATE THE KEY'S VALUE, OR INSERT THE NEW KEY/VALUE AT THE FRONT OF THE LL IF NOT ALREADY IN THE TABLE
-        else:
-            existing_node_with_key = hash_map_bucket.contains(key)
+        # IF THE LINKED LIST CONTAINS THAT KEY, UPDATE THE KEY'S VALUE
+        if hash_map_bucket.length() != 0:
+            existing_node_with_key = hash_map_bucket.contains(key, _hash)
             if existing_node_with_key:
-                existing_node_with_key.value = value
-            else:
-                hash_map_bucket.insert(key, value)
-                self._size += 1
+                existing_node_with_key.value = value if update is None else update(existing_node_with_key.value)
+                return existing_node_with_key.value
+        
+        # OTHERWISE INSERT THE NEW KEY/VALUE (AND HASH) AT THE FRONT OF THE LL
+        if update is not None:
+            value = update(value)
+        hash_map_bucket.insert(key, value, _hash)
+        self._size += 1
+        self._modifications += 1
+        self._treeify(index)
+        return value
+
+    def _treeify(self, index: int) -> None:
+        """
+        This helper method converts the linked list at the given index into a TreeBucket, if it has reached the treeify threshold.
+        """
+        hash_map_bucket = self._buckets[index]
+        if (self._treeify_threshold is None or isinstance(hash_map_bucket, TreeBucket)
+                or hash_map_bucket.length() < self._treeify_threshold):
+            return
+        
+        # NODES ADDED DIRECTLY TO A LINKED LIST (NOT THROUGH PUT) HAVE NO CACHED HASH, WHICH THE TREE IS ORDERED BY
+        for node in hash_map_bucket:
+            if node.hash is None:
+                node.hash = self._hash_key(node.key)
+        
+        self._buckets[index] = TreeBucket.from_nodes(hash_map_bucket)
 
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples into the hash table.
+        
+        Calling put in a loop checks the table load before every insert, and resizes (rehashing every node) each time the load reaches 1.0 (max_load).  
+        Instead, this method resizes the table at most once, to a capacity large enough to hold the current size plus every pair in the batch, and then 
+        inserts all pairs in a single pass without checking the table load again.
+        
+        Duplicate keys in the batch only update the value, so the table may end up slightly larger than strictly needed.
+        """
+        pairs = list(pairs)
+        
+        # SIZE THE TABLE ONCE SO THE LOAD STAYS AT OR UNDER MAX_LOAD AFTER THE WHOLE BATCH IS INSERTED
+        required_capacity = math.ceil((self._size + len(pairs)) / self._max_load)
+        if required_capacity > self._capacity:
+            self.resize_table(required_capacity)
+        
+        # HASH ALL KEYS OF THE BATCH AT ONCE, THEN INSERT EACH PAIR
+        for (key, value), _hash in zip(pairs, self._hash_keys(pair[0] for pair in pairs)):
+            self._insert(key, value, _hash)
+
+    def _hash_keys(self, keys) -> list:
+        """
+        This helper method returns a list with the hash of every key in an iterable of keys, in the same order, as _hash_key computes it.  The keys are
+        hashed at once with hash_batch, and mixed at once with the power_of_two capacity policy.
+        """
+        hashes = hash_batch(keys, self._hash_function)
+        if self._capacity_policy == 'power_of_two':
+            hashes = mix_batch(hashes)
+        return hashes
+
+    def _add_count(self, key: str, count: int, _hash: int) -> None:
+        """
+        This helper method adds count to the value of a key whose hash has already been computed, or inserts the key with a value of count if it is not
+        in the hash table, without checking the table load.  The bucket is searched only once.
+        """
+        index = _hash & self._mask if self._mask is not None else _hash % self._capacity
+        node = self._buckets[index].contains(key, _hash)
+        if node is not None:
+            node.value += count
+            return
+        
+        self._buckets[index].insert(key, count, _hash)
+        self._size += 1
+        self._modifications += 1
+        self._treeify(index)
+
+    def _merge_counts(self, keys: list, hashes: list, counts: list) -> None:
+        """
+        This helper method adds partial counts (lists of keys, their hashes and their counts) to the counts held in the hash table.  The table is sized 
+        once up front for the case where every key is new.
+        """
+        required_capacity = self._size + len(keys)
+        if required_capacity > self._capacity:
+            self.resize_table(required_capacity)
+        
+        for key, _hash, count in zip(keys, hashes, counts):
+            self._add_count(key, count, _hash)
+
+    def _update(self, key: str, value: object, update: callable) -> object:
+        """
+        This helper method checks the table load the same as put, then inserts or updates the key with _insert and the given update function, and 
+        returns the value stored for the key.
+        """
+        if self.table_load() >= self._max_load:
+            self.resize_table(self._grown_capacity())
+        
+        return self._insert(key, value, self._hash_key(key), update)
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        This method adds delta to the value of the key, or inserts the key with a value of delta if it is not in the hash table, and returns the new 
+        value.  The key is hashed and its bucket searched only once, where get followed by put would do both twice.
+        """
+        return self._update(key, 0, lambda value: value + delta)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        This method returns the value of the key if it is in the hash table.  Otherwise it inserts the key with the default value, and returns that 
+        value.  The key is hashed and its bucket searched only once.
+        """
+        return self._update(key, default, _unchanged)
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
+        """
+        This method sets the value of the key to function(current value), or to function(default) if the key is not in the hash table, and returns the
+        new value.  The function is called exactly once, and the key is hashed and its bucket searched only once.
+        """
+        return self._update(key, default, function)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys, and returns a dynamic array of their values in the same order.  A key that is not present 
+        in the hash table has a value of None in the returned array.
+        
+        All keys of the batch are hashed at once with _hash_keys, then each bucket is searched the same as get.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, _hash in zip(keys, self._hash_keys(keys)):
+            hash_map_bucket = self._buckets[_hash & self._mask if self._mask is not None else _hash % self._capacity]
+            node = hash_map_bucket.contains(key, _hash) if hash_map_bucket.length() != 0 else None
+            values.append(None if node is None else node.value)
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        This method removes every key from an iterable of keys from the hash table.  Keys that are not present are ignored, the same as remove.
+        
+        All keys of the batch are hashed at once with _hash_keys, and each key is removed the same as remove.  With automatic shrinking on, the table 
+        is shrunk only once, after the whole batch is removed, instead of being rebuilt every time the load falls below the shrink threshold.
+        """
+        keys = list(keys)
+        for key, _hash in zip(keys, self._hash_keys(keys)):
+            self._delete(key, _hash)
+        self._shrink()
 
     def empty_buckets(self) -> int:
         """
@@ -163,47 +397,54 @@ class HashMap:
         This method clears the contents of the hash map's underlying dynamic array.  It iterates through the array and assigns an empty linked list to each
         index.  
         
-        The capacity of the hash table remains unchanged.  The size of the hash table however is updated to ZERO to reflect that it no longer contains any
-        nodes with key/value pairs.
+        The capacity of the hash table remains unchanged, unless automatic shrinking is on - then it goes back to the initial capacity.  The size of the hash
+        table however is updated to ZERO to reflect that it no longer contains any nodes with key/value pairs.
         """
+        if self._shrink_threshold is not None and self._capacity > self._min_capacity:
+            self._set_capacity(self._min_capacity)
+            self._buckets = DynamicArray([None] * self._capacity)
+        
         for i in range(self._capacity):
             self._buckets[i] = LinkedList()
         
         self._size = 0
+        self._modifications += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
         This method updates the capacity of the hash table, and in doing so, updates the underlying dynamic array and the linked list at each array index's 
         location.
         
-        It ensures the capacity is a prime number, and not less than 1.
+        It ensures the capacity is a prime number (or a power of two, with the power_of_two capacity policy), and not less than 1.
         
         A new dynamic array is created, and each element of the original array is traversed.  Each node in the linked list at each array index is also recomputed.
         This is because if the array capacity is increased, element that may have previously had a collision, and were added to a linked list, may no longer need
-        to be linked at the same index, as there will be more spots available in the array.  As such, all nodes are rehashed using the hash function and new 
-        capacity to determine the new index to insert into the hash table's underlying dynamic array.
+        to be linked at the same index, as there will be more spots available in the array.  As such, the new index of every node is recomputed from the hash 
+        cached in the node when it was inserted and the new capacity.  The hash function is not called again.
+        
+        The existing nodes are relinked into the linked lists of the new dynamic array, instead of inserting a copy of each node, so resizing does not
+        allocate any new nodes.  Nodes of tree buckets are copied into linked list nodes, and any new bucket that still reaches the treeify threshold is
+        converted into a tree bucket.
         """
         
         # IF THE NEW CAPACITY IS LESS THAN 1, RETURN AND DO NOTHING
         if new_capacity < 1:
             return
     
-        # IF THE NEW CAPACITY IS NOT A PRIME NUMBER, INCREMENT THE NUMBER UNTIL IT IS
+        # IF THE NEW CAPACITY IS NOT A PRIME NUMBER (OR A POWER OF TWO), INCREMENT THE NUMBER UNTIL IT IS
         curr_capacity = self._capacity
-        if not self._is_prime(new_capacity):
-            new_capacity =  self._next_prime(new_capacity)
+        new_capacity = self._round_capacity(new_capacity)
             
         new_table_load = self._size / new_capacity
         
-        # IF THE TABLE LOAD IS NOT 1.0, DOUBLE THE CAPACITY
-        while new_table_load > 1.0:
-            new_capacity =  new_capacity * 2
-            if not self._is_prime(new_capacity):                
-                 new_capacity =  self._next_prime(new_capacity)
+        # IF THE TABLE LOAD IS OVER MAX_LOAD, DOUBLE THE CAPACITY
+        while new_table_load > self._max_load:
+            new_capacity = self._round_capacity(new_capacity * 2)
             new_table_load = self._size / new_capacity
         
         # REASSIGN NEW CAPACITY TO THE HASH TABLE'S CAPACITY VARIABLE, AND CREATE A NEW DYNAMIC ARRAY    
-        self._capacity = new_capacity
+        self._set_capacity(new_capacity)
+        self._modifications += 1
         resized_buckets = DynamicArray()
         
         
@@ -212,22 +453,32 @@ class HashMap:
             resized_buckets.append(LinkedList())
 
 
-        # RECOMPUTE THE HASH FOR EACH NON-EMPTY ELEMENT OF THE ORIGINAL ARRAY, TO ADD VALUES IN THE NEW DYNAMIC ARRAY CREATED
+        # MOVE EACH NODE OF EACH NON-EMPTY LINKED LIST OF THE ORIGINAL ARRAY TO THE NEW DYNAMIC ARRAY CREATED, AT THE INDEX GIVEN BY ITS CACHED HASH AND
+        # THE NEW CAPACITY.  THE NODES ARE RELINKED, NOT COPIED, SO NO NEW NODES ARE CREATED
         for i in range(curr_capacity):
             if self._buckets[i].length() != 0:     
                 
-                # GET HEAD AND ITS KEY FROM LL FROM ORIGINAL HASH TABLE                
-                for node in self._buckets[i]:
-                    head = node
-                    head_key = head.key
-                    head_value = head.value
-
-                    # REHASH KEY FOR RESIZED HASH TABLE
-                    _hash = self._hash_function(head_key)
-                    index = _hash % self._capacity
+                # THE NODES OF A TREE BUCKET ARE COPIED INTO LINKED LIST NODES INSTEAD
+                if isinstance(self._buckets[i], TreeBucket):
+                    for node in self._buckets[i]:
+                        resized_buckets[node.hash & self._mask if self._mask is not None else node.hash % self._capacity].insert(node.key, node.value, node.hash)
+                    continue
                 
-                    hash_map_bucket = resized_buckets[index]
-                    hash_map_bucket.insert(head_key, head_value)   
+                # THE LINKED LIST ITERATOR MOVES TO THE NEXT NODE BEFORE RETURNING THE CURRENT ONE, SO THE CURRENT NODE CAN BE RELINKED SAFELY
+                for node in self._buckets[i]:
+                    
+                    # NODES ADDED DIRECTLY TO A LINKED LIST (NOT THROUGH PUT) HAVE NO CACHED HASH
+                    if node.hash is None:
+                        node.hash = self._hash_key(node.key)
+                    
+                    index = node.hash & self._mask if self._mask is not None else node.hash % self._capacity
+                    resized_buckets[index].insert_node(node)
+        
+        # CONVERT THE NEW BUCKETS THAT STILL HAVE TOO MANY NODES INTO TREE BUCKETS
+        if self._treeify_threshold is not None:
+            for i in range(new_capacity):
+                if resized_buckets[i].length() >= self._treeify_threshold:
+                    resized_buckets[i] = TreeBucket.from_nodes(resized_buckets[i])
           
         # AT END OF THE FUNCTION, REASSIGN THE HASH TABLE'S DYNAMIC ARRAY TO THE NEW ARRAY CREATED BY THIS FUNCTION                
         self._buckets = resized_buckets
@@ -239,18 +490,19 @@ class HashMap:
         table.
         
         The method first calculates the position in the hash table's underlying dynamic array that the key should be at.  It then iterates through the linked
-        list at each array index location until the key is found, or it has reached the end of the linked list.
+        list at each array index location until the key is found, or it has reached the end of the linked list.  The hash cached in each node is compared 
+        before its key, so nodes with a different hash are skipped without comparing the keys.  A tree bucket is searched in O(log n) instead.
         
         Time Complexity: O(1)
         """
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
+        _hash = self._hash_key(key)
+        index = _hash & self._mask if self._mask is not None else _hash % self._capacity
         hash_map_bucket = self._buckets[index]
         
         if hash_map_bucket.length() != 0:
-            for node in hash_map_bucket:
-                if node.key == key:
-                    return node.value
+            node = hash_map_bucket.contains(key, _hash)
+            if node is not None:
+                return node.value
         
         return None
         
@@ -267,14 +519,12 @@ class HashMap:
         if self._size == 0:
             return False
         
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
+        _hash = self._hash_key(key)
+        index = _hash & self._mask if self._mask is not None else _hash % self._capacity
         hash_map_bucket = self._buckets[index]
         
         if hash_map_bucket.length() != 0:
-            for node in hash_map_bucket:
-                if node.key == key:
-                    return True
+            return hash_map_bucket.contains(key, _hash) is not None
         
         return False
 
@@ -286,38 +536,170 @@ class HashMap:
         The method first calculates the position in the hash table's underlying dynamic array that the key should be at.  It then iterates through the linked
         list at each array index location until the key is found, or it has reached the end of the linked list.
         
-        The method uses the .remove method of the linked list class to efficiently remove the node from the linked list.
+        The method uses the .remove method of the linked list class to efficiently remove the node from the linked list.  A tree bucket that shrinks to 
+        the untreeify threshold is converted back into a linked list.  With automatic shrinking on, the table is then shrunk if its load has fallen below
+        the shrink threshold.
         
         Time Complexity: O(1)
         """
-        _hash = self._hash_function(key)
-        index = _hash % self._capacity        
+        if self._delete(key, self._hash_key(key)):
+            self._shrink()
+
+    def _delete(self, key: str, _hash: int) -> bool:
+        """
+        This helper method removes a key whose hash has already been computed, the same as remove but without shrinking the table, and returns True if 
+        the key was present.
+        """
+        index = _hash & self._mask if self._mask is not None else _hash % self._capacity
         hash_map_bucket = self._buckets[index]
         
-        if hash_map_bucket.length() != 0:
-            if hash_map_bucket.remove(key):
-                self._size -= 1
-            
-                  
+        if hash_map_bucket.length() == 0 or not hash_map_bucket.remove(key, _hash):
+            return False
+        
+        self._size -= 1
+        self._modifications += 1
+        
+        # CONVERT A TREE BUCKET THAT HAS SHRUNK BACK INTO A LINKED LIST
+        if isinstance(hash_map_bucket, TreeBucket) and hash_map_bucket.length() <= self._untreeify_threshold:
+            self._buckets[index] = hash_map_bucket.to_linked_list()
+        return True
+
+    def _shrink(self) -> None:
+        """
+        This helper method halves the capacity of the hash table (to a prime number, and not below the initial capacity) if automatic shrinking is on
+        and the table load has fallen below the shrink threshold, as many times as needed for the load to reach the threshold again (more than once 
+        only after remove_many).  The last halving at most doubles the load, which stays below max_load, so put does not grow the table again until 
+        about half of the new capacity has been added.
+        """
+        if self._shrink_threshold is None or self._capacity <= self._min_capacity:
+            return
+        
+        # HALVE UNTIL THE LOAD IS BACK AT OR OVER THE SHRINK THRESHOLD, SO A BATCH OF REMOVES IS FOLLOWED BY A SINGLE RESIZE
+        capacity = self._capacity
+        while capacity > self._min_capacity and self._size / capacity < self._shrink_threshold:
+            capacity = max(capacity // 2, self._min_capacity)
+        
+        if capacity != self._capacity:
+            self.resize_table(capacity)
+
+    def dump(self, path: str) -> None:
+        """
+        This method writes the hash map to a binary file (see hash_map_io), which HashMap.load reads back.  The file stores the capacity and capacity 
+        policy, the identity of the hash function, and the bucket index and cached hash of every node along with its key and value.
+        """
+        indices, hashes, keys, values = [], [], [], []
+        
+        for i in range(self._capacity):
+            for node in self._buckets[i]:
+                
+                # NODES ADDED DIRECTLY TO A LINKED LIST (NOT THROUGH PUT) HAVE NO CACHED HASH
+                if node.hash is None:
+                    node.hash = self._hash_key(node.key)
+                
+                indices.append(i)
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+        
+        write_dump(path, 'sc', self._capacity, self._hash_function, indices, hashes, keys, values, capacity_policy=self._capacity_policy)
+
+    @classmethod
+    def load(cls, path: str, function: callable = None, **kwargs) -> "HashMap":
+        """
+        This method reads a hash map written by dump, and returns it with the same capacity.  The hash function is found from its name in the file,
+        unless one is given.  Other keyword arguments are passed to the constructor.
+        
+        If the hash function gives the same hashes as the one the file was written with, and the capacity policy (the one of the file, unless another
+        is passed as a keyword argument) is the same, every node is linked directly into its bucket with its stored hash, in the same order as when it 
+        was dumped, so no key is hashed and the table is not resized.  Otherwise, every key/value pair is inserted again with put_many.  Either way, the
+        dumped capacity is the capacity automatic shrinking never goes below.
+        """
+        data = read_dump(path, 'sc')
+        if function is None:
+            function = resolve_function(data['function_name'])
+        
+        # THE CAPACITY POLICY OF THE FILE IS KEPT, UNLESS ANOTHER ONE IS GIVEN
+        kwargs.setdefault('capacity_policy', data['capacity_policy'])
+        
+        if not same_function(function, data['function_name'], data['probe_hash']) or kwargs['capacity_policy'] != data['capacity_policy']:
+            hash_map = cls(data['capacity'], function, **kwargs)
+            hash_map.put_many(zip(data['keys'], data['values']))
+            return hash_map
+        
+        # THE LINKED LISTS ARE FILLED IN A PLAIN LIST, WHICH THEN BECOMES THE DYNAMIC ARRAY OF A MAP CREATED WITH THE SMALLEST CAPACITY.  INSERT AT THE 
+        # FRONT OF EACH LINKED LIST IN REVERSE ORDER, SO EACH BUCKET ENDS UP IN ITS DUMPED ORDER
+        with gc_paused():
+            buckets = [LinkedList() for _ in range(data['capacity'])]
+            for index, _hash, key, value in zip(reversed(data['indices']), reversed(data['hashes']), reversed(data['keys']), reversed(data['values'])):
+                buckets[index].insert(key, value, _hash)
+        
+        hash_map = cls(1, function, **kwargs)
+        hash_map._buckets = DynamicArray(buckets)
+        hash_map._set_capacity(data['capacity'])
+        hash_map._min_capacity = data['capacity']
+        hash_map._size = data['size']
+        
+        # CONVERT THE BUCKETS THAT REACH THE TREEIFY THRESHOLD INTO TREE BUCKETS
+        if hash_map._treeify_threshold is not None:
+            for index, count in collections.Counter(data['indices']).items():
+                if count >= hash_map._treeify_threshold:
+                    hash_map._treeify(index)
+        
+        return hash_map
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         This method iterates through the hash table, and returns a dynamic array of tuples containing the key/value of each node in the hash table's linked
         lists.
         
-        It only adds a tuple if the linked list is not empty, and has nodes at that location.
+        Every key/value pair is copied into the new dynamic array.  To go through the pairs without copying them, iterate over items() instead.
         """
         
         da_tuples = DynamicArray()
         
-        for i in range(self._capacity):
-            hash_map_bucket = self._buckets[i]
-            if hash_map_bucket.length() != 0:    
-                    for node in hash_map_bucket:
-                        da_tuples.append((node.key, node.value))
+        for item in self.items():
+            da_tuples.append(item)
 
         return da_tuples
 
+    def keys(self) -> KeysView:
+        """
+        This method returns a view of the keys of the hash map.  Iterating over the view streams the keys directly from the buckets, without copying them.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        This method returns a view of the values of the hash map.  Iterating over the view streams the values directly from the buckets, without copying
+        them.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        This method returns a view of the (key, value) tuples of the hash map.  Iterating over the view streams the pairs directly from the buckets, 
+        without copying them into a dynamic array.
+        """
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of every node of the hash table, going through the bucket at each array index in order.  The position is kept 
+        in the generator itself, so any number of iterations may run at the same time.
+        
+        It raises RuntimeError if a key is inserted or removed, or the table is resized, while the iteration is in progress.
+        """
+        modifications = self._modifications
+        buckets = self._buckets
+        
+        for i in range(self._capacity):
+            hash_map_bucket = buckets[i]
+            if hash_map_bucket.length() != 0:
+                for node in hash_map_bucket:
+                    yield node
+                    if self._modifications != modifications:
+                        raise RuntimeError("HashMap changed during iteration")
+
 
 def find_mode(da: DynamicArray): # -> tuple(DynamicArray, int):
     """
@@ -327,11 +709,10 @@ def find_mode(da: DynamicArray): # -> tuple(DynamicArray, int):
     integer representing how often those values ocurred.
     
     The method first creates a new hash table object from the hash table class.  It then iterates through the dynamic array given to the function, and counts each
-    occurrence of the element. The highest count (mode) is also tracked.
-    
-    The method .get_keys_and_values of the hash table is called to return a dynamic array with the computed keys/counts. O(N)
+    occurrence of the element with increment, which hashes the element and searches its bucket once per occurrence. The highest count (mode) is also tracked.
     
-    This new dynamic array is traversed, O(N), and if the count matches the mode, the tuple key is added to a new dynamic array.
+    The items view of the hash table is traversed, O(N), and if the count matches the mode, the key is added to a new dynamic array.  The view streams
+    the keys/counts directly from the hash table, so they are not copied into another dynamic array first.
     
     Finally, the tuple is returned which consists of this dynamic array as the first element, and the integer representing the mode as the second element.
     
@@ -342,37 +723,115 @@ def find_mode(da: DynamicArray): # -> tuple(DynamicArray, int):
     map = HashMap()
     highest_count = 0
     
-    # IMPLEMENT THROUGH THE DYNAMIC ARRAY, AND COUNT EACH VALUE
+    # IMPLEMENT THROUGH THE DYNAMIC ARRAY, AND COUNT EACH VALUE.  INCREMENT ADDS 1 TO THE COUNT OF A VALUE ALREADY IN THE HASH TABLE, OR ADDS IT WITH A 
+    # COUNT OF 1, WITH A SINGLE LOOKUP.  SET HIGHEST COUNT TO HIGHER OF ITSELF AND THE NEW COUNT VALUE
     for i in range(da.length()):
+        count = map.increment(da[i])
+        if count > highest_count:
+            highest_count = count
         
-        value_of_key = map.get(da[i])
-        
-        # IF VALUE IS ALREADY IN THE HASH TABLE, INCREMENT THE COUNTER. SET HIGHEST COUNT TO HIGHER OF ITSELF AND THE NEW COUNT VALUE
-        if value_of_key:
-            map.put(da[i], value_of_key +1)
-            if value_of_key + 1 > highest_count:
-                highest_count = value_of_key +1
-                
-        # IF VALUE IS NOT IN THE HASH TABLE, ADD A COUNT OF 1, AND SET HIGHEST COUNT TO 1 IF IT IS CURRENTLY LESS THAN 1. 
-        else:
-            map.put(da[i], 1)
-            if 1 > highest_count:
-                highest_count = 1
-        
-    # GET DYNAMIC ARRAY OF KEYS AND VALUES USING HASH TABLE METHOD        
-    item_counter = map.get_keys_and_values()
-    
     result_da = DynamicArray()
     
-    # TRAVERSE THE ITEM COUNTER DYNAMIC ARRAY, AND IF THE TUPLE'S COUNT IS EQUAL TO THE MODE, ADD THAT ITEM TO THE RETURN DYNAMIC ARRAY
-    for i in range(item_counter.length()):
-        if item_counter[i][1] == highest_count:
-            result_da.append(item_counter[i][0])
+    # TRAVERSE THE KEYS AND COUNTS OF THE HASH TABLE, AND IF THE COUNT IS EQUAL TO THE MODE, ADD THAT ITEM TO THE RETURN DYNAMIC ARRAY
+    for key, count in map.items():
+        if count == highest_count:
+            result_da.append(key)
     
     # RETURN TUPLE OF THE DYNAMIC ARRAY CONTAINING ITEMS WITH THE HIGHEST COUNT, AND AN INTEGER REPRESENTING THE MODE
     return(result_da, highest_count)
            
 
+# INITIAL CAPACITY OF THE HASH MAPS COUNTING THE ITEMS OF find_mode_parallel
+_COUNT_CAPACITY = 4096
+
+# INPUT OF find_mode_parallel IN A FORKED WORKER PROCESS, SET BY _init_worker, SO THAT ITS CHUNKS DO NOT HAVE TO BE SENT TO IT
+_find_mode_input = None
+
+
+def _init_worker(data: list) -> None:
+    """
+    Initializer of the worker processes of find_mode_parallel.  It stores the input (or None, if the chunks are sent with each task) in the worker.  
+    Forked workers receive it with the process, without pickling, and the calling process never rebinds _find_mode_input, so calls from several 
+    threads at once cannot see each other's input.
+    """
+    global _find_mode_input
+    _find_mode_input = data
+
+
+def _count(items: list, function: callable) -> HashMap:
+    """
+    Count the items of a list in a hash map, hashing all items in one batch.  The map starts at up to _COUNT_CAPACITY buckets rather than 11, and 
+    doubles its capacity once every bucket is used, the same as put.  It is not sized for the whole list, as items may repeat many times.
+    """
+    counts = HashMap(min(len(items), _COUNT_CAPACITY), function)
+    for key, _hash in zip(items, hash_batch(items, function)):
+        if counts._size >= counts._capacity:
+            counts.resize_table(counts._capacity * 2)
+        counts._add_count(key, 1, _hash)
+    return counts
+
+
+def _count_chunk(task: tuple) -> tuple:
+    """
+    Worker function of find_mode_parallel.  It counts the items of one chunk of the input, and returns the partial counts as a tuple of lists of the 
+    keys, their hashes and their counts.
+    
+    task is a tuple of the start and stop index of the chunk in the input, the hash function, and the chunk itself - or None if the worker was forked
+    and reads the chunk from the inherited input instead.
+    """
+    start, stop, function, chunk = task
+    if chunk is None:
+        chunk = _find_mode_input[start:stop]
+    
+    nodes = list(_count(chunk, function)._iter_entries())
+    return [node.key for node in nodes], [node.hash for node in nodes], [node.value for node in nodes]
+
+
+def find_mode_parallel(da: DynamicArray, processes: int = None, chunk_size: int = None, function: callable = hash_function_1):
+    """
+    This method is a parallel version of find_mode, and returns the same tuple of the dynamic array of the most frequently occurring items and their
+    frequency (the items may be in a different order).
+    
+    The input is split into chunks of chunk_size elements (by default, one chunk per process), and each chunk is counted in its own hash map by a 
+    pool of worker processes (by default, one per CPU).  Each item is hashed once (each chunk in one batch), and its count is found and incremented 
+    with a single search of its bucket.  The partial counts are then merged into one hash map, adding up the counts of the same key using the hash 
+    computed by the worker, so no key is hashed twice.  Merging touches each distinct key of each chunk once, so it is much cheaper 
+    than counting when items repeat, and costs up to as much as counting when they do not.  With one process, or a single chunk, the input is counted
+    in this process without any merge.
+    
+    Where worker processes are started by forking, they read their chunks from the input handed to them by the pool initializer (inherited, not 
+    pickled), and only the start and stop index of each chunk is sent to them.  Otherwise each chunk is sent to its worker.
+    """
+    # THE DYNAMIC ARRAY DOES NOT SUPPORT ITERATION OR SLICING, SO THE CHUNKS ARE TAKEN FROM ITS UNDERLYING LIST
+    data = da._data
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(data) // processes))
+    
+    # COUNT THE CHUNKS IN THE WORKER PROCESSES, AND MERGE EACH PARTIAL COUNT AS SOON AS IT IS RETURNED
+    if processes == 1 or chunk_size >= len(data):
+        counts = _count(data, function)
+    else:
+        fork = 'fork' in multiprocessing.get_all_start_methods()
+        tasks = [(start, min(start + chunk_size, len(data)), function, None if fork else data[start:start + chunk_size]) 
+                 for start in range(0, len(data), chunk_size)]
+        
+        counts = HashMap(11, function)
+        context = multiprocessing.get_context('fork' if fork else None)
+        with context.Pool(processes, initializer=_init_worker, initargs=(data if fork else None,)) as pool:
+            for keys, hashes, partial_counts in pool.imap_unordered(_count_chunk, tasks):
+                counts._merge_counts(keys, hashes, partial_counts)
+    
+    # THE MODE IS THE HIGHEST MERGED COUNT
+    highest_count = max(counts.values(), default=0)
+    result_da = DynamicArray()
+    for key, count in counts.items():
+        if count == highest_count:
+            result_da.append(key)
+    
+    return(result_da, highest_count)
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -574,4 +1033,88 @@ if __name__ == "__main__":
     for case in test_cases:
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
-        print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
\ No newline at end of file
+        print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nfind_mode_parallel example 1")
+    print("----------------------------")
+    for case in test_cases:
+        da = DynamicArray(case)
+        mode, frequency = find_mode_parallel(da, processes=2, chunk_size=4)
+        print(f"Input: {da}\nMode : {sorted(mode._data)}, Frequency: {frequency}, same as find_mode: {sorted(mode._data) == sorted(find_mode(da)[0]._data)}\n")
+    print("\nput_many / get_many / remove_many example 1")
+    print("-------------------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many(('key' + str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(m.get_many(['key0', 'key50', 'key99', 'key100']))
+    m.remove_many('key' + str(i) for i in range(0, 100, 2))
+    print(m.get_size(), m.get_capacity(), m.contains_key('key0'), m.contains_key('key1'))
+
+    print("\ntreeify example 1")
+    print("-----------------")
+    # EVERY PERMUTATION OF THE SAME CHARACTERS HAS THE SAME HASH WITH hash_function_1, SO ALL KEYS LAND IN ONE BUCKET
+    m = HashMap(11, hash_function_1, treeify_threshold=4, untreeify_threshold=2)
+    for key in ('abc', 'acb', 'bac', 'bca', 'cab', 'cba'):
+        m.put(key, key.upper())
+    print(m.get_size(), m.get('bca'), m.contains_key('bcd'))
+    print(m._buckets[hash_function_1('abc') % m.get_capacity()])
+    for key in ('abc', 'acb', 'bac', 'bca'):
+        m.remove(key)
+    print(m.get_size(), m.get('cba'))
+    print(m._buckets[hash_function_1('abc') % m.get_capacity()])
+
+    print("\nshrink_threshold example 1")
+    print("--------------------------")
+    m = HashMap(11, hash_function_1, shrink_threshold=0.25)
+    m.put_many(('key' + str(i), i) for i in range(1000))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many('key' + str(i) for i in range(990))
+    print(m.get_size(), m.get_capacity(), m.get('key995'), m.empty_buckets())
+    for i in range(20):
+        m.put('key' + str(i), i)
+        m.remove('key' + str(i))
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\ncapacity_policy example 1")
+    print("-------------------------")
+    m = HashMap(11, hash_function_1, capacity_policy='power_of_two', max_load=0.75)
+    for i in range(100):
+        m.put('key' + str(i), i)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2), m.empty_buckets(), m.get('key50'))
+    m.resize_table(20)
+    print(m.get_size(), m.get_capacity(), m.get('key99'))
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(8):
+        m.put('key' + str(i), i)
+    m.remove('key3')
+    print(len(m.keys()), 'key1' in m.keys(), 'key3' in m.keys(), ('key2', 2) in m.items(), sum(m.values()))
+    print(sorted(m.keys()))
+    print(sum(1 for _ in m.keys() for _ in m.items()), m.get_size() ** 2)
+    for key, value in m.items():
+        m.put(key, value * 10)
+    print(m.values())
+    try:
+        for key in m.keys():
+            m.put(key + '!', 0)
+    except RuntimeError as error:
+        print('RuntimeError:', error, m.get_size())
+
+    print("\ndump / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'hash_map_sc.bin')
+    m = HashMap(11, hash_function_1)
+    for i in range(30):
+        m.put('key' + str(i), i * 10)
+    m.dump(path)
+    m2 = HashMap.load(path)
+    print(m2.get_size(), m2.get_capacity(), m2.get('key29'), m2.get_keys_and_values()._data == m.get_keys_and_values()._data)
+    m3 = HashMap.load(path, hash_function_2)
+    print(m3.get_size(), m3.get_capacity(), m3.get('key29'))
+    os.remove(path)
@@ -0,0 +1,224 @@
+# Description:      HashMap partitioned across worker processes.  Each key belongs to one shard, chosen from its hash (hash % number of shards), and
+#                   each shard is a worker process owning a local hash_map_oa.HashMap or hash_map_sc.HashMap.
+#
+#                   The batch methods put_many / get_many / remove_many split a batch by shard, send every shard its part, and only then wait for the
+#                   replies, so all shards work on their part of the batch at the same time, each on its own core and with its own GIL.  Single key
+#                   methods are also available, but pay one round trip to a worker process each.
+
+
+import multiprocessing
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap
+from hash_vectorized import hash_batch
+
+
+def _shard_worker(connection, map_class: type, capacity: int, function: callable) -> None:
+    """
+    Main loop of a shard's worker process.  It receives (method name, argument) requests over the connection, calls the method on its local hash map,
+    and sends back a tuple of True and the result, until it receives None.
+
+    An exception raised by the method (such as a key the hash function cannot hash), or by pickling its result, is sent back as a tuple of False and 
+    the exception, to be raised again in the calling process, and the worker goes on serving requests.  An exception that cannot be pickled is sent 
+    as a RuntimeError with its description.
+    """
+    hash_map = map_class(capacity, function)
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+
+        method, argument = request
+        try:
+            if method == 'get_many':
+                result = hash_map.get_many(argument)._data
+            elif method == 'get_keys_and_values':
+                result = hash_map.get_keys_and_values()._data
+            elif argument is None:
+                result = getattr(hash_map, method)()
+            else:
+                result = getattr(hash_map, method)(argument)
+
+            # THE REPLY IS PICKLED BEFORE ANY OF IT IS SENT, SO A RESULT THAT CANNOT BE PICKLED CAN STILL BE REPLACED WITH AN ERROR
+            connection.send((True, result))
+        except Exception as error:
+            try:
+                connection.send((False, error))
+            except Exception:
+                connection.send((False, RuntimeError(f"shard {method} raised {error!r}")))
+
+    connection.close()
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 shards: int = 4,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 map_class: type = HashMap) -> None:
+        """
+        Initialize new HashMap partitioned across the given number of
+        worker processes.  Each worker holds a map_class (hash_map_sc.HashMap
+        or hash_map_oa.HashMap) created with the given capacity and hash
+        function.
+
+        The hash function must be picklable (a module level function), as
+        it is sent to every worker.  The worker processes are stopped by
+        close(), or at the end of a with block.
+        """
+        self._hash_function = function
+        self._connections = []
+        self._processes = []
+
+        for _ in range(shards):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, args=(child_connection, map_class, capacity, function), daemon=True)
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+    def __enter__(self) -> "ShardedHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        This method stops every worker process.  The contents of the hash map are lost.
+        """
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for process in self._processes:
+            process.join()
+
+        self._connections = []
+        self._processes = []
+
+    def _shard(self, key: str) -> int:
+        """This helper method returns the shard of a key."""
+        return self._hash_function(key) % len(self._connections)
+
+    def _call(self, shard: int, method: str, argument=None):
+        """
+        This helper method calls a method of one shard's hash map, and returns the result.  An exception raised by the method in the worker is raised
+        again here.
+        """
+        self._connections[shard].send((method, argument))
+        succeeded, result = self._connections[shard].recv()
+        if not succeeded:
+            raise result
+        return result
+
+    def _call_all(self, method: str, arguments: list) -> list:
+        """
+        This helper method calls a method on the hash map of every shard with that shard's argument, and returns the list of results.  Every request is
+        sent before waiting for any reply, so the shards run in parallel.  Every reply is received before the first exception raised by a shard is 
+        raised again here, so no reply is left waiting on its connection.
+        """
+        for connection, argument in zip(self._connections, arguments):
+            connection.send((method, argument))
+        replies = [connection.recv() for connection in self._connections]
+
+        for succeeded, result in replies:
+            if not succeeded:
+                raise result
+        return [result for _, result in replies]
+
+    def _split(self, keys: list) -> list:
+        """
+        This helper method returns, for each shard, the list of positions in the given list of keys that belong to that shard.  The keys are hashed
+        together in one batch.
+        """
+        positions = [[] for _ in self._connections]
+        num_shards = len(self._connections)
+        for i, _hash in enumerate(hash_batch(keys, self._hash_function)):
+            positions[_hash % num_shards].append(i)
+        return positions
+
+    def get_size(self) -> int:
+        """Return size of map, the total size of every shard."""
+        return sum(self._call_all('get_size', [None] * len(self._connections)))
+
+    def put(self, key: str, value: object) -> None:
+        """This method inserts a new key/value pair, or updates the value of an existing key, in the key's shard."""
+        self._call(self._shard(key), 'put_many', [(key, value)])
+
+    def get(self, key: str):
+        """This method returns the value of the given key, or None if the key is not present."""
+        return self._call(self._shard(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """This method returns True if the key is present, False otherwise."""
+        return self._call(self._shard(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """This method removes the given key and its value, if present."""
+        self._call(self._shard(key), 'remove', key)
+
+    def clear(self) -> None:
+        """This method removes every key/value pair from every shard."""
+        self._call_all('clear', [None] * len(self._connections))
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples.  The pairs are split by shard, and every shard inserts its part
+        with put_many at the same time.
+        """
+        pairs = list(pairs)
+        positions = self._split([pair[0] for pair in pairs])
+        self._call_all('put_many', [[pairs[i] for i in shard_positions] for shard_positions in positions])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys, and returns a dynamic array of their values in the same order (None for a key that is
+        not present).  The keys are split by shard, every shard looks up its part at the same time, and the values are put back in the original order.
+        """
+        keys = list(keys)
+        positions = self._split(keys)
+        results = self._call_all('get_many', [[keys[i] for i in shard_positions] for shard_positions in positions])
+
+        values = [None] * len(keys)
+        for shard_positions, shard_values in zip(positions, results):
+            for i, value in zip(shard_positions, shard_values):
+                values[i] = value
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        This method removes every key from an iterable of keys.  The keys are split by shard, and every shard removes its part at the same time.
+        """
+        keys = list(keys)
+        positions = self._split(keys)
+        self._call_all('remove_many', [[keys[i] for i in shard_positions] for shard_positions in positions])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        This method returns a dynamic array of (key, value) tuples of every shard, shard after shard.
+        """
+        da_tuples = DynamicArray()
+        for shard_tuples in self._call_all('get_keys_and_values', [None] * len(self._connections)):
+            for item in shard_tuples:
+                da_tuples.append(item)
+        return da_tuples
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import hash_map_oa
+
+    print("\nShardedHashMap example 1")
+    print("------------------------")
+    for map_class in (HashMap, hash_map_oa.HashMap):
+        with ShardedHashMap(3, 11, hash_function_1, map_class) as m:
+            m.put_many(('key' + str(i), i * 10) for i in range(100))
+            print(m.get_size(), m.get_many(['key0', 'key50', 'key99', 'key100']))
+            m.remove_many('key' + str(i) for i in range(0, 100, 2))
+            m.put('key0', 'zero')
+            m.remove('key1')
+            print(m.get_size(), m.get('key0'), m.contains_key('key1'), m.get_keys_and_values().length())
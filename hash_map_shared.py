@@ -0,0 +1,295 @@
+# Description:      Read-only open addressing hash table stored in a multiprocessing.shared_memory segment, so that many processes can use one copy of a
+#                   large lookup table.  One process builds the table, and every other process attaches to the segment by name and reads it in place,
+#                   without building or copying anything.
+#
+#                   Segment layout (little endian):
+#                       header      - magic, capacity, size, offset of the arena, name of the hash function
+#                       slots       - capacity fixed width slots: hash, key offset, value offset, key length, value length, state
+#                       arena       - the UTF-8 bytes of every key and value, referenced by the slots
+#
+#                   The slots are filled with quadratic probing and a prime capacity, the same as hash_map_oa.HashMap.  As the table is never changed
+#                   after it is built, there are no tombstones.  Values that are not strings are stored pickled.
+#
+#                   The hash function must give the same hash in every process: hash_function_1 and hash_function_2 do, but the built-in hash of a
+#                   string does not (unless PYTHONHASHSEED is set).
+
+
+import pickle
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import DynamicArray, HashEntry, hash_function_1, hash_function_2
+from hash_capacity import next_prime
+from hash_map_views import ItemsView, KeysView, ValuesView
+from hash_vectorized import hash_batch
+
+
+_MAGIC = b'SHMHASH1'
+
+# NAMES OF THE SEGMENTS BUILT BY THIS PROCESS (OR, AFTER A FORK, BY ITS PARENT), WHICH ARE REGISTERED WITH ITS RESOURCE TRACKER BY THEIR OWNER
+_owned_names = set()
+
+# MAGIC, CAPACITY, SIZE, ARENA OFFSET, HASH FUNCTION NAME
+_FUNCTION_NAME_SIZE = 64
+_HEADER = struct.Struct(f'<8sQQQ{_FUNCTION_NAME_SIZE}s')
+
+# HASH, KEY OFFSET, VALUE OFFSET, KEY LENGTH, VALUE LENGTH, STATE
+_SLOT = struct.Struct('<qQQIIB7x')
+
+# SLOT STATES
+_EMPTY = 0
+_STR_VALUE = 1
+_PICKLED_VALUE = 2
+
+
+def _function_name(function: callable) -> bytes:
+    """Return the name of a hash function stored in the header, used to check that readers hash keys the same way as the builder."""
+    return (function.__module__ + '.' + function.__qualname__).encode()[:_FUNCTION_NAME_SIZE]
+
+
+class SharedHashMap:
+    def __init__(self, segment: shared_memory.SharedMemory, function: callable) -> None:
+        """
+        Initialize a SharedHashMap reading an existing shared memory
+        segment.  Use SharedHashMap.build to create a table, and
+        SharedHashMap.attach to open one built by another process.
+        """
+        magic, capacity, size, arena_offset, function_name = _HEADER.unpack_from(segment.buf, 0)
+        function_name = function_name.rstrip(b'\0')
+        if magic != _MAGIC:
+            raise ValueError(f"shared memory segment {segment.name!r} does not hold a SharedHashMap")
+        if function_name != _function_name(function):
+            raise ValueError(f"SharedHashMap {segment.name!r} was built with hash function {function_name.decode()}")
+
+        self._segment = segment
+        self._buffer = segment.buf
+        self._capacity = capacity
+        self._size = size
+        self._arena_offset = arena_offset
+        self._hash_function = function
+
+    @classmethod
+    def build(cls, pairs, function: callable = hash_function_1, name: str = None) -> "SharedHashMap":
+        """
+        This method builds a new shared memory segment holding every key/value pair of an iterable of (key, value) tuples, and returns the SharedHashMap
+        reading it.  Later pairs with the same key replace earlier ones.
+
+        The capacity is the first prime number of at least twice the number of keys plus one, so that quadratic probing always finds an empty slot.  The
+        building process owns the segment, and should call unlink() once no process needs the table anymore.
+        """
+        pairs = dict(pairs)
+        keys = list(pairs)
+        capacity = next_prime(2 * len(keys) + 1)
+
+        # PLACE EVERY KEY WITH QUADRATIC PROBING, AND APPEND ITS KEY AND VALUE BYTES TO THE ARENA
+        slots = [None] * capacity
+        arena = bytearray()
+        for key, _hash in zip(keys, hash_batch(keys, function)):
+            value = pairs[key]
+            key_bytes = key.encode()
+            if isinstance(value, str):
+                state, value_bytes = _STR_VALUE, value.encode()
+            else:
+                state, value_bytes = _PICKLED_VALUE, pickle.dumps(value)
+
+            index = _hash % capacity
+            quad_index = index
+            j = 1
+            while slots[quad_index] is not None:
+                quad_index = (index + j**2) % capacity
+                j += 1
+
+            slots[quad_index] = (_hash, len(arena), len(arena) + len(key_bytes), len(key_bytes), len(value_bytes), state)
+            arena += key_bytes
+            arena += value_bytes
+
+        arena_offset = _HEADER.size + capacity * _SLOT.size
+        segment = shared_memory.SharedMemory(name=name, create=True, size=max(arena_offset + len(arena), 1))
+
+        _HEADER.pack_into(segment.buf, 0, _MAGIC, capacity, len(keys), arena_offset, _function_name(function))
+        empty_slot = _SLOT.pack(0, 0, 0, 0, 0, _EMPTY)
+        segment.buf[_HEADER.size:arena_offset] = b''.join(empty_slot if slot is None else _SLOT.pack(*slot) for slot in slots)
+        segment.buf[arena_offset:arena_offset + len(arena)] = arena
+
+        _owned_names.add(segment.name)
+        return cls(segment, function)
+
+    @classmethod
+    def attach(cls, name: str, function: callable = hash_function_1) -> "SharedHashMap":
+        """
+        This method opens the SharedHashMap built by another process in the shared memory segment with the given name.  Nothing is copied: every lookup
+        reads the segment directly.  The hash function must be the one the table was built with.
+        """
+        try:
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # PYTHON 3.12 AND EARLIER CANNOT OPT OUT OF THE RESOURCE TRACKER, WHICH WOULD UNLINK THE SEGMENT WHEN THIS PROCESS EXITS, SO IT IS
+            # UNREGISTERED RIGHT AWAY, LEAVING THE UNLINK TO THE OWNER.  A SEGMENT BUILT IN THIS PROCESS (OR ITS PARENT, SHARING ITS TRACKER) STAYS
+            # REGISTERED FOR ITS OWNER
+            segment = shared_memory.SharedMemory(name=name)
+            if segment.name not in _owned_names:
+                resource_tracker.unregister(segment._name, 'shared_memory')
+
+        try:
+            return cls(segment, function)
+        except ValueError:
+            segment.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory segment, used by other processes to attach to it."""
+        return self._segment.name
+
+    def close(self) -> None:
+        """
+        This method closes this process's access to the segment.  The table must not be used afterwards.
+        """
+        self._buffer.release()
+        self._segment.close()
+
+    def unlink(self) -> None:
+        """
+        This method closes the segment and destroys it.  It should be called once, by the process that built the table, once no other process needs it.
+        """
+        self.close()
+        self._segment.unlink()
+        _owned_names.discard(self._segment.name)
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the load factor of the hash table: num elements (size) / num buckets (capacity)."""
+        return self._size / self._capacity
+
+    def _find_slot(self, key: str) -> tuple:
+        """
+        This helper method returns the slot holding the given key, as a tuple of its fields, or None if the key is not present.
+
+        It uses quadratic probing from the key's initial index until the key or an empty slot is found.  The key is compared to the bytes in the arena
+        in place, and only for slots with the same hash.
+        """
+        _hash = self._hash_function(key)
+        key_bytes = key.encode()
+        buffer = self._buffer
+        index = _hash % self._capacity
+        quad_index = index
+        j = 1
+
+        while True:
+            slot = _SLOT.unpack_from(buffer, _HEADER.size + quad_index * _SLOT.size)
+            if slot[5] == _EMPTY:
+                return None
+
+            if slot[0] == _hash and slot[3] == len(key_bytes):
+                key_offset = self._arena_offset + slot[1]
+                if buffer[key_offset:key_offset + slot[3]] == key_bytes:
+                    return slot
+
+            quad_index = (index + j**2) % self._capacity
+            j += 1
+
+    def _value(self, slot: tuple) -> object:
+        """This helper method reads the value of a slot from the arena."""
+        value_offset = self._arena_offset + slot[2]
+        value_bytes = self._buffer[value_offset:value_offset + slot[4]]
+        if slot[5] == _STR_VALUE:
+            return str(value_bytes, 'utf-8')
+        return pickle.loads(value_bytes)
+
+    def get(self, key: str) -> object:
+        """This method returns the value of the given key, or None if the key is not present."""
+        slot = self._find_slot(key)
+        return None if slot is None else self._value(slot)
+
+    def contains_key(self, key: str) -> bool:
+        """This method returns True if the key is present, False otherwise."""
+        return self._find_slot(key) is not None
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        This method looks up every key from an iterable of keys, and returns a dynamic array of their values in the same order (None for a key that is
+        not present).
+        """
+        values = DynamicArray()
+        for key in keys:
+            values.append(self.get(key))
+        return values
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of a HashEntry for every key/value pair, from smallest to greatest slot index.  The table never changes, so
+        any number of iterations may run at the same time.
+        """
+        for index in range(self._capacity):
+            slot = _SLOT.unpack_from(self._buffer, _HEADER.size + index * _SLOT.size)
+            if slot[5] != _EMPTY:
+                key_offset = self._arena_offset + slot[1]
+                yield HashEntry(str(self._buffer[key_offset:key_offset + slot[3]], 'utf-8'), self._value(slot), slot[0])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """This method returns a dynamic array of (key, value) tuples of every key/value pair."""
+        da_tuples = DynamicArray()
+        for item in self.items():
+            da_tuples.append(item)
+        return da_tuples
+
+    def keys(self) -> KeysView:
+        """This method returns a view of the keys."""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """This method returns a view of the values."""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """This method returns a view of the (key, value) tuples."""
+        return ItemsView(self)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+def _read_in_worker(name: str, keys: list) -> None:
+    """Attach to a SharedHashMap in another process, and print the values of some keys."""
+    m = SharedHashMap.attach(name, hash_function_2)
+    print('worker:', m.get_size(), m.get_many(keys), m.contains_key('missing'))
+    m.close()
+
+
+if __name__ == "__main__":
+
+    import multiprocessing
+
+    print("\nSharedHashMap example 1")
+    print("-----------------------")
+    m = SharedHashMap.build((('key' + str(i), 'value' + str(i)) for i in range(100)), hash_function_2)
+    m2 = SharedHashMap.build([('a', 1), ('b', [2, 3]), ('café', 'crème'), ('a', 4)], hash_function_1)
+    print(m.get_size(), m.get_capacity(), m.get('key7'), m.get('key100'), m2.get('a'), m2.get('b'), m2.get('café'))
+    print(sorted(m2.get_keys_and_values()._data, key=str))
+
+    process = multiprocessing.Process(target=_read_in_worker, args=(m.name, ['key0', 'key50', 'key99', 'key100']))
+    process.start()
+    process.join()
+
+    print("\nSharedHashMap attach example 1")
+    print("------------------------------")
+    # INDEPENDENT (SPAWNED) PROCESSES, EACH WITH ITS OWN RESOURCE TRACKER, ATTACH IN TURN.  NONE OF THEM DESTROYS THE SEGMENT WHEN IT EXITS
+    context = multiprocessing.get_context('spawn')
+    for keys in (['key1', 'key2'], ['key3', 'key4']):
+        process = context.Process(target=_read_in_worker, args=(m.name, keys))
+        process.start()
+        process.join()
+
+    try:
+        SharedHashMap.attach(m.name, hash_function_1)
+    except ValueError as error:
+        print('ValueError:', error.args[0][:24], '...')
+
+    m.unlink()
+    m2.unlink()
@@ -0,0 +1,331 @@
+# Description:      Copy-on-write version of the separate chaining HashMap, for read-heavy workloads shared between threads.
+#
+#                   The whole table is an immutable version.  Its buckets are stored in the leaves of a radix tree (32 children per node), and each
+#                   bucket is an immutable tuple of entries.  A write builds a new version that copies only the bucket it changes and the tree nodes on
+#                   the path to that bucket (a few tuples of at most 32 references), sharing everything else with the previous version, then publishes
+#                   it with a single attribute assignment.
+#
+#                   Readers never take a lock.  get / contains_key read whichever version is current, and snapshot() returns the current version in
+#                   O(1) - it can be read and iterated for as long as needed while writes continue, and never changes.  Writers are serialized by one
+#                   lock.
+
+
+import collections
+import threading
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+
+# EACH TREE NODE HAS UP TO 2^_BITS CHILDREN.  THE INDEX OF A BUCKET IS SPLIT INTO _BITS BIT DIGITS, ONE PER LEVEL OF THE TREE
+_BITS = 5
+_FANOUT = 1 << _BITS
+_MASK = _FANOUT - 1
+
+# IMMUTABLE KEY/VALUE PAIR STORED IN THE BUCKETS, WITH THE HASH OF THE KEY
+Entry = collections.namedtuple('Entry', 'key value hash')
+
+
+def _next_prime(capacity: int) -> int:
+    """Return the given capacity if it is prime, otherwise the next prime number after it."""
+    if HashMap._is_prime(capacity):
+        return capacity
+    if capacity % 2 == 0:
+        capacity += 1
+    while not HashMap._is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+class _Version:
+    """
+    One immutable version of the hash table: the radix tree of buckets, the capacity and the number of keys
+    """
+
+    __slots__ = ('root', 'shift', 'capacity', 'size')
+
+    def __init__(self, buckets: list, size: int) -> None:
+        """
+        Build the radix tree of a list of buckets.  The leaves hold up to 32 buckets each, and every level above groups up to 32 nodes, until one root
+        node remains.  shift is the number of bits of the index below the root level.
+        """
+        nodes = [tuple(buckets[i:i + _FANOUT]) for i in range(0, len(buckets), _FANOUT)]
+        shift = 0
+        while len(nodes) > 1:
+            nodes = [tuple(nodes[i:i + _FANOUT]) for i in range(0, len(nodes), _FANOUT)]
+            shift += _BITS
+
+        self.root = nodes[0]
+        self.shift = shift
+        self.capacity = len(buckets)
+        self.size = size
+
+    def bucket(self, index: int) -> tuple:
+        """Return the bucket at the given index, going down the tree one digit of the index at a time."""
+        node = self.root
+        shift = self.shift
+        while shift > 0:
+            node = node[(index >> shift) & _MASK]
+            shift -= _BITS
+        return node[index & _MASK]
+
+    def with_bucket(self, index: int, bucket: tuple, size: int) -> "_Version":
+        """
+        Return a new version with the bucket at the given index replaced, and the given size.  Only the nodes on the path from the root to the bucket
+        are copied.  This version is not changed.
+        """
+        def replace(node: tuple, shift: int) -> tuple:
+            digit = (index >> shift) & _MASK
+            child = bucket if shift == 0 else replace(node[digit], shift - _BITS)
+            return node[:digit] + (child,) + node[digit + 1:]
+
+        version = _Version.__new__(_Version)
+        version.root = replace(self.root, self.shift)
+        version.shift = self.shift
+        version.capacity = self.capacity
+        version.size = size
+        return version
+
+    def buckets(self):
+        """Return a generator of every bucket, from index 0 to capacity - 1."""
+        def walk(node: tuple, shift: int):
+            if shift == 0:
+                yield from node
+            else:
+                for child in node:
+                    yield from walk(child, shift - _BITS)
+
+        return walk(self.root, self.shift)
+
+
+class HashMapSnapshot:
+    """
+    Read-only, point-in-time view of a SnapshotHashMap, returned by snapshot().  It never changes, and reading it takes no lock.
+    """
+
+    def __init__(self, version: _Version, function: callable) -> None:
+        """Initialize the snapshot of a version of the hash table, hashed with the given hash function."""
+        self._version = version
+        self._hash_function = function
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i, bucket in enumerate(self._version.buckets()):
+            out += str(i) + ': [' + ' -> '.join('(' + str(entry.key) + ': ' + str(entry.value) + ')' for entry in bucket) + ']\n'
+        return out
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._version.size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._version.capacity
+
+    def table_load(self) -> float:
+        """Return the load factor of the hash table: num elements (size) / num buckets (capacity)."""
+        version = self._version
+        return version.size / version.capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets."""
+        return sum(1 for bucket in self._version.buckets() if not bucket)
+
+    def get(self, key: str):
+        """
+        This method returns the value of the given key, or None if the key is not present.  The version is read once, so the lookup is consistent even
+        if a writer publishes a new version at the same time.
+        """
+        version = self._version
+        _hash = self._hash_function(key)
+        for entry in version.bucket(_hash % version.capacity):
+            if entry.hash == _hash and entry.key == key:
+                return entry.value
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """This method returns True if the key is present, False otherwise."""
+        version = self._version
+        _hash = self._hash_function(key)
+        for entry in version.bucket(_hash % version.capacity):
+            if entry.hash == _hash and entry.key == key:
+                return True
+        return False
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """This method returns a dynamic array of (key, value) tuples of every key/value pair."""
+        da_tuples = DynamicArray()
+        for item in self.items():
+            da_tuples.append(item)
+        return da_tuples
+
+    def keys(self) -> KeysView:
+        """This method returns a view of the keys."""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """This method returns a view of the values."""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """This method returns a view of the (key, value) tuples."""
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of every entry of the version current when the iteration starts.  That version never changes, so the iteration
+        is not affected by writes made while it is in progress.
+        """
+        for bucket in self._version.buckets():
+            yield from bucket
+
+
+class SnapshotHashMap(HashMapSnapshot):
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1) -> None:
+        """
+        Initialize new copy-on-write HashMap that uses separate chaining for
+        collision resolution
+        """
+        super().__init__(_Version([()] * _next_prime(capacity), 0), function)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> HashMapSnapshot:
+        """
+        This method returns a read-only snapshot of the hash map as it is now, in O(1).  Later writes publish new versions, and never change the
+        snapshot.
+        """
+        return HashMapSnapshot(self._version, self._hash_function)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        This method inserts a new key/value pair, or updates the value if the key already exists, by publishing a new version.  Only the key's bucket
+        and the tree nodes above it are copied.
+
+        If the table load is greater or equal to 1.0, the capacity of the hash table is doubled first, the same as the separate chaining HashMap.
+        """
+        _hash = self._hash_function(key)
+
+        with self._write_lock:
+            if self._version.size / self._version.capacity >= 1.0:
+                self._resize_locked(self._version.capacity * 2)
+
+            version = self._version
+            index = _hash % version.capacity
+            bucket = version.bucket(index)
+
+            for i, entry in enumerate(bucket):
+                if entry.hash == _hash and entry.key == key:
+                    new_bucket = bucket[:i] + (Entry(key, value, _hash),) + bucket[i + 1:]
+                    self._version = version.with_bucket(index, new_bucket, version.size)
+                    return
+
+            # INSERT THE NEW ENTRY AT THE FRONT OF THE BUCKET, THE SAME AS THE LINKED LIST OF THE SEPARATE CHAINING HASHMAP
+            self._version = version.with_bucket(index, (Entry(key, value, _hash),) + bucket, version.size + 1)
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples, and publishes them together as one new version.  Readers see
+        either none or all of the pairs.
+        """
+        with self._write_lock:
+            buckets = list(self._version.buckets())
+            size = self._version.size
+
+            for key, value in pairs:
+                _hash = self._hash_function(key)
+                index = _hash % len(buckets)
+                bucket = buckets[index]
+                for i, entry in enumerate(bucket):
+                    if entry.hash == _hash and entry.key == key:
+                        buckets[index] = bucket[:i] + (Entry(key, value, _hash),) + bucket[i + 1:]
+                        break
+                else:
+                    buckets[index] = (Entry(key, value, _hash),) + bucket
+                    size += 1
+
+            self._version = _Version(buckets, size)
+            if size > len(buckets):
+                self._resize_locked(size)
+
+    def remove(self, key: str) -> None:
+        """
+        This method removes the given key and its value, if present, by publishing a new version without it.
+        """
+        _hash = self._hash_function(key)
+
+        with self._write_lock:
+            version = self._version
+            index = _hash % version.capacity
+            bucket = version.bucket(index)
+
+            for i, entry in enumerate(bucket):
+                if entry.hash == _hash and entry.key == key:
+                    self._version = version.with_bucket(index, bucket[:i] + bucket[i + 1:], version.size - 1)
+                    return
+
+    def clear(self) -> None:
+        """
+        This method publishes a new, empty version with the same capacity.
+        """
+        with self._write_lock:
+            self._version = _Version([()] * self._version.capacity, 0)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        This method publishes a new version with the given capacity, rounded up to a prime number, and doubled until the table load is at most 1.0,
+        the same as the separate chaining HashMap.  Every entry is placed again using its cached hash.
+        """
+        with self._write_lock:
+            self._resize_locked(new_capacity)
+
+    def _resize_locked(self, new_capacity: int) -> None:
+        """
+        This helper method resizes the table while the write lock is held.
+        """
+        if new_capacity < 1:
+            return
+
+        version = self._version
+        new_capacity = _next_prime(new_capacity)
+        while version.size / new_capacity > 1.0:
+            new_capacity = _next_prime(new_capacity * 2)
+
+        buckets = [()] * new_capacity
+        for bucket in version.buckets():
+            for entry in bucket:
+                index = entry.hash % new_capacity
+                buckets[index] = (entry,) + buckets[index]
+
+        self._version = _Version(buckets, version.size)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nsnapshot example 1")
+    print("------------------")
+    m = SnapshotHashMap(11, hash_function_1)
+    for i in range(10):
+        m.put('key' + str(i), i)
+    snapshot = m.snapshot()
+    m.put('key0', 100)
+    m.remove('key1')
+    for i in range(10, 40):
+        m.put('key' + str(i), i)
+    print(snapshot.get_size(), snapshot.get_capacity(), snapshot.get('key0'), snapshot.contains_key('key1'), snapshot.get('key20'))
+    print(m.get_size(), m.get_capacity(), m.get('key0'), m.contains_key('key1'), m.get('key20'))
+
+    print("\nsnapshot example 2")
+    print("------------------")
+    # ITERATING A SNAPSHOT WHILE THE MAP IS CHANGED
+    m = SnapshotHashMap(53, hash_function_2)
+    m.put_many(('key' + str(i), i) for i in range(100))
+    total = 0
+    for key, value in m.snapshot().items():
+        m.remove(key)
+        m.put(key + '!', value)
+        total += value
+    print(total, m.get_size(), m.contains_key('key5'), m.get('key5!'))
@@ -0,0 +1,388 @@
+# Description:      HashMap whose keys can expire.  put takes an optional time to live (ttl, in seconds) for the key, and the key is treated as absent
+#                   once its ttl has passed.  The key/value pairs are stored in a hash_map_sc.HashMap or hash_map_oa.HashMap, and a key with a ttl
+#                   stores its value together with its expiry time, so the expiry time moves with the value through resizes and migrations.
+#
+#                   Expired keys are removed in two ways:
+#                       lazy        - get / contains_key remove an expired key when they find it
+#                       active      - expire_cycle samples a few random buckets, removes the expired keys found there, and samples again while more
+#                                     than a quarter of the sampled keys with a ttl were expired (the algorithm of Redis).  The cost of each cycle is
+#                                     bounded, whatever the capacity.  start_sweeper runs expire_cycle periodically in a background thread.
+#
+#                   Removing an expired key leaves a tombstone in the open addressing HashMap (or shifts the following entries back, with robin_hood
+#                   probing), and unlinks the node in the separate chaining HashMap.  expire_cycle does so through the entry it found, without looking
+#                   the key up again.  Keys that have expired but were not removed yet are still counted by get_size.
+
+
+import random
+import threading
+import time
+
+from a6_include import DynamicArray, HashEntry, hash_function_1
+from hash_map_sc import HashMap
+from hash_map_views import ItemsView, KeysView, ValuesView
+from tree_bucket import TreeBucket
+
+
+# NUMBER OF BUCKETS SAMPLED PER ROUND OF expire_cycle, AND THE FRACTION OF EXPIRED KEYS AMONG THE SAMPLED KEYS WITH A TTL ABOVE WHICH IT SAMPLES AGAIN
+_SAMPLES = 20
+_REPEAT_FRACTION = 0.25
+
+
+class _Expiring:
+    """
+    Value of a key with a time to live, stored in the hash map together with the time at which the key expires
+    """
+
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value: object, expires_at: float) -> None:
+        self.value = value
+        self.expires_at = expires_at
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str(self.value) + ' [expires at ' + str(self.expires_at) + ']'
+
+
+class TTLHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 map_class: type = HashMap,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new HashMap with expiring keys, stored in a map_class
+        (hash_map_sc.HashMap or hash_map_oa.HashMap) created with the
+        given capacity and hash function.
+
+        clock returns the current time in seconds, and is only compared
+        with the expiry times computed from it.  Every method holds a lock,
+        so that the background sweeper can run alongside other threads.
+        """
+        self._map = map_class(capacity, function)
+        self._clock = clock
+        self._random = random.Random()
+
+        self._lock = threading.RLock()
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+
+        # NUMBER OF KEYS REMOVED BECAUSE THEY EXPIRED
+        self._expired = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        return str(self._map)
+
+    # ------------------------------------------------------------------ #
+
+    def _is_expired(self, stored: object, now: float) -> bool:
+        """This helper method returns True if a stored value belongs to a key whose ttl has passed."""
+        return isinstance(stored, _Expiring) and stored.expires_at <= now
+
+    def _expire(self, key: str) -> None:
+        """This helper method removes an expired key from the stored map."""
+        self._map.remove(key)
+        self._expired += 1
+
+    def _expire_entry(self, index: int, entry: object) -> None:
+        """
+        This helper method removes an expired key found by _sample_bucket in the bucket at the given index of the stored map, through its entry (an open
+        addressing HashEntry or a separate chaining node) instead of hashing and searching for the key again.  The bookkeeping is the same as the stored
+        map's remove.
+        """
+        hash_map = self._map
+        bucket = hash_map._buckets[index]
+
+        if isinstance(bucket, HashEntry):
+            # WITH ROBIN HOOD PROBING, THE FOLLOWING ENTRIES ARE SHIFTED BACK INSTEAD OF LEAVING A TOMBSTONE
+            if hash_map._probing == 'robin_hood':
+                hash_map._robin_hood_delete(index)
+            else:
+                entry.is_tombstone = True
+                hash_map._tombstones += 1
+        else:
+            # UNLINK THE NODE USING ITS CACHED HASH, AND CONVERT A TREE BUCKET THAT HAS SHRUNK BACK INTO A LINKED LIST
+            bucket.remove(entry.key, entry.hash)
+            if isinstance(bucket, TreeBucket) and bucket.length() <= hash_map._untreeify_threshold:
+                hash_map._buckets[index] = bucket.to_linked_list()
+
+        hash_map._size -= 1
+        hash_map._modifications += 1
+        self._expired += 1
+
+    def _sample_bucket(self, now: float) -> tuple:
+        """
+        This helper method looks at one random bucket of the stored map, removes its expired keys, and returns a tuple of the number of keys with a ttl
+        it held and the number of them that had expired.  A separate chaining bucket may hold several keys, an open addressing slot one at most.  During
+        an incremental resize of the open addressing HashMap, only the new table is sampled.
+        """
+        index = self._random.randrange(self._map._capacity)
+        bucket = self._map._buckets[index]
+
+        if bucket is None:
+            return 0, 0
+        if isinstance(bucket, HashEntry):
+            entries = () if bucket.is_tombstone else (bucket,)
+        else:
+            entries = list(bucket)
+
+        with_ttl, expired = 0, 0
+        for entry in entries:
+            if isinstance(entry.value, _Expiring):
+                with_ttl += 1
+                if entry.value.expires_at <= now:
+                    self._expire_entry(index, entry)
+                    expired += 1
+        return with_ttl, expired
+
+    def expire_cycle(self, samples: int = _SAMPLES, max_rounds: int = 16) -> int:
+        """
+        This method removes expired keys found in randomly sampled buckets, and returns the number of keys removed.
+
+        Each round samples the given number of buckets.  Another round is started if more than a quarter of the sampled keys with a ttl had expired, as
+        many more expired keys are then likely to be left, up to max_rounds rounds.  The work done is bounded by samples * max_rounds buckets, so one
+        cycle never scans the whole table.
+        """
+        removed = 0
+        with self._lock:
+            for _ in range(max_rounds):
+                if self._map.get_size() == 0:
+                    break
+
+                now = self._clock()
+                with_ttl, expired = 0, 0
+                for _ in range(samples):
+                    bucket_with_ttl, bucket_expired = self._sample_bucket(now)
+                    with_ttl += bucket_with_ttl
+                    expired += bucket_expired
+
+                removed += expired
+                if expired <= with_ttl * _REPEAT_FRACTION:
+                    break
+        return removed
+
+    def start_sweeper(self, interval: float = 0.1, samples: int = _SAMPLES) -> None:
+        """
+        This method starts a background thread that runs expire_cycle every interval seconds, until stop_sweeper is called.
+        """
+        if self._sweeper is not None:
+            return
+
+        def sweep() -> None:
+            while not self._stop_sweeper.wait(interval):
+                self.expire_cycle(samples)
+
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(target=sweep, daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """This method stops the background thread started by start_sweeper, and waits for it to finish."""
+        if self._sweeper is None:
+            return
+        self._stop_sweeper.set()
+        self._sweeper.join()
+        self._sweeper = None
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        This method inserts a new key/value pair, or updates the value of an existing key.  If ttl is given, the key expires ttl seconds from now,
+        otherwise it never expires (an update without a ttl removes the previous one).
+        """
+        stored = value if ttl is None else _Expiring(value, self._clock() + ttl)
+        with self._lock:
+            self._map.put(key, stored)
+
+    def put_many(self, pairs, ttl: float = None) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples with the stored map's put_many, every key with the same ttl.
+        """
+        if ttl is not None:
+            expires_at = self._clock() + ttl
+            pairs = [(key, _Expiring(value, expires_at)) for key, value in pairs]
+        with self._lock:
+            self._map.put_many(pairs)
+
+    def get(self, key: str) -> object:
+        """
+        This method returns the value of the given key, or None if the key is not present or has expired.  An expired key is removed.
+        """
+        with self._lock:
+            stored = self._map.get(key)
+            if not isinstance(stored, _Expiring):
+                return stored
+
+            if stored.expires_at <= self._clock():
+                self._expire(key)
+                return None
+            return stored.value
+
+    def get_many(self, keys) -> DynamicArray:
+        """This method returns a dynamic array of the values of every key from an iterable of keys, in the same order, None for absent keys."""
+        values = DynamicArray()
+        for key in keys:
+            values.append(self.get(key))
+        return values
+
+    def contains_key(self, key: str) -> bool:
+        """
+        This method returns True if the key is present and has not expired.  An expired key is removed.
+        """
+        with self._lock:
+            stored = self._map.get(key)
+            if stored is None:
+                return self._map.contains_key(key)
+
+            if self._is_expired(stored, self._clock()):
+                self._expire(key)
+                return False
+            return True
+
+    def get_ttl(self, key: str) -> float:
+        """
+        This method returns the number of seconds until the given key expires, or None if the key is not present, has expired, or never expires.
+        """
+        with self._lock:
+            stored = self._map.get(key)
+            if not isinstance(stored, _Expiring):
+                return None
+
+            remaining = stored.expires_at - self._clock()
+            if remaining <= 0:
+                self._expire(key)
+                return None
+            return remaining
+
+    def remove(self, key: str) -> None:
+        """This method removes the given key and its value, if present."""
+        with self._lock:
+            self._map.remove(key)
+
+    def remove_many(self, keys) -> None:
+        """This method removes every key from an iterable of keys."""
+        with self._lock:
+            self._map.remove_many(keys)
+
+    def clear(self) -> None:
+        """This method removes every key/value pair.  The capacity remains unchanged."""
+        with self._lock:
+            self._map.clear()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """This method resizes the stored map."""
+        with self._lock:
+            self._map.resize_table(new_capacity)
+
+    def get_size(self) -> int:
+        """Return size of map, including keys that have expired but have not been removed yet"""
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._map.get_capacity()
+
+    def get_expired_count(self) -> int:
+        """Return the number of keys removed because they expired"""
+        return self._expired
+
+    def table_load(self) -> float:
+        """Return the load factor of the hash table"""
+        return self._map.table_load()
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets of the hash table"""
+        return self._map.empty_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """This method returns a dynamic array of (key, value) tuples of every key/value pair that has not expired."""
+        da_tuples = DynamicArray()
+        for item in self.items():
+            da_tuples.append(item)
+        return da_tuples
+
+    def keys(self) -> KeysView:
+        """This method returns a view of the keys that have not expired."""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """This method returns a view of the values of the keys that have not expired."""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """This method returns a view of the (key, value) tuples of the keys that have not expired."""
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """
+        This helper method is a generator of a HashEntry for every key that has not expired, as of the moment the iteration starts.  The entries are
+        collected while the lock is held, so the sweeper and other threads may change the map during the iteration without affecting it.  Expired keys
+        are skipped, but not removed.
+        """
+        with self._lock:
+            now = self._clock()
+            entries = []
+            for entry in self._map._iter_entries():
+                stored = entry.value
+                if isinstance(stored, _Expiring):
+                    if stored.expires_at > now:
+                        entries.append(HashEntry(entry.key, stored.value, entry.hash))
+                else:
+                    entries.append(entry)
+
+        yield from entries
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import hash_map_oa
+
+    print("\nTTLHashMap example 1")
+    print("--------------------")
+    for map_class in (HashMap, hash_map_oa.HashMap):
+        now = [0.0]
+        m = TTLHashMap(11, hash_function_1, map_class, clock=lambda: now[0])
+        m.put('session1', 'alice', ttl=10)
+        m.put('session2', 'bob', ttl=30)
+        m.put('config', 'forever')
+        now[0] = 15
+        print(m.get('session1'), m.get('session2'), m.get_ttl('session2'), m.contains_key('config'), list(m.items()))
+        m.put('session2', 'bob', ttl=30)
+        now[0] = 40
+        print(m.contains_key('session2'), m.get_size(), m.get_expired_count())
+
+    print("\nTTLHashMap __str__ example 1")
+    print("----------------------------")
+    now = [0.0]
+    m = TTLHashMap(3, hash_function_1, clock=lambda: now[0])
+    m.put('session1', 'alice', ttl=10)
+    m.put('config', 'forever')
+    print(m)
+
+    print("\nTTLHashMap example 2")
+    print("--------------------")
+    # THE SWEEPER REMOVES KEYS THAT ARE NEVER READ AGAIN, A FEW BUCKETS AT A TIME
+    for map_class in (HashMap, hash_map_oa.HashMap):
+        now = [0.0]
+        m = TTLHashMap(11, hash_function_1, map_class, clock=lambda: now[0])
+        m.put_many((('temp' + str(i), i) for i in range(1000)), ttl=5)
+        m.put_many(('keep' + str(i), i) for i in range(1000))
+        now[0] = 10
+        cycles = 0
+        while m.get_size() > 1000 and cycles < 1000:
+            m.expire_cycle()
+            cycles += 1
+        print(m.get_size(), m.get_expired_count(), cycles, m.get('temp0'), m.get('keep0'))
+
+    now = [0.0]
+    m = TTLHashMap(11, hash_function_1, clock=lambda: now[0])
+    m.put_many((('temp' + str(i), i) for i in range(100)), ttl=5)
+    m.start_sweeper(interval=0.001)
+    now[0] = 10
+    time.sleep(0.5)
+    m.stop_sweeper()
+    print(m.get_size())
@@ -0,0 +1,72 @@
+# Description:      Lazy keys / values / items views of a HashMap.  A view does not copy the key/value pairs - each iteration streams them directly
+#                   from the hash map's buckets, and any number of iterations may run at the same time, each with its own position.
+#
+#                   The hash map provides an _iter_entries generator, yielding each node / hash entry holding a key/value pair, which raises
+#                   RuntimeError if the hash map is changed (a key inserted or removed, or the table resized) while the iteration is in progress.
+#                   Updating the value of an existing key with put is allowed, except during an incremental resize of the open addressing HashMap,
+#                   where put moves the key into the new table.
+
+
+class HashMapView:
+    """
+    Base class of the views, holding the hash map they are a view of
+    """
+
+    _name = 'VIEW'
+
+    def __init__(self, hash_map) -> None:
+        """Initialize the view of a hash map.  The view always reflects the current contents of the hash map."""
+        self._hash_map = hash_map
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return self._name + ' [' + ', '.join(str(item) for item in self) + ']'
+
+    def __len__(self) -> int:
+        """Return the number of key/value pairs in the hash map."""
+        return self._hash_map.get_size()
+
+
+class KeysView(HashMapView):
+    """
+    View of the keys of a hash map
+    """
+
+    _name = 'KEYS'
+
+    def __iter__(self):
+        """Return a new iterator over the keys of the hash map."""
+        return (entry.key for entry in self._hash_map._iter_entries())
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is in the hash map, using a hash lookup."""
+        return self._hash_map.contains_key(key)
+
+
+class ValuesView(HashMapView):
+    """
+    View of the values of a hash map
+    """
+
+    _name = 'VALUES'
+
+    def __iter__(self):
+        """Return a new iterator over the values of the hash map."""
+        return (entry.value for entry in self._hash_map._iter_entries())
+
+
+class ItemsView(HashMapView):
+    """
+    View of the (key, value) pairs of a hash map
+    """
+
+    _name = 'ITEMS'
+
+    def __iter__(self):
+        """Return a new iterator over the (key, value) tuples of the hash map."""
+        return ((entry.key, entry.value) for entry in self._hash_map._iter_entries())
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if the key of a (key, value) tuple is in the hash map with that value, using a hash lookup."""
+        key, value = item
+        return self._hash_map.contains_key(key) and self._hash_map.get(key) == value
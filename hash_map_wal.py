@@ -0,0 +1,362 @@
+# Description:      Durable version of the in-memory HashMaps, using an append-only write-ahead log (WAL) and periodic checkpoints.  Every put / remove
+#                   / clear is applied to an in-memory hash_map_sc.HashMap or hash_map_oa.HashMap and recorded in the log, so that the map can be
+#                   recovered after the process stops or crashes, without writing the whole map on every change.
+#
+#                   Directory layout:
+#                       checkpoint  - dump file (see hash_map_io) of the whole map, written by checkpoint()
+#                       wal         - magic, then one record per operation since the last checkpoint: payload length, CRC-32 of the payload, and
+#                                     the payload (pickle of the operation, key and value)
+#
+#                   Group commit: records are collected in a buffer, and written to the log with a single write and a single fsync once group_size
+#                   records are waiting (or on commit / checkpoint / close).  group_size=1 makes every operation durable before it returns, larger
+#                   groups trade the last few operations before a crash for throughput, and fsync=False leaves flushing to the operating system.
+#
+#                   Recovery loads the checkpoint, then replays the log on top of it.  A record cut short or corrupted by a crash ends the replay, and is
+#                   truncated from the log.  A checkpoint is written to a temporary file and renamed over the old one before the log is truncated, so
+#                   a crash at any point leaves a valid checkpoint - replaying records the checkpoint already contains gives the same map, as every
+#                   operation sets or removes a key outright (increment, setdefault and upsert log the value they store, not the operation).
+
+
+import os
+import pickle
+import struct
+import zlib
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+
+_MAGIC = b'HMAPWAL1'
+
+# PAYLOAD LENGTH, CRC-32 OF THE PAYLOAD
+_RECORD = struct.Struct('<II')
+
+# OPERATIONS
+_PUT = 0
+_REMOVE = 1
+_CLEAR = 2
+
+_CHECKPOINT_NAME = 'checkpoint'
+_WAL_NAME = 'wal'
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make a rename or a new file in the directory durable.  Not every platform can open a directory, in which case there is nothing to do."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class DurableHashMap:
+    def __init__(self,
+                 directory: str,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 map_class: type = HashMap,
+                 group_size: int = 64,
+                 fsync: bool = True,
+                 checkpoint_every: int = 100000) -> None:
+        """
+        Open the DurableHashMap stored in the given directory, recovering
+        its contents from the checkpoint and the log, or create a new one
+        with the given capacity if the directory holds neither.
+
+        The map is kept in memory as a map_class (hash_map_sc.HashMap or
+        hash_map_oa.HashMap).  Up to group_size operations are buffered
+        before they are written to the log, and the log is synced to disk
+        (fsync) on every write unless fsync is False.  A checkpoint is
+        written, and the log truncated, after every checkpoint_every
+        logged operations; checkpoint_every=None only checkpoints when
+        checkpoint() is called.
+        """
+        if group_size < 1:
+            raise ValueError("group_size must be at least 1")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._checkpoint_path = os.path.join(directory, _CHECKPOINT_NAME)
+        self._wal_path = os.path.join(directory, _WAL_NAME)
+
+        self._group_size = group_size
+        self._fsync = fsync
+        self._checkpoint_every = checkpoint_every
+
+        # RECORDS WAITING TO BE WRITTEN, AND NUMBER OF RECORDS LOGGED SINCE THE LAST CHECKPOINT
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._logged = 0
+
+        if os.path.exists(self._checkpoint_path):
+            self._map = map_class.load(self._checkpoint_path, function)
+        else:
+            self._map = map_class(capacity, function)
+
+        self._wal = open(self._wal_path, 'r+b' if os.path.exists(self._wal_path) else 'w+b')
+        self._recover()
+
+    def __enter__(self) -> "DurableHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output"""
+        return str(self._map)
+
+    # ------------------------------------------------------------------ #
+
+    def _recover(self) -> None:
+        """
+        This helper method replays every complete record of the log on the in-memory map.  The first record that is cut short or fails its CRC check
+        (the tail of a write interrupted by a crash) ends the replay, and the log is truncated just before it, so new records follow the last valid one.
+        """
+        data = self._wal.read()
+        if not data.startswith(_MAGIC):
+            # NEW LOG, OR A CRASH BEFORE THE MAGIC REACHED THE DISK
+            self._reset_wal()
+            return
+
+        offset = len(_MAGIC)
+        while offset + _RECORD.size <= len(data):
+            length, checksum = _RECORD.unpack_from(data, offset)
+            payload = data[offset + _RECORD.size:offset + _RECORD.size + length]
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                break
+
+            self._apply(*pickle.loads(payload))
+            self._logged += 1
+            offset += _RECORD.size + length
+
+        if offset != len(data):
+            self._wal.truncate(offset)
+            self._sync()
+        self._wal.seek(offset)
+
+    def _reset_wal(self) -> None:
+        """This helper method empties the log, leaving only its magic, and makes the change durable."""
+        self._wal.seek(0)
+        self._wal.truncate()
+        self._wal.write(_MAGIC)
+        self._sync()
+
+    def _apply(self, operation: int, key: str, value: object) -> None:
+        """This helper method applies one logged operation to the in-memory map."""
+        if operation == _PUT:
+            self._map.put(key, value)
+        elif operation == _REMOVE:
+            self._map.remove(key)
+        else:
+            self._map.clear()
+
+    def _log(self, operation: int, key: str = None, value: object = None) -> None:
+        """
+        This helper method adds a record of an operation to the buffer, and commits the buffer once it holds group_size records.
+        """
+        payload = pickle.dumps((operation, key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        self._buffer += _RECORD.pack(len(payload), zlib.crc32(payload))
+        self._buffer += payload
+        self._buffered += 1
+
+        if self._buffered >= self._group_size:
+            self.commit()
+
+    def _sync(self) -> None:
+        """This helper method flushes the log to the operating system, and to the disk unless fsync is off."""
+        self._wal.flush()
+        if self._fsync:
+            os.fsync(self._wal.fileno())
+
+    def commit(self) -> None:
+        """
+        This method writes every buffered record to the log with one write and one fsync (group commit), so every operation so far survives a crash.
+        A checkpoint is written afterwards if checkpoint_every operations have been logged since the last one.
+        """
+        if self._buffered == 0:
+            return
+
+        self._wal.write(self._buffer)
+        self._sync()
+        self._logged += self._buffered
+        self._buffer = bytearray()
+        self._buffered = 0
+
+        if self._checkpoint_every is not None and self._logged >= self._checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        This method writes the whole map to the checkpoint file and truncates the log.  The new checkpoint replaces the old one with an atomic rename,
+        and only then is the log truncated.
+        """
+        self._wal.write(self._buffer)
+        self._buffer = bytearray()
+        self._buffered = 0
+
+        temporary_path = self._checkpoint_path + '.tmp'
+        self._map.dump(temporary_path)
+        with open(temporary_path, 'rb') as file:
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self._checkpoint_path)
+        _fsync_directory(self._directory)
+
+        self._reset_wal()
+        self._logged = 0
+
+    def close(self) -> None:
+        """This method commits every buffered operation and closes the log.  The hash map must not be used afterwards."""
+        self._checkpoint_every = None
+        self.commit()
+        self._wal.close()
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """This method inserts a new key/value pair, or updates the value of an existing key, and logs the operation."""
+        self._map.put(key, value)
+        self._log(_PUT, key, value)
+
+    def put_many(self, pairs) -> None:
+        """
+        This method inserts every key/value pair from an iterable of (key, value) tuples with the in-memory map's put_many, and logs one record per pair.
+        """
+        pairs = list(pairs)
+        self._map.put_many(pairs)
+        for key, value in pairs:
+            self._log(_PUT, key, value)
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """This method adds delta to the value of the key (or inserts it with a value of delta), and logs the new value as a put."""
+        value = self._map.increment(key, delta)
+        self._log(_PUT, key, value)
+        return value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """This method returns the value of the key, inserting it with the default value if it is not present, and logs the value as a put."""
+        value = self._map.setdefault(key, default)
+        self._log(_PUT, key, value)
+        return value
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
+        """This method sets the value of the key to function(current value or default), and logs the new value as a put."""
+        value = self._map.upsert(key, function, default)
+        self._log(_PUT, key, value)
+        return value
+
+    def remove(self, key: str) -> None:
+        """This method removes the given key and its value, if present.  Only the removal of a key that is present is logged."""
+        if self._map.contains_key(key):
+            self._map.remove(key)
+            self._log(_REMOVE, key)
+
+    def remove_many(self, keys) -> None:
+        """This method removes every key from an iterable of keys."""
+        for key in keys:
+            self.remove(key)
+
+    def clear(self) -> None:
+        """This method removes every key/value pair, and logs the operation.  The capacity remains unchanged."""
+        self._map.clear()
+        self._log(_CLEAR)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """This method resizes the in-memory map.  It is not logged: the checkpoint stores the capacity, and a replay resizes the map as it grows."""
+        self._map.resize_table(new_capacity)
+
+    def get(self, key: str) -> object:
+        """This method returns the value of the given key, or None if the key is not present."""
+        return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """This method returns True if the key is present, False otherwise."""
+        return self._map.contains_key(key)
+
+    def get_many(self, keys) -> DynamicArray:
+        """This method returns a dynamic array of the values of every key from an iterable of keys, in the same order."""
+        return self._map.get_many(keys)
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """Return the load factor of the hash table"""
+        return self._map.table_load()
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets of the hash table"""
+        return self._map.empty_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """This method returns a dynamic array of (key, value) tuples of every key/value pair."""
+        return self._map.get_keys_and_values()
+
+    def keys(self) -> KeysView:
+        """This method returns a view of the keys."""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """This method returns a view of the values."""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """This method returns a view of the (key, value) tuples."""
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """This helper method is a generator of every entry of the in-memory map."""
+        return self._map._iter_entries()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    import hash_map_oa
+
+    print("\nDurableHashMap example 1")
+    print("------------------------")
+    for map_class in (HashMap, hash_map_oa.HashMap):
+        directory = tempfile.mkdtemp()
+        with DurableHashMap(directory, 11, hash_function_1, map_class, group_size=4, checkpoint_every=10) as m:
+            for i in range(25):
+                m.put('key' + str(i), i)
+            m.remove('key0')
+            m.put('key1', 'one')
+            m.increment('key2', 100)
+        m = DurableHashMap(directory, 11, hash_function_1, map_class)
+        print(m.get_size(), m.get('key0'), m.get('key1'), m.get('key24'), sorted(m.values(), key=str)[:3])
+        m.clear()
+        m.put('only', 1)
+        m.close()
+        m = DurableHashMap(directory, 11, hash_function_1, map_class)
+        print(m.get_size(), list(m.items()))
+        m.close()
+
+    print("\nDurableHashMap example 2")
+    print("------------------------")
+    # A CRASH WITH RECORDS STILL BUFFERED LOSES ONLY THOSE, AND A TORN LAST RECORD IS DROPPED
+    directory = tempfile.mkdtemp()
+    m = DurableHashMap(directory, group_size=3, checkpoint_every=None)
+    for i in range(10):
+        m.put('key' + str(i), i)
+    m._wal.close()
+    with open(os.path.join(directory, _WAL_NAME), 'ab') as wal:
+        wal.write(_RECORD.pack(100, 0) + b'torn')
+    m = DurableHashMap(directory)
+    print(m.get_size(), m.contains_key('key8'), m.contains_key('key9'))
+    m.put('key9', 9)
+    m.close()
+    print(DurableHashMap(directory).get_size())
@@ -0,0 +1,64 @@
+# Description:      Batch (vectorized) versions of the sample hash functions from a6_include.  A whole batch of string keys is encoded into one flat
+#                   array of unicode code points, and the per-character loop of hash_function_1 / hash_function_2 is replaced by a (weighted) running
+#                   sum over that array in NumPy.  The results are identical to calling the scalar hash function on each key.
+#
+#                   NumPy is optional.  If it is not installed, or the hash function is not one of the sample functions, hash_batch falls back to
+#                   calling the hash function on each key.
+
+
+from a6_include import hash_function_1, hash_function_2
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+def _hash_keys(keys: list, positional: bool) -> list:
+    """
+    Hash a list of keys with NumPy and return the hashes as a list of python ints.
+
+    All keys are joined and encoded as UTF-32, which stores one 4 byte code point per character (the same value returned by ord), giving a flat array
+    of code points.  When positional is True (hash_function_2), each code point is multiplied by its 1-based position within its own key.
+
+    The hash of each key is then the difference of the running (cumulative) sum at the end and the start of the key.  The running sum uses 64 bit
+    integers, so the results are exact.
+    """
+    lengths = np.fromiter((len(key) for key in keys), dtype=np.int64, count=len(keys))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    code_points = np.frombuffer(''.join(keys).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+    if positional:
+        # POSITION OF EACH CHARACTER WITHIN ITS KEY, STARTING AT 1
+        code_points *= np.arange(1, code_points.size + 1, dtype=np.int64) - np.repeat(starts, lengths)
+
+    running_sum = np.zeros(code_points.size + 1, dtype=np.int64)
+    np.cumsum(code_points, out=running_sum[1:])
+    return (running_sum[ends] - running_sum[starts]).tolist()
+
+
+def hash_batch(keys, function: callable) -> list:
+    """
+    Return a list with the hash of every key in an iterable of keys, in the same order, as computed by the given hash function.
+
+    hash_function_1 and hash_function_2 are computed with NumPy when it is available.  Any other hash function is called once per key.
+    """
+    keys = list(keys)
+
+    if np is None or not keys or function not in (hash_function_1, hash_function_2):
+        return [function(key) for key in keys]
+
+    return _hash_keys(keys, function is hash_function_2)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nhash_batch example 1")
+    print("--------------------")
+    keys = ['', 'a', 'key1', 'apple', 'elppa', 'z' * 50, 'café', '', '\U0001f600 emoji']
+    for function in (hash_function_1, hash_function_2):
+        batch = hash_batch(keys, function)
+        print(function.__name__, batch, batch == [function(key) for key in keys])
@@ -0,0 +1,234 @@
+# Description:      Approximate, fixed memory version of find_mode for unbounded streams.  find_mode keeps an exact count of every distinct item, so its
+#                   memory grows with the number of distinct items.  HeavyHitters reads items one at a time from any iterable, and only keeps:
+#
+#                       Misra-Gries     - at most k counters (a hash_map_sc.HashMap of at most k keys).  Any item occurring more than N / (k + 1)
+#                                         times in a stream of N items is guaranteed to hold a counter, and the counter of an item is at most
+#                                         (N - sum of all counters) / (k + 1) below its true count.
+#                       Count-Min       - depth rows of width counters.  Every item adds to one counter per row, chosen by a different hash per row,
+#                                         and its estimate is the smallest of its counters.  The estimate is never below the true count, and is
+#                                         above it by at most epsilon * N with probability 1 - delta, for width = e / epsilon and depth = ln(1 / delta).
+#
+#                   Each candidate of Misra-Gries is reported with its Count-Min estimate, and a lower and upper bound that always contain its true
+#                   count: the Misra-Gries counter, and the smaller of the Count-Min estimate and the counter plus the Misra-Gries error.
+#
+#                   The rows of the sketch are indexed with the built-in hash, so a sketch is only valid within one process.
+
+
+import collections
+import math
+from array import array
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap, _count, find_mode
+
+
+# ONE HEAVY HITTER: THE ITEM, ITS COUNT-MIN ESTIMATE, AND A LOWER AND UPPER BOUND OF ITS TRUE COUNT
+HeavyHitter = collections.namedtuple('HeavyHitter', ['item', 'estimate', 'lower', 'upper'])
+
+# RESULT OF HeavyHitters.check: THE EXACT AND APPROXIMATE MODES, WHETHER EVERY REPORTED BOUND HELD, AND THE LARGEST ERROR OF AN ESTIMATE
+CheckReport = collections.namedtuple('CheckReport', ['exact_mode', 'exact_frequency', 'approximate_mode', 'approximate_frequency', 'same_mode',
+                                                     'within_bounds', 'max_error'])
+
+_MASK_64 = (1 << 64) - 1
+_MASK_32 = (1 << 32) - 1
+
+
+class CountMinSketch:
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01) -> None:
+        """
+        Initialize new Count-Min sketch whose estimates exceed the true
+        count by at most epsilon times the number of items added, with
+        probability at least 1 - delta.  It uses ceil(e / epsilon) *
+        ceil(ln(1 / delta)) counters, whatever the number of items.
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+
+        self._epsilon = epsilon
+        self._delta = delta
+        self._width = math.ceil(math.e / epsilon)
+        self._depth = math.ceil(math.log(1 / delta))
+        self._rows = [array('q', [0]) * self._width for _ in range(self._depth)]
+        self._total = 0
+
+    def _indices(self, item: object) -> list:
+        """
+        This helper method returns the index of the item's counter in each row.  The index of row i is h1 + i * h2, for two hashes h1 and h2 taken from
+        the two halves of the item's mixed 64 bit hash, which makes the rows behave as independent hash functions.
+        """
+        _hash = (hash(item) * 0x9E3779B97F4A7C15) & _MASK_64
+        _hash ^= _hash >> 29
+        h1, h2 = _hash & _MASK_32, (_hash >> 32) | 1
+        return [(h1 + i * h2) % self._width for i in range(self._depth)]
+
+    def add(self, item: object, count: int = 1) -> None:
+        """This method adds count occurrences of the item."""
+        for row, index in zip(self._rows, self._indices(item)):
+            row[index] += count
+        self._total += count
+
+    def estimate(self, item: object) -> int:
+        """This method returns the estimated count of the item, which is never below its true count."""
+        return min(row[index] for row, index in zip(self._rows, self._indices(item)))
+
+    def error_bound(self) -> float:
+        """This method returns epsilon * N, the most an estimate exceeds the true count with probability 1 - delta."""
+        return self._epsilon * self._total
+
+    def get_size(self) -> int:
+        """Return the number of counters of the sketch"""
+        return self._width * self._depth
+
+    def get_total(self) -> int:
+        """Return the number of items added"""
+        return self._total
+
+
+class HeavyHitters:
+    def __init__(self, k: int = 100, epsilon: float = 0.001, delta: float = 0.01) -> None:
+        """
+        Initialize new streaming heavy hitters summary, keeping at most k
+        Misra-Gries counters alongside a Count-Min sketch with the given
+        epsilon and delta.  Every item occurring more than N / (k + 1)
+        times in N items is reported.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+
+        self._k = k
+        self._counters = HashMap(k + 1, hash)
+        self._sketch = CountMinSketch(epsilon, delta)
+        self._total = 0
+
+    def update(self, item: object, count: int = 1) -> None:
+        """
+        This method adds count occurrences of the item.
+
+        If the item has a Misra-Gries counter, or there are fewer than k counters, its counter is increased.  Otherwise every counter, and the count of
+        the new item, are decreased by the smallest of them (removing the counters that reach zero), until either the count is used up or a counter is
+        free for the rest of it.  Each decrease is paid for by earlier increases, so updates take amortized constant time for a fixed k.
+        """
+        self._sketch.add(item, count)
+        self._total += count
+
+        # WHILE THERE IS A FREE COUNTER, NO SEARCH IS NEEDED BEFORE INCREMENTING
+        counters = self._counters
+        while counters.get_size() >= self._k and not counters.contains_key(item):
+            decrease = min(count, min(counters.values()))
+            zeros = []
+            for node in counters._iter_entries():
+                node.value -= decrease
+                if node.value == 0:
+                    zeros.append(node.key)
+            counters.remove_many(zeros)
+
+            count -= decrease
+            if count == 0:
+                return
+
+        counters.increment(item, count)
+
+    def update_many(self, items) -> None:
+        """This method adds one occurrence of every item of an iterable, which may be an unbounded iterator consumed as it is read."""
+        for item in items:
+            self.update(item)
+
+    def get_total(self) -> int:
+        """Return the number of items added"""
+        return self._total
+
+    def error_bound(self) -> int:
+        """
+        This method returns the most a Misra-Gries counter can be below the true count of its item: (N - sum of all counters) / (k + 1).  It is also the
+        largest true count of an item that may have no counter.
+        """
+        return (self._total - sum(self._counters.values())) // (self._k + 1)
+
+    def top(self, n: int = None) -> DynamicArray:
+        """
+        This method returns a dynamic array of the n (by default, all) candidates with the highest Count-Min estimates, as HeavyHitter tuples of the
+        item, its estimate, and the lower and upper bound of its true count, from the highest estimate down.
+        """
+        error = self.error_bound()
+        hitters = []
+        for item, counter in self._counters.items():
+            estimate = self._sketch.estimate(item)
+            hitters.append(HeavyHitter(item, estimate, counter, min(estimate, counter + error)))
+
+        hitters.sort(key=lambda hitter: (-hitter.estimate, -hitter.lower))
+        return DynamicArray(hitters[:n] if n is not None else hitters)
+
+    def mode(self):  # -> tuple(DynamicArray, int):
+        """
+        This method is the approximate version of find_mode.  It returns a tuple of a dynamic array of the items with the highest Count-Min estimate,
+        and that estimate.
+        """
+        result_da = DynamicArray()
+        hitters = self.top()
+        if hitters.length() == 0:
+            return (result_da, 0)
+
+        highest_estimate = hitters[0].estimate
+        for i in range(hitters.length()):
+            if hitters[i].estimate == highest_estimate:
+                result_da.append(hitters[i].item)
+        return (result_da, highest_estimate)
+
+    @classmethod
+    def check(cls, da: DynamicArray, k: int = 100, epsilon: float = 0.001, delta: float = 0.01) -> CheckReport:
+        """
+        This method checks the approximate summary against the exact counts on sample data.  The items of the dynamic array are streamed into a new
+        HeavyHitters, and also counted exactly with find_mode.  The report holds both modes, whether they are the same items, whether the true count of
+        every reported heavy hitter is within its bounds, and the largest difference between an estimate and a true count.
+        """
+        heavy_hitters = cls(k, epsilon, delta)
+        for i in range(da.length()):
+            heavy_hitters.update(da[i])
+
+        exact_mode, exact_frequency = find_mode(da)
+        approximate_mode, approximate_frequency = heavy_hitters.mode()
+        exact_counts = _count(da._data, hash_function_1)
+
+        within_bounds, max_error = True, 0
+        hitters = heavy_hitters.top()
+        for i in range(hitters.length()):
+            true_count = exact_counts.get(hitters[i].item)
+            within_bounds = within_bounds and hitters[i].lower <= true_count <= hitters[i].upper
+            max_error = max(max_error, hitters[i].estimate - true_count)
+
+        same_mode = sorted(exact_mode._data) == sorted(approximate_mode._data) and exact_frequency == approximate_frequency
+        return CheckReport(exact_mode, exact_frequency, approximate_mode, approximate_frequency, same_mode, within_bounds, max_error)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import itertools
+    import random
+
+    print("\nHeavyHitters example 1")
+    print("----------------------")
+    h = HeavyHitters(k=3, epsilon=0.01, delta=0.01)
+    h.update_many(["apple", "apple", "grape", "melon", "peach", "apple", "melon"])
+    mode, frequency = h.mode()
+    print(h.get_total(), h.error_bound(), mode, frequency)
+    print(h.top())
+
+    print("\nHeavyHitters example 2")
+    print("----------------------")
+    # AN UNBOUNDED ITERATOR, WHERE ONE ITEM IN TEN IS 'hot', IS READ ONE ITEM AT A TIME
+    rng = random.Random(0)
+    stream = ('hot' if rng.random() < 0.1 else 'item' + str(rng.randrange(100000)) for _ in itertools.count())
+    h = HeavyHitters(k=20, epsilon=0.001, delta=0.01)
+    h.update_many(itertools.islice(stream, 200000))
+    mode, frequency = h.mode()
+    print(mode, frequency, h.top(1)[0], h.error_bound())
+
+    print("\nHeavyHitters check example 1")
+    print("----------------------------")
+    rng = random.Random(1)
+    da = DynamicArray([str(min(int(rng.expovariate(0.01)), 999)) for _ in range(50000)])
+    report = HeavyHitters.check(da, k=50, epsilon=0.001, delta=0.01)
+    print(report.exact_mode, report.exact_frequency, report.approximate_mode, report.approximate_frequency)
+    print(report.same_mode, report.within_bounds, report.max_error)
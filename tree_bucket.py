@@ -0,0 +1,208 @@
+# Description:      Balanced binary search tree (AVL tree) bucket for the separate chaining HashMap.  A bucket whose linked list grows too long is
+#                   converted ("treeified") into a TreeBucket, so a lookup in it takes O(log n) comparisons instead of O(n).
+#
+#                   Nodes are ordered by their cached hash, then by their key, so keys only need to be comparable with keys of the same hash (strings,
+#                   for the keys used with this HashMap).  TreeBucket has the same interface as the LinkedList of a6_include (insert, remove, contains,
+#                   length, iterator), so the HashMap can use either kind of bucket.
+
+
+from a6_include import LinkedList
+
+
+class TreeNode:
+    """
+    AVL tree node for use in a TreeBucket
+    """
+
+    def __init__(self, key: str, value: object, hash: int) -> None:
+        """Initialize a leaf node given a key, value and the hash of the key."""
+        self.key = key
+        self.value = value
+        self.hash = hash
+        self.left = None
+        self.right = None
+        self.height = 1
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return '(' + str(self.key) + ': ' + str(self.value) + ')'
+
+
+def _height(node: TreeNode) -> int:
+    """Return the height of a subtree, 0 for an empty subtree."""
+    return node.height if node else 0
+
+
+def _update_height(node: TreeNode) -> None:
+    """Recompute the height of a node from the heights of its children."""
+    node.height = 1 + max(_height(node.left), _height(node.right))
+
+
+def _rotate_left(node: TreeNode) -> TreeNode:
+    """Rotate a subtree left, and return its new root (the old right child)."""
+    new_root = node.right
+    node.right = new_root.left
+    new_root.left = node
+    _update_height(node)
+    _update_height(new_root)
+    return new_root
+
+
+def _rotate_right(node: TreeNode) -> TreeNode:
+    """Rotate a subtree right, and return its new root (the old left child)."""
+    new_root = node.left
+    node.left = new_root.right
+    new_root.right = node
+    _update_height(node)
+    _update_height(new_root)
+    return new_root
+
+
+def _rebalance(node: TreeNode) -> TreeNode:
+    """
+    Restore the AVL property of a subtree whose children differ in height by at most 2, and return its new root.
+    """
+    _update_height(node)
+    balance = _height(node.left) - _height(node.right)
+
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+
+    return node
+
+
+class TreeBucket:
+    """
+    Class implementing an AVL tree bucket, ordered by (hash, key)
+    Supported methods are: insert, remove, contains, length, iterator
+    """
+
+    def __init__(self) -> None:
+        """Initialize new empty tree, keeping track of its size in a variable."""
+        self._root = None
+        self._size = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'TREE [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return a generator of the nodes of the tree, in (hash, key) order."""
+        stack = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    @classmethod
+    def from_nodes(cls, nodes) -> "TreeBucket":
+        """
+        Build a tree from an iterable of nodes with distinct keys (such as the nodes of a LinkedList bucket).  New tree nodes are created, as the nodes
+        are sorted by (hash, key) and the balanced tree is built directly from the sorted nodes.
+        """
+        tree = cls()
+        nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+
+        def build(start: int, end: int) -> TreeNode:
+            if start >= end:
+                return None
+            middle = (start + end) // 2
+            node = TreeNode(nodes[middle].key, nodes[middle].value, nodes[middle].hash)
+            node.left = build(start, middle)
+            node.right = build(middle + 1, end)
+            _update_height(node)
+            return node
+
+        tree._root = build(0, len(nodes))
+        tree._size = len(nodes)
+        return tree
+
+    def to_linked_list(self) -> LinkedList:
+        """Return a LinkedList with the keys, values and hashes of the tree, in the same order."""
+        linked_list = LinkedList()
+        for node in reversed(list(self)):
+            linked_list.insert(node.key, node.value, node.hash)
+        return linked_list
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """
+        Insert a new node for a key that is not in the tree.  Like LinkedList.insert, the caller checks that the key is not present first.
+        """
+        def insert_into(node: TreeNode) -> TreeNode:
+            if node is None:
+                return TreeNode(key, value, hash)
+            if (hash, key) < (node.hash, node.key):
+                node.left = insert_into(node.left)
+            else:
+                node.right = insert_into(node.right)
+            return _rebalance(node)
+
+        self._root = insert_into(self._root)
+        self._size += 1
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove the node with matching key and hash.
+        Return True if removal was successful, False otherwise.
+        """
+        if self.contains(key, hash) is None:
+            return False
+
+        def remove_from(node: TreeNode) -> TreeNode:
+            if (hash, key) < (node.hash, node.key):
+                node.left = remove_from(node.left)
+            elif (node.hash, node.key) < (hash, key):
+                node.right = remove_from(node.right)
+            else:
+                if node.left is None:
+                    return node.right
+                if node.right is None:
+                    return node.left
+
+                # REPLACE THE NODE WITH ITS SUCCESSOR, THE SMALLEST NODE OF ITS RIGHT SUBTREE
+                successor = node.right
+                while successor.left:
+                    successor = successor.left
+                node.right = remove_min(node.right)
+                successor.left, successor.right = node.left, node.right
+                node = successor
+            return _rebalance(node)
+
+        def remove_min(node: TreeNode) -> TreeNode:
+            if node.left is None:
+                return node.right
+            node.left = remove_min(node.left)
+            return _rebalance(node)
+
+        self._root = remove_from(self._root)
+        self._size -= 1
+        return True
+
+    def contains(self, key: str, hash: int) -> TreeNode:
+        """
+        Return node with matching key and hash, or None if no match.
+        """
+        node = self._root
+        while node:
+            if node.hash == hash and node.key == key:
+                return node
+            if (hash, key) < (node.hash, node.key):
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def length(self) -> int:
+        """Return the number of nodes in the tree."""
+        return self._size